@@ -1,19 +1,29 @@
-# Amounts used to calculate burger prices are initialised here.
-# This allows them to be accessed from anywhere, and allows them to be changed easily in the futrure
+import json
+import os
+import sys
+
+# Burger prices are shared with the other Codetown programs, and are kept in
+# codetown/prices.json in the folder above this one. They can be changed there
 # without need to look at the rest of the code.
-prices = {
-    "base" : 5,  # Includes milk bun, sauce, up to 1 patty, 1 cheese slice, and 1 salad item.
-    "gluten_free" : 1,  # Additional cost
-    "patty" : 3,  # 1 included. Price per additional patty
-    "cheese" : 1,  # 1 included, Price per additional cheese slice
-    "salad" : 1  # tomato, lettuce or onion included in base price. Price per additional salad item. 
-}
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codetown import pricing
+from codetown.records import BurgerRecord
 
 # Variables used for formatting output seen by customer in the terminal. Adds readability.
 indent_one = " " * 5
 indent_two = " " * 10
 indent_three = " " * 15
 
+# Valid choices, shared by the questions asked in the terminal and by batch mode.
+available_buns = ["milk", "gluten free"]
+available_sauces = ["tomato", "barbecue", "none"]
+salad_choices = ["yes", "no"]
+min_filling = 0  # Fewest patties or cheese slices on a burger
+max_filling = 3  # Most patties or cheese slices on a burger
+max_burgers = 10  # Most burgers in one order
+burger_fields = ["bun", "sauce", "patties", "cheese", "tomato", "lettuce", "onion"]
+max_remembered_orders = 10000  # Different batch lines whose prices are remembered, as most orders repeat
+
 def customer_choice(choice_list, message):
     """Handle customer input for fillings with a list of valid choices.
 
@@ -46,8 +56,6 @@ def type_of_bun(burger_num):
     Returns a String containing customers's choice
     """
 
-    available_buns = ["milk", "gluten free"]
-
     print(f"{indent_two}What bun type should be included for burger {burger_num}?")
     
     bun_selection = customer_choice(
@@ -66,8 +74,6 @@ def type_of_sauce(burger_num):
     Returns a String containing customers's choice
     """
 
-    available_sauces = ["tomato", "barbecue", "none"]
-
     print(f"{indent_two}What sauce should be included on Burger {burger_num}?")
 
     sauce_selection = customer_choice(
@@ -132,7 +138,7 @@ def salad(salad_type, burger_num):
     print(f"{indent_two}Would you like {salad_type} on burger number {burger_num}?")
 
     with_salad = customer_choice(
-        choice_list = ["yes", "no"], 
+        choice_list = salad_choices, 
         message = f"{indent_three}Please type 'yes' or 'no': ")
     
     if with_salad == "yes":
@@ -144,6 +150,7 @@ def salad(salad_type, burger_num):
 
 def each_burger_cost(burger_order):
     """Calculate the cost of individual burgers.
+    Looks the price up in the shared price table in codetown/pricing.py.
     
     Arguements:
     burger_order -- dictionary containing details of the current burger
@@ -151,23 +158,13 @@ def each_burger_cost(burger_order):
     Returns burger_order dictionary with updated price field
     """
     
-    burger_price = prices["base"]
-
-    if burger_order["bun"] == "gluten free":
-        burger_price += prices["gluten_free"]
-    if burger_order["patties"] > 1:
-        burger_price += prices["patty"] * (burger_order["patties"] - 1)
-    if burger_order["cheese"] > 1:
-        burger_price += prices["cheese"] * (burger_order["cheese"] - 1)
-
-    salad_number = 0
-
-    for salad_type in burger_order["tomato"], burger_order["lettuce"], burger_order["onion"]:
-        if salad_type:
-            salad_number += 1
-
-    if salad_number > 1:
-        burger_price += prices["salad"] * (salad_number - 1)
+    burger_price = pricing.get_price(
+        bun = burger_order["bun"],
+        patties = burger_order["patties"],
+        cheese = burger_order["cheese"],
+        tomato = burger_order["tomato"],
+        lettuce = burger_order["lettuce"],
+        onion = burger_order["onion"])
 
     burger_order["price"] = burger_price
     return burger_order
@@ -190,13 +187,13 @@ def create_burger(bur_num):
         "patties" : how_many(
             filling_type = "patties", 
             burger_num = bur_num, 
-            min = 0, 
-            max = 3),
+            min = min_filling, 
+            max = max_filling),
         "cheese" : how_many(
             filling_type = "cheese slices", 
             burger_num = bur_num, 
-            min = 0, 
-            max = 3),
+            min = min_filling, 
+            max = max_filling),
         "tomato" : salad(
             salad_type = "tomato",
             burger_num = bur_num),
@@ -212,6 +209,17 @@ def create_burger(bur_num):
     each_burger_cost(new_burger)  # Updates the price field above
     return new_burger
 
+def journal_line(burger_order):
+    """Formats a burger as a line in the orders.txt format read by orders.py, such as "milk,tomato,2,1,yes,no,no".
+    
+    Arguements:
+    burger_order -- dictionary containing details of the current burger
+
+    Returns a String containing the line, including a newline
+    """
+
+    return BurgerRecord.from_dict(burger_order).to_line()
+
 def total_cost(list_of_burgers):
     """Calculate the cost for all burgers combined
     
@@ -227,15 +235,20 @@ def total_cost(list_of_burgers):
 
     return total_cost
 
-def take_order_and_display_cost():
+def take_order_and_display_cost(journal=None):
     """Main ordering function. 
     Takes user input to determine how many burgers are required, and calls create_burger function for each.
     Displays total cost to user and a message to end the interaction.
+
+    Arguements:
+    journal -- OrderJournal from journal.py to record the burgers in, or None to not record them
     """
 
+    pricing.reload_if_changed()  # Pick up any price changes made since the last order.
+
     print("Welcome to Codetown Burger Co! \n")
     print("How many burgers would you like to order?")
-    number_of_burgers = handle_numeric_input(min = 1, max = 10)
+    number_of_burgers = handle_numeric_input(min = 1, max = max_burgers)
 
     burger_list = []  # Initialise an empty list to store the orders as a disctionary for each burger
 
@@ -248,4 +261,271 @@ def take_order_and_display_cost():
     print(f"The total cost for all burgers is ${total}")
     print(f"{indent_one}Thank you for visiting Codetown Burger Co!")
 
-take_order_and_display_cost()
\ No newline at end of file
+    if journal != None:
+        journal.add_order(burger_list)
+
+def check_choice(choice, choice_list, choice_type):
+    """Check a choice given in batch mode, using the same rule as customer_choice().
+    
+    Arguements:
+    choice -- String given for the choice
+    choice_list -- list containing valid choices
+    choice_type -- String naming the choice, for inclusion in the error message
+
+    Raises ValueError if the choice isn't valid.
+    Returns a String containing the choice in lowercase
+    """
+
+    if isinstance(choice, str) and choice.lower() in choice_list:
+        return choice.lower()
+
+    raise ValueError(f"The {choice_type} choice must be one of: {', '.join(choice_list)}")
+
+def check_amount(amount, filling_type, min, max):
+    """Check an amount given in batch mode, using the same rules as handle_numeric_input().
+    
+    Arguements:
+    amount -- String or integer given for the amount
+    filling_type -- String representing filling, for inclusion in the error message
+    min -- the minimum valid number
+    max -- the maximum valid number
+
+    Raises ValueError if the amount isn't a number between min and max.
+    Returns the amount as an integer
+    """
+
+    # Only whole numbers are accepted, as int() would turn a JSON 2.9 into 2 and true into 1.
+    if isinstance(amount, str):
+        try:
+            amount = int(amount)
+        except ValueError:
+            raise ValueError(f"The number of {filling_type} was not a number")
+    elif isinstance(amount, bool) or not isinstance(amount, int):
+        raise ValueError(f"The number of {filling_type} was not a number")
+
+    if amount < min or amount > max:
+        raise ValueError(f"The number of {filling_type} must be between {min} and {max}")
+
+    return amount
+
+def check_salad(choice, salad_type):
+    """Check a salad choice given in batch mode, using the same rule as salad().
+    JSON true and false are accepted as well as "yes" and "no".
+    
+    Arguements:
+    choice -- String or boolean given for the choice
+    salad_type -- String representing which salad the choice is for
+
+    Raises ValueError if the choice isn't valid.
+    Returns choice as a boolean value
+    """
+
+    if isinstance(choice, bool):
+        return choice
+
+    return check_choice(choice, salad_choices, salad_type) == "yes"
+
+def burger_from_fields(fields, bur_num):
+    """Creates the same dictionary as create_burger(), from fields given in batch mode.
+    
+    Arguements:
+    fields -- list of the 7 fields in the order of burger_fields, or a dictionary with those keys
+    bur_num -- which burger in the order this is. Type: integer.
+
+    Raises ValueError if any field isn't valid.
+    Returns burger details as a dictionary, including its price
+    """
+
+    if isinstance(fields, dict):
+        missing = [field for field in burger_fields if field not in fields]
+        if missing:
+            raise ValueError(f"Burger {bur_num} is missing {', '.join(missing)}")
+        fields = [fields[field] for field in burger_fields]
+    elif len(fields) != len(burger_fields):
+        raise ValueError(f"Burger {bur_num} must have {len(burger_fields)} fields: {', '.join(burger_fields)}")
+
+    new_burger = {
+        "burger" : bur_num,
+        "bun" : check_choice(fields[0], available_buns, "bun"),
+        "sauce" : check_choice(fields[1], available_sauces, "sauce"),
+        "patties" : check_amount(fields[2], "patties", min_filling, max_filling),
+        "cheese" : check_amount(fields[3], "cheese slices", min_filling, max_filling),
+        "tomato" : check_salad(fields[4], "tomato"),
+        "lettuce" : check_salad(fields[5], "lettuce"),
+        "onion" : check_salad(fields[6], "onion"),
+        "price" : 0
+        }
+
+    each_burger_cost(new_burger)  # Updates the price field above
+    return new_burger
+
+def parse_batch_line(line):
+    """Reads the burgers for one order from a line of batch input.
+
+    A line is either text, with each burger's 7 fields separated by commas
+    and burgers separated by semicolons:
+        milk,tomato,2,1,yes,no,no;gluten free,none,0,0,no,no,no
+    or a JSON object, with an optional order id and a list of burgers:
+        {"id": "A12", "burgers": [{"bun": "milk", "sauce": "tomato", "patties": 2,
+         "cheese": 1, "tomato": true, "lettuce": false, "onion": false}]}
+    A JSON object for a single burger, without "burgers", is also accepted.
+
+    Arguements:
+    line -- String containing one order
+
+    Raises ValueError if the line can't be read or the order has the wrong number of burgers.
+    Returns a tuple of the order id (or None) and a list of the burgers' fields
+    """
+
+    line = line.strip()
+    order_id = None
+
+    if line.startswith("{"):
+        try:
+            order = json.loads(line)
+        except ValueError:
+            raise ValueError("The order isn't valid JSON")
+        if not isinstance(order, dict):
+            raise ValueError("The order must be a JSON object")
+        order_id = order.get("id")
+        burgers = order.get("burgers", [order])
+        if not isinstance(burgers, list) or not all(isinstance(burger, dict) for burger in burgers):
+            raise ValueError("The burgers must be a list of JSON objects")
+    else:
+        burgers = [[field.strip() for field in burger.split(",")] for burger in line.split(";")]
+
+    if len(burgers) < 1 or len(burgers) > max_burgers:
+        raise ValueError(f"An order must have between 1 and {max_burgers} burgers")
+
+    return order_id, burgers
+
+def take_batch_orders(lines, output=sys.stdout, journal=None):
+    """Prices every order in a batch, without asking any questions.
+
+    Each order gets a receipt line as soon as it is priced, giving each
+    burger's price and the total. Orders with a mistake get a receipt line
+    describing the mistake instead, and are left out of the totals. Text
+    orders get text receipts, and JSON orders get JSON receipts.
+    The prices of repeated lines are remembered rather than worked out again.
+
+    Arguements:
+    lines -- iterable of Strings, each containing one order. Blank lines are skipped.
+    output -- file to write the receipts to
+    journal -- OrderJournal from journal.py to record the priced burgers in, or None to not record them
+
+    Returns a dictionary with the number of orders, burgers and rejected orders, and the total cost
+    """
+
+    pricing.reload_if_changed()  # Pick up any price changes made since the last batch.
+
+    totals = {"orders" : 0, "burgers" : 0, "rejected" : 0, "total" : 0}
+    order_number = 0
+    remembered_orders = {}  # line : (order id, prices, total, journal lines) or the error message
+
+    for line in lines:
+        if not line.strip():
+            continue
+        order_number += 1
+        is_json = line.lstrip().startswith("{")
+
+        result = remembered_orders.get(line)
+        if result == None:
+            try:
+                order_id, burgers = parse_batch_line(line)
+                burger_list = [burger_from_fields(fields, bur_num) for bur_num, fields in enumerate(burgers, 1)]
+                result = (
+                    order_id,
+                    [burger["price"] for burger in burger_list],
+                    total_cost(list_of_burgers = burger_list),
+                    "".join(journal_line(burger) for burger in burger_list).encode())
+            except ValueError as error:
+                result = str(error)
+            if len(remembered_orders) < max_remembered_orders:
+                remembered_orders[line] = result
+
+        if isinstance(result, str):
+            totals["rejected"] += 1
+            if is_json:
+                output.write(json.dumps({"order" : order_number, "error" : result}) + "\n")
+            else:
+                output.write(f"Order {order_number}: {result}\n")
+            continue
+
+        order_id, prices, total, lines_for_journal = result
+        if journal != None:
+            journal.add_lines(lines_for_journal, len(prices))
+        totals["orders"] += 1
+        totals["burgers"] += len(prices)
+        totals["total"] += total
+
+        if is_json:
+            receipt = {"order" : order_number, "prices" : prices, "total" : total}
+            if order_id != None:
+                receipt["id"] = order_id
+            output.write(json.dumps(receipt) + "\n")
+        else:
+            output.write(f"Order {order_number}: {' + '.join(f'${price}' for price in prices)} = ${total}\n")
+
+    return totals
+
+def display_batch_totals(totals):
+    """Prints the totals for a batch after its receipts.
+    
+    Arguements:
+    totals -- dictionary returned by take_batch_orders()
+    """
+
+    print(f"{totals['orders']} orders with {totals['burgers']} burgers, totalling ${totals['total']}")
+    if totals["rejected"]:
+        print(f"{totals['rejected']} orders had mistakes and were not priced")
+
+if __name__ == "__main__":
+    import argparse
+
+    # journal.py imports this file as "burger", so it shares this copy rather than loading a second one.
+    sys.modules.setdefault("burger", sys.modules[__name__])
+    from journal import DEFAULT_GROUP_DELAY, DEFAULT_GROUP_SIZE, SYNC_POLICIES, OrderJournal
+
+    parser = argparse.ArgumentParser(description = "Take burger orders at Codetown Burger Co.")
+    parser.add_argument(
+        "--batch", metavar = "FILE",
+        help = "price every order in FILE without asking any questions, one order per line. Use - to read from stdin")
+    parser.add_argument(
+        "--journal", metavar = "FILE",
+        help = "add every completed burger to FILE, in the same format as the orders.txt read by orders.py")
+    parser.add_argument(
+        "--sync", choices = SYNC_POLICIES, default = "group",
+        help = "when the journal is synced to disk: after every order, once per group of burgers, "
+            "or never (default: group)")
+    parser.add_argument(
+        "--group-size", type = int, default = DEFAULT_GROUP_SIZE,
+        help = f"burgers written to the journal together (default: {DEFAULT_GROUP_SIZE})")
+    parser.add_argument(
+        "--group-delay", type = float, default = DEFAULT_GROUP_DELAY,
+        help = f"most seconds a burger waits to be written to the journal (default: {DEFAULT_GROUP_DELAY})")
+    options = parser.parse_args()
+
+    journal = None
+    if options.journal != None:
+        try:
+            journal = OrderJournal(options.journal, options.sync, options.group_size, options.group_delay)
+        except (PermissionError, IsADirectoryError, FileNotFoundError):
+            print("The journal file can't be opened")
+            sys.exit(1)
+        if journal.recovered_bytes:
+            print(f"Removed an unfinished order ({journal.recovered_bytes} bytes) from the end of the journal")
+
+    try:
+        if options.batch == None:
+            take_order_and_display_cost(journal)
+        elif options.batch == "-":
+            display_batch_totals(take_batch_orders(sys.stdin, journal = journal))
+        else:
+            try:
+                with open(options.batch) as batch_file:
+                    display_batch_totals(take_batch_orders(batch_file, journal = journal))
+            except FileNotFoundError:
+                print("Batch file can't be found")
+    finally:
+        if journal != None:
+            journal.close()
@@ -0,0 +1,313 @@
+"""
+Records every completed burger in an order file that orders.py can read.
+
+Each burger is written as one line in the same format as orders.txt:
+
+    milk,tomato,2,1,yes,no,no
+
+Writing and syncing each burger to disk on its own would limit the program
+to a few hundred burgers a second, so burgers wait in memory and are
+written together in a group commit: one write, and at most one fsync, for
+every group. A group is committed when it holds group_size burgers, when
+its oldest burger has waited group_delay seconds, or when the journal is
+closed. The sync policy decides how safe committed burgers are:
+
+    always  Commit and fsync after every order. Nothing is lost once the
+            order's total has been shown, but every order waits for the disk.
+    group   Commit in groups and fsync once per group. A power cut can lose
+            the burgers waiting in the last group.
+    none    Commit in groups but never fsync. Burgers survive the program
+            crashing, but a power cut can lose whatever the operating
+            system hadn't written yet.
+
+Only whole orders are ever committed, so an order is never split between
+groups. If the program is stopped part way through writing a group, the
+file may end with part of a line. When a journal is opened, a last line
+with no newline is removed unless it is a complete order, in which case its
+newline is added.
+
+Running this file measures the sustained write speed under each policy:
+python3 journal.py --seconds 3 --group-size 100
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from burger import (
+    available_buns, available_sauces, burger_from_fields, journal_line, max_filling, min_filling, salad_choices)
+
+SYNC_POLICIES = ["always", "group", "none"]
+DEFAULT_GROUP_SIZE = 100  # Burgers waiting before a group is committed
+DEFAULT_GROUP_DELAY = 0.1  # Seconds the oldest burger waits before a group is committed
+TAIL_READ_SIZE = 4096  # Bytes read at a time when looking for the start of the last line
+
+# fdatasync skips writing the file's modified time, which isn't needed to
+# read the orders back. It isn't available on every system.
+sync_file = getattr(os, "fdatasync", os.fsync)
+
+def is_complete_order(line):
+    """Checks whether a line is a whole order, with all 7 fields valid.
+
+    Arguments:
+    line -- bytes of one line, without a newline
+
+    Returns:
+    bool -- True if the line is a complete order
+    """
+    try:
+        burger_from_fields(line.decode().split(","), 1)
+    except (ValueError, UnicodeDecodeError):
+        return False
+    return True
+
+def recover_journal(filename):
+    """Repairs the end of a journal which was being written when the program stopped.
+
+    A last line with no newline is removed, unless it is a complete order,
+    in which case only the newline was missing and it is added.
+
+    Arguments:
+    filename -- The journal file
+
+    Returns:
+    int -- Number of bytes removed from the end of the file
+    """
+    try:
+        file = open(filename, "r+b")
+    except FileNotFoundError:
+        return 0
+
+    with file:
+        size = file.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        file.seek(size - 1)
+        if file.read(1) == b"\n":
+            return 0
+
+        # Search backwards from the end for the newline before the last line.
+        line_start = 0
+        position = size
+        while position > 0:
+            start = max(0, position - TAIL_READ_SIZE)
+            file.seek(start)
+            newline = file.read(position - start).rfind(b"\n")
+            if newline != -1:
+                line_start = start + newline + 1
+                break
+            position = start
+
+        file.seek(line_start)
+        if is_complete_order(file.read()):
+            file.write(b"\n")
+            removed = 0
+        else:
+            file.truncate(line_start)
+            removed = size - line_start
+
+        file.flush()
+        sync_file(file.fileno())
+        return removed
+
+def sync_folder(filename):
+    """Syncs the folder holding a new file, so the file itself survives a power cut."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Folders can't be opened on Windows, where this isn't needed.
+
+    folder = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(folder)
+    finally:
+        os.close(folder)
+
+class OrderJournal:
+    """Appends completed orders to a journal file, committing them in groups.
+
+    Can be used in a with statement, which closes the journal at the end.
+
+    Attributes:
+    filename -- The journal file
+    sync -- The sync policy: "always", "group" or "none"
+    group_size -- Burgers waiting before a group is committed
+    group_delay -- Seconds the oldest burger waits before a group is committed
+    recovered_bytes -- Bytes removed from the end of the file when it was opened
+    waiting -- list of bytes of the orders waiting to be committed
+    waiting_burgers -- Number of burgers waiting to be committed
+    first_waiting_time -- monotonic() time when the oldest waiting burger was added
+    burgers_committed -- Number of burgers committed since the journal was opened
+    commits -- Number of groups committed
+    syncs -- Number of times the file was synced to disk
+
+    Methods:
+    add_order() -- Add the burgers of a completed order
+    add_lines() -- Add order lines which are already formatted
+    commit_if_due() -- Commit the waiting burgers if the oldest has waited group_delay
+    commit() -- Write the waiting burgers to the file
+    close() -- Commit the waiting burgers and close the file
+    """
+
+    def __init__(self, filename, sync="group", group_size=DEFAULT_GROUP_SIZE, group_delay=DEFAULT_GROUP_DELAY):
+        """Open the journal, repairing its end if needed.
+
+        Arguments:
+        filename -- The journal file, created if it doesn't exist
+        sync -- The sync policy: "always", "group" or "none"
+        group_size -- Burgers waiting before a group is committed
+        group_delay -- Seconds the oldest burger waits before a group is committed
+        """
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"The sync policy must be one of: {', '.join(SYNC_POLICIES)}")
+
+        self.filename = filename
+        self.sync = sync
+        self.group_size = group_size
+        self.group_delay = group_delay
+        self.waiting = []
+        self.waiting_burgers = 0
+        self.first_waiting_time = None
+        self.burgers_committed = 0
+        self.commits = 0
+        self.syncs = 0
+
+        self.recovered_bytes = recover_journal(filename)
+        created = not os.path.exists(filename)
+        self.file_descriptor = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if created and sync != "none":
+            sync_folder(filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+        return False
+
+    def add_order(self, list_of_burgers):
+        """Add the burgers of a completed order.
+
+        Arguments:
+        list_of_burgers -- a list of dictionaries containing information for individual burgers
+        """
+        self.add_lines("".join(journal_line(burger) for burger in list_of_burgers).encode(), len(list_of_burgers))
+
+    def add_lines(self, lines, number_of_burgers):
+        """Add order lines which are already formatted, such as the output of journal_line().
+
+        Arguments:
+        lines -- bytes of one or more whole order lines, each ending in a newline
+        number_of_burgers -- Number of lines
+        """
+        if not self.waiting:
+            self.first_waiting_time = time.monotonic()
+        self.waiting.append(lines)
+        self.waiting_burgers += number_of_burgers
+
+        if self.sync == "always" or self.waiting_burgers >= self.group_size:
+            self.commit()
+        else:
+            self.commit_if_due()
+
+    def commit_if_due(self):
+        """Commit the waiting burgers if the oldest has waited at least group_delay seconds."""
+        if self.waiting and time.monotonic() - self.first_waiting_time >= self.group_delay:
+            self.commit()
+
+    def commit(self):
+        """Write the waiting burgers to the file in one write, and sync it unless the policy is "none"."""
+        if not self.waiting:
+            return
+
+        data = memoryview(b"".join(self.waiting))
+        while data:
+            written = os.write(self.file_descriptor, data)
+            data = data[written:]
+
+        if self.sync != "none":
+            sync_file(self.file_descriptor)
+            self.syncs += 1
+
+        self.burgers_committed += self.waiting_burgers
+        self.commits += 1
+        self.waiting = []
+        self.waiting_burgers = 0
+
+    def close(self):
+        """Commit the waiting burgers and close the file."""
+        if self.file_descriptor == None:
+            return
+        self.commit()
+        os.close(self.file_descriptor)
+        self.file_descriptor = None
+
+def random_order(chooser):
+    """Choose the burgers for one random order of 1 to 3 burgers.
+
+    Arguments:
+    chooser -- random.Random to choose with
+
+    Returns:
+    list -- Dictionaries for each burger, as create_burger() returns
+    """
+    return [burger_from_fields([
+        chooser.choice(available_buns),
+        chooser.choice(available_sauces),
+        chooser.randint(min_filling, max_filling),
+        chooser.randint(min_filling, max_filling),
+        chooser.choice(salad_choices),
+        chooser.choice(salad_choices),
+        chooser.choice(salad_choices),
+        ], burger_number) for burger_number in range(1, chooser.randint(1, 3) + 1)]
+
+def time_policy(folder, sync, group_size, group_delay, seconds, orders):
+    """Adds orders to a new journal for a number of seconds.
+
+    Arguments:
+    folder -- Folder to write the journal in
+    sync -- The sync policy to time
+    group_size -- Burgers waiting before a group is committed
+    group_delay -- Seconds the oldest burger waits before a group is committed
+    seconds -- How long to keep adding orders
+    orders -- list of orders to add, repeated as needed. Its length must be a multiple of 100.
+
+    Returns:
+    dict -- The burgers written, commits, syncs and seconds taken
+    """
+    filename = os.path.join(folder, f"journal_{sync}.txt")
+    number_added = 0
+    start = time.perf_counter()
+
+    with OrderJournal(filename, sync, group_size, group_delay) as journal:
+        while time.perf_counter() - start < seconds:
+            batch_start = number_added % len(orders)
+            for order in orders[batch_start:batch_start + 100]:
+                journal.add_order(order)
+            number_added += 100
+    elapsed = time.perf_counter() - start
+
+    os.remove(filename)
+    return {"orders" : number_added, "burgers" : journal.burgers_committed, "commits" : journal.commits,
+            "syncs" : journal.syncs, "seconds" : elapsed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure how fast orders can be journaled under each sync policy.")
+    parser.add_argument("--folder", help = "folder to write the test journals in (default: a temporary folder)")
+    parser.add_argument("--seconds", type = float, default = 3.0, help = "seconds to time each policy for (default: 3)")
+    parser.add_argument("--group-size", type = int, default = DEFAULT_GROUP_SIZE,
+        help = f"burgers in each group commit (default: {DEFAULT_GROUP_SIZE})")
+    parser.add_argument("--group-delay", type = float, default = DEFAULT_GROUP_DELAY,
+        help = f"most seconds a burger waits to be committed (default: {DEFAULT_GROUP_DELAY})")
+    options = parser.parse_args()
+
+    chooser = random.Random(0)
+    orders = [random_order(chooser) for order in range(1000)]
+
+    with tempfile.TemporaryDirectory(dir = options.folder) as folder:
+        for sync in SYNC_POLICIES:
+            result = time_policy(folder, sync, options.group_size, options.group_delay, options.seconds, orders)
+            print(f"{sync:<6} {result['burgers'] / result['seconds']:>10,.0f} burgers/s  "
+                f"{result['orders'] / result['seconds']:>10,.0f} orders/s  "
+                f"{result['commits']:>7} commits  {result['syncs']:>7} syncs")
@@ -0,0 +1,341 @@
+"""
+Runs many ordering kiosks at once from one program.
+
+take_order_and_display_cost() in burger.py waits on input() for each answer,
+so one program can only serve one customer. KioskSession asks the same
+questions in the same order, with the same messages when an answer isn't
+valid, but is given each answer as it arrives instead of waiting for it.
+Each session remembers which question it is up to, so thousands of sessions
+can be in progress at once, each at a different question.
+
+The kiosk server listens on a local TCP port or Unix socket, and each
+connection is one customer's session. The server sends exactly the text
+burger.py would print, ending with the question's prompt, and each line sent
+back is the answer to that prompt. The connection is closed after the total
+cost is sent.
+
+With --journal, every completed order's burgers are added to a journal in
+the orders.txt format (see journal.py). Writing and syncing the journal can
+take milliseconds, so the journal is only used from one writer thread, and
+the other sessions carry on while it works. An order is added to the
+journal before its total cost is sent, so with --sync always no order is
+lost once its total has been shown. The journal's group commits are also
+checked every group delay, so burgers don't wait for the next order when
+orders are slow.
+
+Usage:
+python3 kiosk.py --port 8766
+python3 kiosk.py --unix /tmp/kiosk.sock --journal orders.txt --sync group
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import journal
+from burger import (
+    available_buns, available_sauces, each_burger_cost, indent_one, indent_three, indent_two,
+    max_burgers, max_filling, min_filling, pricing, salad_choices, total_cost)
+
+MAX_LINE_LENGTH = 1024  # Longest answer accepted from a kiosk
+BACKLOG = 1024  # Kiosks waiting to be connected, so many can start at once
+MIN_COMMIT_INTERVAL = 0.001  # Shortest wait between checks for due group commits, in seconds
+
+# The question for each choice on a burger, in the order they are asked.
+BURGER_STEPS = [
+    ("bun", "What bun type should be included for burger {}?"),
+    ("sauce", "What sauce should be included on Burger {}?"),
+    ("patties", "How many patties should be included on burger number {}: "),
+    ("cheese", "How many cheese slices should be included on burger number {}: "),
+    ("tomato", "Would you like tomato on burger number {}?"),
+    ("lettuce", "Would you like lettuce on burger number {}?"),
+    ("onion", "Would you like onion on burger number {}?"),
+]
+# The valid answers and prompt for each question answered with a choice. The rest are answered with a number.
+CHOICES = {
+    "bun" : (available_buns, f"{indent_three}Please type 'milk' or 'gluten free': "),
+    "sauce" : (available_sauces, f"{indent_three}Please type 'tomato', 'barbecue' or 'none': "),
+    "tomato" : (salad_choices, f"{indent_three}Please type 'yes' or 'no': "),
+    "lettuce" : (salad_choices, f"{indent_three}Please type 'yes' or 'no': "),
+    "onion" : (salad_choices, f"{indent_three}Please type 'yes' or 'no': "),
+}
+
+class KioskSession:
+    """One customer's order, given one answer at a time.
+
+    The session is always waiting for the answer to one question, and
+    answer() moves it on to the next question, or asks the same one again if
+    the answer wasn't valid, exactly as the questions in burger.py do.
+
+    Attributes:
+    step -- Name of the question being asked: "burgers" for how many burgers,
+            a name from BURGER_STEPS, or "done" when the order is finished
+    number_of_burgers -- How many burgers were ordered, or 0 if not yet known
+    burger_number -- Which burger is being asked about, starting from 1
+    burger -- dictionary of the current burger's choices so far
+    step_index -- Position of the current question in BURGER_STEPS
+    burger_list -- list of dictionaries of the finished burgers, like create_burger() returns
+
+    Methods:
+    start() -- The text shown when the session begins
+    answer() -- Give the answer to the current question
+    prompt() -- The prompt for the current question
+    """
+
+    def __init__(self):
+        self.step = "burgers"
+        self.number_of_burgers = 0
+        self.burger_number = 0
+        self.burger = None
+        self.step_index = 0
+        self.burger_list = []
+
+    def start(self):
+        """The text shown when the session begins, ending with the first prompt.
+
+        Returns a String of the text to show
+        """
+        pricing.reload_if_changed()  # Pick up any price changes made since the last order.
+
+        return "Welcome to Codetown Burger Co! \n\n" + "How many burgers would you like to order?\n" + self.prompt()
+
+    def finished(self):
+        """Returns True once the total cost has been shown."""
+        return self.step == "done"
+
+    def prompt(self):
+        """The prompt for the current question, as passed to input() in burger.py.
+
+        Returns a String containing the prompt, or "" if the order is finished
+        """
+        if self.step == "burgers":
+            return f"{indent_three}Please enter a number between 1 and {max_burgers}: "
+        if self.step in CHOICES:
+            return CHOICES[self.step][1]
+        if self.step == "done":
+            return ""
+        return f"{indent_three}Please enter a number between {min_filling} and {max_filling}: "
+
+    def answer(self, text):
+        """Give the answer to the current question.
+
+        Arguments:
+        text -- String typed by the customer, without the newline
+
+        Returns a String of the text to show next, ending with the next prompt
+        """
+        if self.step == "done":
+            return ""
+
+        if self.step in CHOICES:
+            choice = text.lower()  # Converting to lowercase ensures input is not case sensitive.
+            if choice not in CHOICES[self.step][0]:
+                return f"{indent_three}Please enter a valid choice\n" + self.prompt()
+            if self.step in ("tomato", "lettuce", "onion"):
+                choice = choice == "yes"
+            return self.next_step(choice)
+
+        if self.step == "burgers":
+            min, max = 1, max_burgers
+        else:
+            min, max = min_filling, max_filling
+        try:
+            amount = int(text)
+        except ValueError:
+            return f"{indent_three}That was not a number\n" + self.prompt()
+        if amount < min or amount > max:
+            return f"{indent_three}Number must be between {min} and {max}: \n" + self.prompt()
+
+        if self.step == "burgers":
+            self.number_of_burgers = amount
+            return self.next_burger()
+        return self.next_step(amount)
+
+    def next_step(self, value):
+        """Saves a valid answer for the current burger and moves to the next question.
+
+        Arguments:
+        value -- The answer, converted as create_burger() would
+
+        Returns a String of the text to show next
+        """
+        self.burger[self.step] = value
+        self.step_index += 1
+
+        if self.step_index < len(BURGER_STEPS):
+            return self.ask_burger_step()
+
+        each_burger_cost(self.burger)  # Adds the price field
+        self.burger_list.append(self.burger)
+        if self.burger_number < self.number_of_burgers:
+            return self.next_burger()
+
+        self.step = "done"
+        total = total_cost(list_of_burgers = self.burger_list)
+        return ("\n\n" + f"The total cost for all burgers is ${total}\n"
+                + f"{indent_one}Thank you for visiting Codetown Burger Co!\n")
+
+    def next_burger(self):
+        """Starts asking about the next burger.
+
+        Returns a String of the text to show next
+        """
+        self.burger_number += 1
+        self.burger = {"burger" : self.burger_number}
+        self.step_index = 0
+        return "\n" + f"{indent_one}Details for burger {self.burger_number}:\n" + self.ask_burger_step()
+
+    def ask_burger_step(self):
+        """Moves to the question at step_index for the current burger.
+
+        Returns a String of the question and its prompt
+        """
+        self.step, question = BURGER_STEPS[self.step_index]
+        return f"{indent_two}{question.format(self.burger_number)}\n" + self.prompt()
+
+
+class KioskServer:
+    """Runs a KioskSession for each connected kiosk.
+
+    Attributes:
+    sessions_started -- Number of sessions started since the server started
+    sessions_open -- Number of sessions in progress
+    orders_completed -- Number of sessions which reached the total cost
+    order_journal -- OrderJournal the completed orders are added to, or None
+    journal_writer -- ThreadPoolExecutor with the one thread that uses order_journal, or None
+
+    Methods:
+    handle_kiosk() -- Run one kiosk's session until it finishes or disconnects
+    commit_journal() -- Commit the journal's waiting burgers when due, running until cancelled
+    close() -- Finish any journal writes in progress
+    """
+
+    def __init__(self, order_journal=None):
+        """Set up the server.
+
+        Arguments:
+        order_journal -- OrderJournal to add completed orders to, or None to not record them
+        """
+        self.sessions_started = 0
+        self.sessions_open = 0
+        self.orders_completed = 0
+        self.order_journal = order_journal
+        self.journal_writer = None
+        if order_journal != None:
+            self.journal_writer = ThreadPoolExecutor(max_workers = 1)
+
+    async def handle_kiosk(self, reader, writer):
+        """Run one kiosk's session until it finishes or disconnects.
+
+        Arguments:
+        reader -- asyncio.StreamReader for the connection
+        writer -- asyncio.StreamWriter for the connection
+        """
+        session = KioskSession()
+        self.sessions_started += 1
+        self.sessions_open += 1
+
+        try:
+            writer.write(session.start().encode())
+            while not session.finished():
+                await writer.drain()
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b"Answer is too long\n")
+                    break
+
+                if not line:
+                    break  # The kiosk disconnected before finishing.
+
+                reply = session.answer(line.decode(errors = "replace").rstrip("\r\n"))
+                if session.finished() and self.order_journal != None:
+                    await asyncio.get_running_loop().run_in_executor(
+                        self.journal_writer, self.order_journal.add_order, session.burger_list)
+                writer.write(reply.encode())
+
+            if session.finished():
+                self.orders_completed += 1
+                await writer.drain()
+
+        except ConnectionError:
+            pass  # The kiosk disconnected while a reply was being sent.
+        finally:
+            self.sessions_open -= 1
+            writer.close()
+
+    async def commit_journal(self):
+        """Commit the journal's waiting burgers once they have waited its group delay, running until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(self.order_journal.group_delay, MIN_COMMIT_INTERVAL))
+            await loop.run_in_executor(self.journal_writer, self.order_journal.commit_if_due)
+
+    def close(self):
+        """Wait for any journal writes in progress to finish, so the journal can be closed."""
+        if self.journal_writer != None:
+            self.journal_writer.shutdown(wait = True)
+
+
+async def run_server(host="127.0.0.1", port=8766, unix_path=None, order_journal=None):
+    """Start the kiosk server and run until interrupted.
+
+    Arguments:
+    host -- Address to listen on for TCP connections
+    port -- Port to listen on for TCP connections
+    unix_path -- If given, listen on this Unix socket instead of TCP
+    order_journal -- OrderJournal to add completed orders to, or None to not record them
+    """
+    server = KioskServer(order_journal)
+    if order_journal != None:
+        commit_task = asyncio.create_task(server.commit_journal())
+
+    if unix_path != None:
+        listener = await asyncio.start_unix_server(
+            server.handle_kiosk, unix_path, limit = MAX_LINE_LENGTH, backlog = BACKLOG)
+        print(f"Listening for kiosks on {unix_path}")
+    else:
+        listener = await asyncio.start_server(
+            server.handle_kiosk, host, port, limit = MAX_LINE_LENGTH, backlog = BACKLOG)
+        print(f"Listening for kiosks on {host}:{port}")
+
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if order_journal != None:
+            commit_task.cancel()
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Take burger orders from many kiosks at once.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 8766, help = "port to listen on (default: 8766)")
+    parser.add_argument("--unix", help = "listen on this Unix socket instead of TCP")
+    parser.add_argument("--journal", metavar = "FILE", help = "add every completed burger to FILE, in the orders.txt format")
+    parser.add_argument("--sync", choices = journal.SYNC_POLICIES, default = "group",
+        help = "when the journal is synced to disk (default: group)")
+    parser.add_argument("--group-size", type = int, default = journal.DEFAULT_GROUP_SIZE,
+        help = f"burgers written to the journal together (default: {journal.DEFAULT_GROUP_SIZE})")
+    parser.add_argument("--group-delay", type = float, default = journal.DEFAULT_GROUP_DELAY,
+        help = f"most seconds a burger waits to be written to the journal (default: {journal.DEFAULT_GROUP_DELAY})")
+    options = parser.parse_args()
+
+    if options.group_delay <= 0:
+        print("The group delay must be more than 0 seconds")
+        exit()
+
+    order_journal = None
+    if options.journal != None:
+        order_journal = journal.OrderJournal(options.journal, options.sync, options.group_size, options.group_delay)
+        if order_journal.recovered_bytes:
+            print(f"Removed an unfinished order ({order_journal.recovered_bytes} bytes) from the end of the journal")
+
+    try:
+        asyncio.run(run_server(options.host, options.port, options.unix, order_journal))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if order_journal != None:
+            order_journal.close()
@@ -0,0 +1,194 @@
+"""
+Generates load for kiosk.py and measures how quickly it answers.
+
+Many kiosk customers are simulated at once, each connecting, ordering a few
+random burgers and sometimes giving an answer which isn't valid first.
+Customers arrive at random times during the ramp up, and each waits a short
+random time before each answer, as a person would, so all of the sessions
+are in progress together. The time between sending each answer and
+receiving the whole reply is recorded for each question, and each session's
+total cost is checked against the prices in burger.py.
+
+At the end, prints the median (p50) and 99th percentile (p99) reply times
+for each question.
+
+Usage:
+python3 kiosk_load.py --port 8766 --sessions 5000 --ramp 2 --think 0.5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from burger import (
+    available_buns, available_sauces, burger_from_fields, indent_three, max_filling, min_filling,
+    salad_choices, total_cost)
+from kiosk import BURGER_STEPS
+
+PROMPT_START = f"{indent_three}Please".encode()  # Every prompt starts with this
+BAD_ANSWERS = {
+    "bun" : "gf",
+    "sauce" : "bbq",
+    "patties" : str(max_filling + 1),
+    "cheese" : "two",
+    "tomato" : "y",
+    "lettuce" : "n",
+    "onion" : "",
+}
+
+async def connect(host, port, unix_path):
+    """Open a connection to the kiosk server.
+
+    Returns:
+    tuple -- (asyncio.StreamReader, asyncio.StreamWriter)
+    """
+    if unix_path != None:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+async def read_reply(reader):
+    """Read one whole reply, which ends with a prompt or when the session closes.
+
+    Arguments:
+    reader -- asyncio.StreamReader for the connection
+
+    Returns:
+    bytes -- The reply
+    """
+    reply = b""
+    while True:
+        try:
+            reply += await reader.readuntil(b": ")
+        except asyncio.IncompleteReadError as error:
+            return reply + error.partial  # The order is finished and the session closed.
+
+        if reply.rsplit(b"\n", 1)[-1].startswith(PROMPT_START):
+            return reply
+
+def random_burger(chooser):
+    """Choose the 7 answers for one burger.
+
+    Arguments:
+    chooser -- random.Random to choose with
+
+    Returns:
+    list -- The answers as Strings, in the order of BURGER_STEPS
+    """
+    return [
+        chooser.choice(available_buns),
+        chooser.choice(available_sauces),
+        str(chooser.randint(min_filling, max_filling)),
+        str(chooser.randint(min_filling, max_filling)),
+        chooser.choice(salad_choices),
+        chooser.choice(salad_choices),
+        chooser.choice(salad_choices),
+    ]
+
+async def run_session(connection, seed, max_order, mistake_rate, ramp_time, think_time, latencies):
+    """Place one order as a simulated customer, recording how long each reply takes.
+
+    Arguments:
+    connection -- Function which opens a connection to the server
+    seed -- Seed for choosing answers, so each run gives the same answers
+    max_order -- Most burgers to order
+    mistake_rate -- Chance of giving an answer which isn't valid before each valid one
+    ramp_time -- Most seconds to wait before connecting
+    think_time -- Most seconds to wait before each answer
+    latencies -- dictionary of question name to a list of reply times, added to
+
+    Returns:
+    bool -- True if the order finished with the right total cost
+    """
+    chooser = random.Random(seed)
+    burgers = [random_burger(chooser) for burger in range(chooser.randint(1, max_order))]
+    answers = [("burgers", str(len(burgers)))]
+    for burger in burgers:
+        answers += [(name, answer) for (name, question), answer in zip(BURGER_STEPS, burger)]
+
+    await asyncio.sleep(chooser.uniform(0, ramp_time))
+    start = time.perf_counter()
+    reader, writer = await connection()
+    await read_reply(reader)
+    latencies.setdefault("welcome", []).append(time.perf_counter() - start)
+
+    for name, answer in answers:
+        tries = [answer]
+        if name != "burgers" and chooser.random() < mistake_rate:
+            tries.insert(0, BAD_ANSWERS[name])
+
+        for text in tries:
+            await asyncio.sleep(chooser.uniform(0, think_time))
+            start = time.perf_counter()
+            writer.write((text + "\n").encode())
+            reply = await read_reply(reader)
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+    writer.close()
+
+    expected = total_cost([burger_from_fields(burger, number) for number, burger in enumerate(burgers, 1)])
+    return f"The total cost for all burgers is ${expected}\n".encode() in reply
+
+def percentile(values, fraction):
+    """Find a percentile of a list of numbers.
+
+    Arguments:
+    values -- list of numbers
+    fraction -- Percentile as a fraction, such as 0.99
+
+    Returns:
+    float -- The value at that percentile, or 0 if there are no values
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+async def run_load(host, port, unix_path, sessions, max_order, mistake_rate, ramp_time, think_time):
+    """Run the simulated customers at once, then print the results.
+
+    Arguments:
+    host -- Server address
+    port -- Server port
+    unix_path -- Unix socket to connect to instead, if given
+    sessions -- Number of customers ordering at once
+    max_order -- Most burgers each customer orders
+    mistake_rate -- Chance of each answer being wrong the first time
+    ramp_time -- Seconds over which the customers arrive
+    think_time -- Most seconds each customer waits before answering
+    """
+    connection = lambda: connect(host, port, unix_path)
+    latencies = {}
+
+    start = time.perf_counter()
+    correct = await asyncio.gather(*[
+        run_session(connection, seed, max_order, mistake_rate, ramp_time, think_time, latencies) for seed in range(sessions)])
+    seconds = time.perf_counter() - start
+
+    replies = sum(len(times) for times in latencies.values())
+    print(f"{sessions} sessions finished in {seconds:.2f}s, {replies / seconds:,.0f} replies/s")
+    if not all(correct):
+        print(f"{correct.count(False)} sessions had the wrong total cost")
+
+    print("Reply time for each question:")
+    for name in ["welcome", "burgers"] + [name for name, question in BURGER_STEPS]:
+        times = latencies.get(name, [])
+        print(f"    {name:<8} {len(times):>7} replies  "
+            f"p50 {percentile(times, 0.5) * 1000:.2f}ms  p99 {percentile(times, 0.99) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Generate load for kiosk.py.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "server address (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 8766, help = "server port (default: 8766)")
+    parser.add_argument("--unix", help = "connect to this Unix socket instead of TCP")
+    parser.add_argument("--sessions", type = int, default = 2000, help = "number of customers ordering at once")
+    parser.add_argument("--burgers", type = int, default = 3, help = "most burgers in each order (default: 3)")
+    parser.add_argument("--mistakes", type = float, default = 0.05,
+        help = "chance of each answer being wrong the first time (default: 0.05)")
+    parser.add_argument("--ramp", type = float, default = 1.0, help = "seconds over which customers arrive (default: 1)")
+    parser.add_argument("--think", type = float, default = 0.2, help = "most seconds before each answer (default: 0.2)")
+    options = parser.parse_args()
+
+    asyncio.run(run_load(options.host, options.port, options.unix, options.sessions, options.burgers,
+        options.mistakes, options.ramp, options.think))
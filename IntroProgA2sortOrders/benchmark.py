@@ -0,0 +1,152 @@
+"""
+Measures how quickly orders.py can read large order files.
+
+A temporary file is created by repeating the lines of orders.txt, and each
+way of reading it is timed. A binary copy of the file is also made with
+columnar.py, so loading the binary format can be compared with the text
+readers. The number of lines read per second is printed for each, along
+with how many times faster it is than read_file_and_process().
+Compressed copies are read too, to compare reading gzip, bz2 and xz files
+with reading plain text.
+
+Usage:
+python3 benchmark.py --lines 1000000
+"""
+
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import time
+
+import orders
+from columnar import convert_text_to_binary, count_binary
+from fast_parser import read_file_mmap
+from order_codes import OrderCounter, read_file_codes
+
+def create_test_file(filename, number_of_lines):
+    """Writes a file containing the orders.txt lines repeated.
+
+    Arguments:
+    filename -- The file to create
+    number_of_lines -- How many orders to write
+    """
+    with open(orders.ORDERS_FILENAME) as file:
+        sample_lines = [line.strip() + "\n" for line in file if line.strip()]
+
+    repeats, remainder = divmod(number_of_lines, len(sample_lines))
+    with open(filename, "w") as file:
+        for i in range(repeats):
+            file.writelines(sample_lines)
+        file.writelines(sample_lines[:remainder])
+
+def read_file_as_codes(filename):
+    """Counts the file by order code, then copies the counts to order_frequency.
+
+    Arguments:
+    filename -- The file to read
+    """
+    counter = OrderCounter()
+    read_file_codes(filename, counter)
+    orders.order_frequency.update(counter.to_frequency())
+
+def read_binary_copy(filename):
+    """Counts the binary copy of the file, then copies the counts to order_frequency.
+
+    Arguments:
+    filename -- The text file, whose binary copy has the same name followed by ".ctbo"
+    """
+    counter = OrderCounter()
+    count_binary(filename + ".ctbo", counter)
+    orders.order_frequency.update(counter.to_frequency())
+
+def write_compressed_copies(filename):
+    """Writes gzip, bz2 and xz copies of a file, named with .gz, .bz2 and .xz added.
+
+    Arguments:
+    filename -- The file to copy
+    """
+    for module, suffix in (gzip, ".gz"), (bz2, ".bz2"), (lzma, ".xz"):
+        with open(filename, "rb") as file, module.open(filename + suffix, "wb") as compressed_file:
+            shutil.copyfileobj(file, compressed_file)
+
+def compressed_reader(read_function, suffix):
+    """Makes a reader which reads the compressed copy of the file instead.
+
+    Arguments:
+    read_function -- Reader to use
+    suffix -- ".gz", ".bz2" or ".xz"
+
+    Returns:
+    function -- Taking the plain text filename, like the other readers
+    """
+    return lambda filename: read_function(filename + suffix)
+
+def time_reader(read_function, filename):
+    """Times one full read of the file, starting from an empty order_frequency.
+
+    Arguments:
+    read_function -- Function which reads the file into order_frequency
+    filename -- The file to read
+
+    Returns:
+    float -- Time taken in seconds
+    """
+    orders.order_frequency.clear()
+    start = time.perf_counter()
+    read_function(filename)
+    return time.perf_counter() - start
+
+def run_benchmarks(number_of_lines):
+    """Times each reader on a test file and prints the results.
+
+    Arguments:
+    number_of_lines -- How many orders to write to the test file
+    """
+    readers = [
+        ("read_file_and_process", orders.read_file_and_process),
+        ("read_file_distinct", orders.read_file_distinct),
+        ("read_file_mmap", read_file_mmap),
+        ("read_file_codes", read_file_as_codes),
+        ("count_binary", read_binary_copy),
+        ("read_file_and_process gzip", compressed_reader(orders.read_file_and_process, ".gz")),
+        ("read_file_and_process bz2", compressed_reader(orders.read_file_and_process, ".bz2")),
+        ("read_file_and_process xz", compressed_reader(orders.read_file_and_process, ".xz")),
+        ("read_file_codes gzip", compressed_reader(read_file_as_codes, ".gz")),
+        ("read_file_codes bz2", compressed_reader(read_file_as_codes, ".bz2")),
+        ("read_file_codes xz", compressed_reader(read_file_as_codes, ".xz")),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "orders.txt")
+        create_test_file(filename, number_of_lines)
+        convert_text_to_binary(filename, filename + ".ctbo")
+        write_compressed_copies(filename)
+
+        # count_binary() imports NumPy the first time it is called, so call it once before timing.
+        read_binary_copy(filename)
+
+        baseline = None
+        expected_frequency = None
+        for name, read_function in readers:
+            seconds = time_reader(read_function, filename)
+
+            if expected_frequency == None:
+                expected_frequency = dict(orders.order_frequency)
+            elif orders.order_frequency != expected_frequency:
+                print(f"{name} gave different results to read_file_and_process")
+
+            if baseline == None:
+                baseline = seconds
+            print(f"{name:<28}{seconds:8.3f}s{number_of_lines / seconds:14,.0f} lines/s{baseline / seconds:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Time the ways orders.py can read a file.")
+    parser.add_argument("--lines", type = int, default = 1000000, help = "number of orders in the test file")
+    options = parser.parse_args()
+
+    run_benchmarks(options.lines)
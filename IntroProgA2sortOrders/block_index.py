@@ -0,0 +1,213 @@
+"""
+Re-reads only the parts of an order file which have changed since the last run.
+
+The file is split into blocks with a fixed number of lines. A sidecar index
+file saved next to the order file holds a checksum of each block, and the
+frequency of each order within that block. On the next run each block's
+checksum is compared with the index, and only blocks which have changed are
+converted again. The totals are then updated by subtracting the counts of
+blocks which are no longer in the file and adding the counts of new blocks.
+
+Blocks hold a fixed number of lines rather than bytes, so fixing a bad line
+only changes its own block, even when the fix changes the length of the line.
+
+If the file's size and modification time haven't changed since the index was
+saved, the saved totals are used straight away without reading the file.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from itertools import islice
+
+import metrics
+from order_codes import decode_order, encode_order
+from orders import invalidate_ranking, order_frequency, process_chunk
+
+BLOCK_LINES = 100000
+INDEX_SUFFIX = ".blocks.json"
+
+def scan_blocks(filename, block_lines=BLOCK_LINES):
+    """Find the byte range and checksum of every block in a file.
+
+    Arguments:
+    filename -- The order file to split into blocks
+    block_lines -- Number of lines in each block
+
+    Returns:
+    list -- (start, end, checksum) for each block, in file order
+    """
+    blocks = []
+    start = 0
+
+    with open(filename, "rb") as file:
+        while True:
+            data = b"".join(islice(file, block_lines))
+            if not data:
+                break
+
+            checksum = hashlib.blake2b(data, digest_size = 16).hexdigest()
+            blocks.append((start, start + len(data), checksum))
+            start += len(data)
+
+    return blocks
+
+def load_index(index_filename):
+    """Read a sidecar index saved by save_index().
+
+    Arguments:
+    index_filename -- The index file
+
+    Returns:
+    dict -- The saved index
+    None -- If there is no index, or it can't be read
+    """
+    try:
+        with open(index_filename) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def save_index(index_filename, index):
+    """Save a sidecar index, replacing the old one in a single step.
+
+    Arguments:
+    index_filename -- The index file
+    index -- dictionary to save
+    """
+    temporary_filename = index_filename + ".tmp"
+    with open(temporary_filename, "w") as file:
+        json.dump(index, file)
+    os.replace(temporary_filename, index_filename)
+
+def add_counts(totals, counts, sign=1):
+    """Add (or subtract) a block's order code counts to a set of totals.
+
+    Arguments:
+    totals -- dictionary of order codes mapped to frequencies, changed in place
+    counts -- list of [code, frequency] pairs, as saved in the index
+    sign -- 1 to add the counts, or -1 to subtract them
+    """
+    for code, frequency in counts:
+        totals[code] = totals.get(code, 0) + sign * frequency
+        if totals[code] == 0:
+            del totals[code]
+
+def read_file_incremental(filename, index_filename=None, block_lines=BLOCK_LINES, frequency=None):
+    """Add the orders in a file to order_frequency, only converting changed blocks.
+
+    Errors are reported with the same messages and line numbers as
+    read_file_and_process(). Before exiting on an error, every valid block
+    is still saved to the index, so after the bad lines are fixed only their
+    blocks need to be converted again.
+
+    Arguments:
+    filename -- The file to read orders from
+    index_filename -- The sidecar index file. Defaults to the order filename
+    followed by INDEX_SUFFIX.
+    block_lines -- Number of lines in each block
+    frequency -- Dictionary to add the orders to. Defaults to order_frequency.
+
+    Returns:
+    tuple -- (blocks converted, total blocks)
+    """
+    if index_filename == None:
+        index_filename = filename + INDEX_SUFFIX
+    if frequency == None:
+        frequency = order_frequency
+
+    try:
+        status = os.stat(filename)
+        index = load_index(index_filename)
+
+        if index != None and index.get("block_lines") != block_lines:
+            index = None  # Blocks of a different size can't be reused.
+
+        if index != None and index.get("size") == status.st_size \
+                and index.get("modified_time") == status.st_mtime_ns and "totals" in index:
+            for code, count in index["totals"]:
+                order = decode_order(code)
+                frequency[order] = frequency.get(order, 0) + count
+            invalidate_ranking()
+            return 0, len(index["blocks"])
+
+        # Checksumming the blocks reads the whole file. Converting the changed blocks is timed by process_chunk().
+        with metrics.stage("read", bytes = status.st_size):
+            blocks = scan_blocks(filename, block_lines)
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
+
+    if index == None:
+        index = {"blocks" : [], "totals" : []}
+
+    # Saved blocks by checksum, and how many times each checksum appeared.
+    saved_blocks = {block["checksum"] : block for block in index["blocks"]}
+    unmatched = Counter(block["checksum"] for block in index["blocks"])
+
+    # Without saved totals (after an error) they are rebuilt from the saved blocks.
+    if "totals" in index:
+        totals = {code : count for code, count in index["totals"]}
+    else:
+        totals = {}
+        for block in index["blocks"]:
+            add_counts(totals, block["orders"])
+
+    new_blocks = []
+    converted = 0
+    first_error = None
+    lines_before_block = 0
+
+    for start, end, checksum in blocks:
+        if unmatched[checksum] > 0:
+            unmatched[checksum] -= 1
+            block = saved_blocks[checksum]
+        else:
+            converted += 1
+            partial_frequency, line_count, error_line, error_message = process_chunk((filename, start, end))
+
+            if error_line != None:
+                if first_error == None:
+                    first_error = (lines_before_block + error_line, error_message)
+                lines_before_block += block_lines  # Lines after the error weren't counted.
+                continue
+
+            block = {
+                "checksum" : checksum,
+                "lines" : line_count,
+                "orders" : [[encode_order(order), count] for order, count in partial_frequency.items()]
+            }
+            add_counts(totals, block["orders"])
+
+        new_blocks.append(block)
+        lines_before_block += block["lines"]
+
+    # Saved blocks which are no longer in the file.
+    for checksum, remaining in unmatched.items():
+        for i in range(remaining):
+            add_counts(totals, saved_blocks[checksum]["orders"], -1)
+
+    new_index = {"block_lines" : block_lines, "blocks" : new_blocks}
+
+    if first_error != None:
+        save_index(index_filename, new_index)
+        print(first_error[1], end = "")
+        print(f"The error occurred in line {first_error[0]} of the text file")
+        exit()
+
+    new_index["size"] = status.st_size
+    new_index["modified_time"] = status.st_mtime_ns
+    new_index["totals"] = [[code, count] for code, count in totals.items()]
+    save_index(index_filename, new_index)
+
+    for code, count in totals.items():
+        order = decode_order(code)
+        frequency[order] = frequency.get(order, 0) + count
+    invalidate_ranking()
+
+    return converted, len(blocks)
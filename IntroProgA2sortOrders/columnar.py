@@ -0,0 +1,316 @@
+"""
+A compact binary file format for burger orders, and a fast loader for it.
+
+A text order such as "milk,tomato,2,1,yes,no,no" takes about 25 bytes, and
+has to be parsed every time it is read. In the binary format each order is
+stored as its 10 bit order code (see order_codes.py) in a column of 16 bit
+integers, so each order takes 2 bytes and reading needs no parsing at all.
+
+File layout:
+
+    bytes 0-3       MAGIC
+    bytes 4-4095    JSON header, padded with spaces
+    bytes 4096-     one little endian 16 bit order code per order
+
+The header records the format version, the number of orders, the bit layout
+of the code column, and the version of the prices in use when the file was
+written (see codetown/pricing.py).
+
+Usage:
+python3 columnar.py convert orders.txt orders.ctbo
+python3 columnar.py to-text orders.ctbo orders_copy.txt
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import Counter
+
+import metrics
+from compressed import open_order_file
+from order_codes import CODE_SPACE_SIZE, MAX_CONVERTED_LINES, ORDERS_BY_CODE, convert_bytes_to_code
+from codetown import pricing  # orders.py adds the codetown folder to sys.path, so must be imported first
+
+MAGIC = b"CTBO"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4096
+WRITE_BATCH_SIZE = 1 << 16  # Orders converted before each write
+
+# Describes the code column, so the file can be read without this program.
+SCHEMA = {
+    "column" : "code",
+    "type" : "uint16",
+    "byte_order" : "little",
+    "fields" : [
+        {"name" : "bun", "bits" : [9, 9], "values" : ["gluten free", "milk"]},
+        {"name" : "sauce", "bits" : [7, 8], "values" : ["barbecue", "none", "tomato"]},
+        {"name" : "patties", "bits" : [5, 6]},
+        {"name" : "cheese", "bits" : [3, 4]},
+        {"name" : "tomato", "bits" : [2, 2]},
+        {"name" : "lettuce", "bits" : [1, 1]},
+        {"name" : "onion", "bits" : [0, 0]}
+    ]
+}
+
+def write_header(file, row_count):
+    """Write the magic bytes and header at the start of a binary order file.
+
+    Arguments:
+    file -- Binary file open for writing
+    row_count -- Number of orders in the file
+    """
+    header = json.dumps({
+        "format_version" : FORMAT_VERSION,
+        "row_count" : row_count,
+        "price_version" : pricing.price_table.version,
+        "schema" : SCHEMA
+    }).encode()
+
+    file.seek(0)
+    file.write(MAGIC + header.ljust(HEADER_SIZE - len(MAGIC)))
+
+def read_header(buffer):
+    """Read the header of a binary order file.
+
+    Arguments:
+    buffer -- The file contents, or at least the first HEADER_SIZE bytes
+
+    Returns:
+    dict -- The header
+    None -- If the file isn't a binary order file this program can read
+    """
+    if buffer[:len(MAGIC)] != MAGIC:
+        return None
+
+    try:
+        header = json.loads(bytes(buffer[len(MAGIC):HEADER_SIZE]))
+    except ValueError:
+        return None
+
+    if header.get("format_version") != FORMAT_VERSION:
+        return None
+    return header
+
+def convert_text_to_binary(text_filename, binary_filename):
+    """Convert a text order file to the binary format.
+
+    Lines are checked in the same way as read_file_and_process(). If a line
+    isn't valid, the error is reported with its line number, the partly
+    written binary file is removed, and the program exits.
+
+    The binary format only stores the order codes, so files where orders
+    have the optional timestamp are refused in the same way, rather than
+    losing the timestamps.
+
+    Arguments:
+    text_filename -- The text file to read orders from
+    binary_filename -- The binary file to create
+
+    Returns:
+    int -- Number of orders written
+    """
+    converted_lines = {}
+    codes = array("H")
+    row_count = 0
+
+    try:
+        with open_order_file(text_filename, "rb") as text_file, open(binary_filename, "wb") as binary_file:
+            write_header(binary_file, 0)
+
+            for line in text_file:
+                code = converted_lines.get(line)
+
+                if code == None:
+                    code = convert_bytes_to_code(line)
+
+                    if code == None or line.count(b",") == 7:
+                        if code != None:
+                            print("The binary format can't store the time of each order")
+                        print(f"The error occurred in line {row_count + len(codes) + 1} of the text file")
+                        binary_file.close()
+                        os.remove(binary_filename)
+                        exit()
+
+                    if len(converted_lines) < MAX_CONVERTED_LINES:
+                        converted_lines[line] = code
+
+                codes.append(code)
+                if len(codes) == WRITE_BATCH_SIZE:
+                    row_count += write_codes(binary_file, codes)
+
+            row_count += write_codes(binary_file, codes)
+            write_header(binary_file, row_count)
+
+    except PermissionError:
+        print("You don't have permission to open this file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
+
+    return row_count
+
+def write_codes(file, codes):
+    """Write a batch of codes to the end of a binary order file and empty the batch.
+
+    Arguments:
+    file -- Binary file open for writing
+    codes -- array of order codes
+
+    Returns:
+    int -- Number of codes written
+    """
+    count = len(codes)
+    if sys.byteorder == "big":
+        codes.byteswap()
+
+    file.seek(0, os.SEEK_END)
+    codes.tofile(file)
+    del codes[:]
+    return count
+
+def open_binary(binary_filename):
+    """Memory-map a binary order file.
+
+    Reports an error and exits if the file can't be opened or isn't in the
+    binary format.
+
+    Arguments:
+    binary_filename -- The binary file to open
+
+    Returns:
+    tuple -- (header, codes, buffer) where codes is a memoryview of the
+    code column, and buffer is the mmap, which should be closed when finished
+    """
+    try:
+        with open(binary_filename, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    except PermissionError:
+        print("You don't have permission to open this file")
+        exit()
+    except FileNotFoundError:
+        print("Binary file can't be found")
+        exit()
+    except ValueError:
+        print("The binary file is empty")
+        exit()
+
+    header = read_header(buffer)
+    if header == None or len(buffer) != HEADER_SIZE + 2 * header["row_count"]:
+        buffer.close()
+        print("The file isn't a complete binary order file")
+        exit()
+
+    codes = memoryview(buffer)[HEADER_SIZE:]
+    if sys.byteorder == "big":
+        # Only needed on big endian computers. Copies the column instead of mapping it.
+        swapped = array("H", codes)
+        swapped.byteswap()
+        codes = memoryview(swapped)
+    else:
+        codes = codes.cast("H")
+
+    return header, codes, buffer
+
+def count_codes(codes):
+    """Count how many times each code appears in the code column of a binary order file.
+
+    The column is counted in one step, either with numpy.bincount() or with
+    collections.Counter if NumPy isn't installed, so there is no Python loop
+    for each order. If any code isn't a valid order, such as in a damaged
+    file, prints an error and exits the program.
+
+    Arguments:
+    codes -- memoryview of the code column, returned by open_binary()
+
+    Returns:
+    dict -- Each code in the column mapped to the number of times it appears
+    """
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    if numpy != None:
+        totals = numpy.bincount(numpy.frombuffer(codes, dtype=numpy.uint16), minlength=CODE_SPACE_SIZE)
+        code_totals = {int(code) : int(totals[code]) for code in numpy.flatnonzero(totals)}
+    else:
+        code_totals = Counter(codes)
+
+    for code in code_totals:
+        # Codes above 1023 don't fit the layout, and codes with the unused sauce value 3 aren't orders.
+        if code >= CODE_SPACE_SIZE or ORDERS_BY_CODE[code] == None:
+            print(f"The binary file has the order code {code}, which isn't a valid order")
+            exit()
+
+    return code_totals
+
+def count_binary(binary_filename, counter):
+    """Add the orders in a binary order file to an OrderCounter.
+
+    The file is checked by count_codes() before any orders are added, so a
+    damaged file is rejected without changing the counter.
+
+    Arguments:
+    binary_filename -- The binary file to read
+    counter -- OrderCounter to add the orders to
+
+    Returns:
+    dict -- The file's header
+    """
+    header, codes, buffer = open_binary(binary_filename)
+
+    # The codes need no reading or parsing, as the file is mapped, so counting is the only stage.
+    with metrics.stage("count", header["row_count"], len(buffer)):
+        for code, total in count_codes(codes).items():
+            counter.counts[code] += total
+
+    counter.invalidate_ranking()
+    codes.release()
+    buffer.close()
+    return header
+
+def convert_binary_to_text(binary_filename, text_filename):
+    """Write the orders in a binary order file back out as text.
+
+    Arguments:
+    binary_filename -- The binary file to read
+    text_filename -- The text file to create
+
+    Returns:
+    int -- Number of orders written
+    """
+    header, codes, buffer = open_binary(binary_filename)
+    count_codes(codes)  # Only checks every code is a valid order, before any lines are written.
+
+    lines = [None] * CODE_SPACE_SIZE
+    for code in range(CODE_SPACE_SIZE):
+        order = ORDERS_BY_CODE[code]
+        if order != None:
+            fields = [str(field) for field in order[:4]] + ["yes" if field else "no" for field in order[4:]]
+            lines[code] = ",".join(fields) + "\n"
+
+    with open(text_filename, "w") as file:
+        for start in range(0, len(codes), WRITE_BATCH_SIZE):
+            file.writelines([lines[code] for code in codes[start:start + WRITE_BATCH_SIZE]])
+
+    codes.release()
+    buffer.close()
+    return header["row_count"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Convert order files to and from the binary format.")
+    parser.add_argument("command", choices = ["convert", "to-text"])
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    options = parser.parse_args()
+
+    if options.command == "convert":
+        row_count = convert_text_to_binary(options.source, options.destination)
+    else:
+        row_count = convert_binary_to_text(options.source, options.destination)
+    print(f"{row_count} orders written to {options.destination}")
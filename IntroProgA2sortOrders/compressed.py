@@ -0,0 +1,126 @@
+"""
+Opens order files which may be compressed with gzip, bz2 or xz.
+
+Compressed files are recognised by the first few bytes of the file rather
+than by their name, and are decompressed as they are read, in large chunks,
+so they never need to be decompressed to disk first. Only the standard
+library is used, and the decompression modules are only imported when a
+compressed file is found.
+"""
+
+import importlib
+import io
+import mmap
+from contextlib import contextmanager
+
+# The first bytes of each kind of compressed file, and the name of the module which reads it.
+MAGIC_NUMBERS = [
+    (b"\x1f\x8b", "gzip", "gzip"),
+    (b"BZh", "bz2", "bz2"),
+    (b"\xfd7zXZ\x00", "xz", "lzma"),
+]
+MAGIC_LENGTH = max(len(magic) for magic, name, module_name in MAGIC_NUMBERS)
+READ_SIZE = 1 << 20  # Decompressed bytes read at a time
+COMPRESSED_SUFFIXES = [".gz", ".bz2", ".xz"]
+
+def detect_compression(start):
+    """Finds which compression a file uses from its first bytes.
+
+    Arguments:
+    start -- The first MAGIC_LENGTH bytes of the file
+
+    Returns:
+    String -- "gzip", "bz2" or "xz"
+    None -- If the file isn't compressed
+    """
+    for magic, name, module_name in MAGIC_NUMBERS:
+        if start.startswith(magic):
+            return name
+
+    return None
+
+def compression_type(filename):
+    """Finds which compression a file uses.
+
+    Arguments:
+    filename -- The file to check
+
+    Returns:
+    String -- "gzip", "bz2" or "xz"
+    None -- If the file isn't compressed
+    """
+    with open(filename, "rb") as file:
+        return detect_compression(file.read(MAGIC_LENGTH))
+
+def decompressing_reader(filename, compression):
+    """Opens a compressed file so reading it gives the decompressed bytes.
+
+    The file is opened by name, so closing the reader also closes the file.
+
+    Arguments:
+    filename -- The compressed file
+    compression -- "gzip", "bz2" or "xz"
+
+    Returns:
+    io.BufferedReader -- Reads the decompressed bytes READ_SIZE at a time
+    """
+    for magic, name, module_name in MAGIC_NUMBERS:
+        if name == compression:
+            module = importlib.import_module(module_name)
+            return io.BufferedReader(module.open(filename, "rb"), READ_SIZE)
+
+def open_order_file(filename, mode="r"):
+    """Opens an order file for reading, decompressing it if needed.
+
+    Can be used in place of open() in a with statement.
+
+    Arguments:
+    filename -- The file to open
+    mode -- "r" for text or "rb" for bytes
+
+    Returns:
+    file -- The open file
+    """
+    compression = compression_type(filename)
+
+    if compression == None:
+        return open(filename, mode)
+
+    reader = decompressing_reader(filename, compression)
+    if mode == "rb":
+        return reader
+    return io.TextIOWrapper(reader)
+
+@contextmanager
+def open_byte_lines(filename):
+    """Opens an order file and gives its lines as bytes.
+
+    Plain files are memory-mapped, and compressed files are decompressed as
+    they are read. For use in a with statement:
+
+        with open_byte_lines(filename) as lines:
+            for line in lines:
+                ...
+
+    Arguments:
+    filename -- The file to read
+
+    Yields:
+    iterator -- The file's lines as bytes, each ending in a newline except perhaps the last
+    """
+    with open(filename, "rb") as file:
+        compression = detect_compression(file.read(MAGIC_LENGTH))
+
+        if compression != None:
+            with decompressing_reader(filename, compression) as reader:
+                yield reader
+            return
+
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            yield iter([])  # An empty file can't be mapped, and has no lines.
+            return
+
+        with buffer:
+            yield iter(buffer.readline, b"")
@@ -0,0 +1,192 @@
+"""
+Totals how much of each ingredient the orders need, calculated with NumPy.
+
+Every order code (see order_codes.py) has an ingredient vector: how many
+buns of each kind, serves of each sauce, patties, cheese slices and serves
+of each salad item one burger uses. The vectors are stored as the rows of
+INGREDIENT_MATRIX, built once when this module is imported, so the demand
+for any set of orders is the vector of how often each code was ordered
+multiplied by the matrix. This takes the same time however many orders
+there were, as there are only 1024 codes.
+
+DemandTracker keeps running totals for a live stream of orders, such as the
+orders arriving at order_server.py. Adding an order only adds one to its
+code's count, and the counts are multiplied by the matrix and added to the
+totals when the totals are next read, so a kitchen screen can show the
+current demand at any time without going back over earlier orders.
+
+Requires NumPy:
+pip install numpy
+"""
+
+from array import array
+
+import numpy
+
+from order_codes import CODE_SPACE_SIZE, ORDERS_BY_CODE, encode_order
+
+INGREDIENTS = [
+    "milk buns", "gluten free buns", "tomato sauce", "barbecue sauce",
+    "patties", "cheese slices", "tomato", "lettuce", "onion",
+]
+
+def ingredient_vector(order):
+    """How much of each ingredient one burger uses.
+
+    Arguments:
+    order -- tuple in the format returned by convert_to_tuple()
+
+    Returns:
+    list -- The amount of each ingredient, in the order of INGREDIENTS
+    """
+    bun, sauce, patties, cheese, tomato, lettuce, onion = order
+    return [
+        int(bun == "milk"), int(bun == "gluten free"), int(sauce == "tomato"), int(sauce == "barbecue"),
+        patties, cheese, int(tomato), int(lettuce), int(onion),
+    ]
+
+def build_ingredient_matrix():
+    """Creates the ingredient vector of every order code.
+
+    Returns:
+    numpy.ndarray -- One row for each code, and one column for each ingredient.
+    Codes which aren't valid orders have a row of zeros.
+    """
+    matrix = numpy.zeros((CODE_SPACE_SIZE, len(INGREDIENTS)), dtype=numpy.int64)
+    for code, order in enumerate(ORDERS_BY_CODE):
+        if order != None:
+            matrix[code] = ingredient_vector(order)
+
+    return matrix
+
+INGREDIENT_MATRIX = build_ingredient_matrix()
+VALID_CODE_MASK = numpy.array([order != None for order in ORDERS_BY_CODE])  # True for each code which is a valid order
+
+def label_demand(totals):
+    """Names each total in an array of ingredient totals.
+
+    Arguments:
+    totals -- array with one total for each ingredient
+
+    Returns:
+    dict -- Each ingredient in INGREDIENTS mapped to its total
+    """
+    return {ingredient : int(total) for ingredient, total in zip(INGREDIENTS, totals)}
+
+def demand_from_counts(counts):
+    """Calculate the ingredients needed for the number of orders of each code.
+
+    Arguments:
+    counts -- array of how many times each code was ordered, indexed by code
+
+    Returns:
+    dict -- Each ingredient mapped to the total amount needed
+    """
+    return label_demand(numpy.asarray(counts, dtype=numpy.int64) @ INGREDIENT_MATRIX)
+
+def demand_from_counter(counter):
+    """Calculate the ingredients needed for the orders in an OrderCounter.
+
+    Arguments:
+    counter -- OrderCounter holding the frequency of each code
+
+    Returns:
+    dict -- Each ingredient mapped to the total amount needed
+    """
+    return demand_from_counts(numpy.frombuffer(counter.counts, dtype=numpy.int64))
+
+def demand_from_frequency(frequency):
+    """Calculate the ingredients needed for an order_frequency style dictionary.
+
+    Arguments:
+    frequency -- dictionary of order tuples mapped to their frequencies
+
+    Returns:
+    dict -- Each ingredient mapped to the total amount needed
+    """
+    codes = numpy.array([encode_order(order) for order in frequency], dtype=numpy.int64)
+    counts = numpy.fromiter(frequency.values(), dtype=numpy.int64, count=len(frequency))
+    return label_demand(counts @ INGREDIENT_MATRIX[codes])
+
+class DemandTracker:
+    """Running ingredient totals for a stream of orders.
+
+    Attributes:
+    totals -- numpy array of the ingredients needed by the orders included so far
+    pending -- array of how many times each code was ordered since totals was last updated
+    pending_view -- numpy array sharing pending's memory, so it can be multiplied without copying
+    orders -- Number of orders added, including those still pending
+
+    Methods:
+    add_order() -- Add an order tuple
+    add_code() -- Add an order by its code
+    add_codes() -- Add an array of order codes at once
+    demand() -- The ingredients needed by every order added so far
+
+    Adding a code which isn't a valid order raises ValueError, and nothing is added.
+    """
+
+    def __init__(self):
+        self.totals = numpy.zeros(len(INGREDIENTS), dtype=numpy.int64)
+        self.pending = array("q", bytes(8 * CODE_SPACE_SIZE))
+        self.pending_view = numpy.frombuffer(self.pending, dtype=numpy.int64)
+        self.orders = 0
+
+    def add_code(self, code, count=1):
+        """Add an order by its code.
+
+        Arguments:
+        code -- int code for the order
+        count -- Number of times it was ordered. A negative count takes cancelled orders away.
+        """
+        if not 0 <= code < CODE_SPACE_SIZE or ORDERS_BY_CODE[code] == None:
+            raise ValueError(f"{code} isn't the code of a valid order")
+
+        self.pending[code] += count
+        self.orders += count
+
+    def add_order(self, order, count=1):
+        """Add an order tuple.
+
+        Arguments:
+        order -- tuple in the format returned by convert_to_tuple()
+        count -- Number of times it was ordered. A negative count takes cancelled orders away.
+        """
+        self.add_code(encode_order(order), count)
+
+    def add_codes(self, codes):
+        """Add an array of order codes at once, such as the codes in a binary order file.
+
+        Arguments:
+        codes -- array of order codes, one for each order
+        """
+        codes = numpy.asarray(codes, dtype=numpy.int64)
+        if len(codes) and (codes.min() < 0 or codes.max() >= CODE_SPACE_SIZE or not VALID_CODE_MASK[codes].all()):
+            raise ValueError("Some of the codes aren't the codes of valid orders")
+
+        self.pending_view += numpy.bincount(codes, minlength=CODE_SPACE_SIZE)
+        self.orders += len(codes)
+
+    def demand(self):
+        """The ingredients needed by every order added so far.
+
+        The pending counts are multiplied by INGREDIENT_MATRIX, added to the
+        totals and cleared, so each order is only multiplied once.
+
+        Returns:
+        dict -- Each ingredient mapped to the total amount needed
+        """
+        self.totals += self.pending_view @ INGREDIENT_MATRIX
+        self.pending_view[:] = 0
+        return label_demand(self.totals)
+
+def display_demand(demand):
+    """Print the amount needed of each ingredient.
+
+    Arguments:
+    demand -- dictionary returned by demand_from_frequency() or DemandTracker.demand()
+    """
+    print("Ingredients needed:")
+    for ingredient, total in demand.items():
+        print(f"\t{ingredient:<18}{total}")
+    print()
@@ -0,0 +1,111 @@
+"""
+A faster way of reading burger order files for orders.py.
+
+The file is memory-mapped and each line is looked up as raw bytes, so lines
+never need to be decoded into Strings, split into lists or passed through the
+helper functions in orders.py. Only a small number of different orders can
+exist, so each valid line is converted once and the resulting tuple is reused
+for every later line with the same bytes.
+
+Any line which can't be converted by the fast lookups is passed to
+convert_to_tuple() instead, so the results and the error messages are
+exactly the same as read_file_and_process().
+"""
+
+import os
+
+import metrics
+from compressed import open_byte_lines
+from orders import AVAILABLE_BUNS, AVAILABLE_SAUCES, convert_to_tuple, invalidate_ranking, order_frequency
+
+# Byte values for each field mapped to the value convert_to_tuple() would give.
+BUN_VALUES = {bun.encode() : bun for bun in AVAILABLE_BUNS}
+SAUCE_VALUES = {sauce.encode() : sauce for sauce in AVAILABLE_SAUCES}
+AMOUNT_VALUES = {str(amount).encode() : amount for amount in range(4)}
+YES_NO_VALUES = {b"yes" : True, b"no" : False}
+
+# Raw lines (including their line ending) which have already been converted.
+# Only valid lines are stored, and valid orders only have a few spellings, so
+# the limit is rarely reached however large the file is.
+converted_lines = {}
+MAX_CONVERTED_LINES = 10000
+
+def convert_bytes_to_tuple(line):
+    """Converts one line of bytes to the same tuple convert_to_tuple() would give.
+
+    Looks each field up directly in the byte value dictionaries. If any field
+    isn't found, the line is decoded and passed to convert_to_tuple(), which
+    prints the usual error messages or handles unusual but valid spacing.
+
+    Arguments:
+    line -- bytes representing a single burger order
+
+    Returns:
+    tuple -- The order converted to a tuple
+    None -- If the order isn't valid
+    """
+    fields = line.strip().split(b",")
+
+    if len(fields) == 7:
+        try:
+            return (
+                BUN_VALUES[fields[0]],
+                SAUCE_VALUES[fields[1]],
+                AMOUNT_VALUES[fields[2]],
+                AMOUNT_VALUES[fields[3]],
+                YES_NO_VALUES[fields[4]],
+                YES_NO_VALUES[fields[5]],
+                YES_NO_VALUES[fields[6]])
+        except KeyError:
+            pass
+
+    # A line from another system may not be UTF-8. Replacing the bad bytes makes it an invalid order.
+    return convert_to_tuple(line.decode(errors = "replace"))
+
+def read_file_mmap(filename, frequency=None):
+    """Reads each line of a memory-mapped file and adds it to order_frequency.
+
+    Compressed files are decompressed as they are read instead of being mapped.
+
+    Gives the same results and error messages as read_file_and_process().
+    Lines are separated by "\\n" only, so files using a lone "\\r" as the
+    line ending should be read with read_file_and_process() instead.
+
+    Arguments:
+    filename -- The file to read orders from
+    frequency -- Dictionary to add the orders to. Defaults to order_frequency.
+    """
+    if frequency == None:
+        frequency = order_frequency
+
+    line_number = 0
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_bytes_to_tuple)
+
+    try:
+        with open_byte_lines(filename) as lines:
+            for line in timer.timed_lines(lines):
+                line_number += 1
+                order = converted_lines.get(line)
+
+                if order == None:
+                    order = convert(line)
+
+                    if order == None:
+                        print(f"The error occurred in line {line_number} of the text file")
+                        exit()
+
+                    if len(converted_lines) < MAX_CONVERTED_LINES:
+                        converted_lines[line] = order
+
+                frequency[order] = frequency.get(order, 0) + 1
+
+        timer.finish(line_number, os.path.getsize(filename), len(frequency))
+        invalidate_ranking()
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
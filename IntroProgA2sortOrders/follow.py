@@ -0,0 +1,278 @@
+"""
+Follows an order file which is still being written to, like "tail -f".
+
+The file is kept open, and only lines added since the last check are read
+and added to order_frequency, so each update takes time proportional to the
+new orders rather than the size of the file. After each update the byte
+offset, line number and order frequencies are saved to a checkpoint file, so
+a restarted program carries on from where it stopped instead of reading the
+whole file again.
+
+Log rotation is handled by checking whether the file name now refers to a
+different file. Any lines left in the old file are read first, then the new
+file is read from the beginning. If the file becomes shorter than the saved
+offset it is assumed to have been truncated, and is read again from the start.
+Frequencies are kept in both cases, since those orders were already counted.
+"""
+
+import json
+import os
+import time
+
+from fast_parser import convert_bytes_to_tuple
+from orders import invalidate_ranking, order_frequency
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+READ_SIZE = 1 << 22  # Bytes read from the file at a time
+
+def load_checkpoint(checkpoint_filename):
+    """Read a checkpoint saved by save_checkpoint().
+
+    Arguments:
+    checkpoint_filename -- The file the checkpoint was saved to
+
+    Returns:
+    dict -- The saved "device", "inode", "offset" and "line_number", and
+    "orders" as a dictionary of order tuples mapped to their frequencies
+    None -- If there is no checkpoint, or it can't be read
+    """
+    try:
+        with open(checkpoint_filename) as file:
+            checkpoint = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        print(f"The checkpoint file {checkpoint_filename} can't be read. Starting from the beginning.")
+        return None
+
+    # JSON can't store tuples, so each order is saved as a list with its frequency.
+    checkpoint["orders"] = {tuple(order) : frequency for order, frequency in checkpoint["orders"]}
+    return checkpoint
+
+def save_checkpoint(checkpoint_filename, follower):
+    """Save the position in the file and the current order frequencies.
+
+    The checkpoint is written to a temporary file which then replaces the
+    old checkpoint, so a crash while saving can't leave a half written file.
+
+    Arguments:
+    checkpoint_filename -- The file to save the checkpoint to
+    follower -- FileFollower whose position should be saved
+    """
+    checkpoint = {
+        "device" : follower.device,
+        "inode" : follower.inode,
+        "offset" : follower.offset,
+        "line_number" : follower.line_number,
+        "orders" : [[list(order), frequency] for order, frequency in follower.frequency.items()]
+    }
+
+    temporary_filename = checkpoint_filename + ".tmp"
+    with open(temporary_filename, "w") as file:
+        json.dump(checkpoint, file)
+    os.replace(temporary_filename, checkpoint_filename)
+
+
+class FileFollower:
+    """Reads the lines added to an order file since it was last read.
+
+    Attributes:
+    filename -- The order file being followed
+    frequency -- Dictionary the orders are added to
+    file -- The open file, or None if it hasn't been opened yet
+    device -- Device number of the open file, used to detect rotation
+    inode -- Inode number of the open file, used to detect rotation
+    offset -- Byte offset of the first line which hasn't been read yet
+    line_number -- Number of lines read from the current file
+    demand -- DemandTracker each order is also added to, or None
+
+    Methods:
+    restore() -- Carry on from a saved checkpoint
+    read_new_lines() -- Add any complete lines written since the last read
+    check_rotation() -- Switch files if the file was rotated or truncated
+    close() -- Close the file
+    """
+
+    def __init__(self, filename, frequency, demand=None):
+        """Set up a follower which starts at the beginning of the file.
+
+        Arguments:
+        filename -- The order file to follow
+        frequency -- Dictionary to add the orders to
+        demand -- Optional DemandTracker (see demand.py) to add each order to as well
+        """
+        self.filename = filename
+        self.frequency = frequency
+        self.demand = demand
+        self.file = None
+        self.device = None
+        self.inode = None
+        self.offset = 0
+        self.line_number = 0
+
+    def open(self):
+        """Open the file, if it exists yet.
+
+        Returns:
+        bool -- True if the file is open
+        """
+        if self.file == None:
+            try:
+                self.file = open(self.filename, "rb")
+            except FileNotFoundError:
+                return False
+
+            status = os.fstat(self.file.fileno())
+            self.device = status.st_dev
+            self.inode = status.st_ino
+
+        return True
+
+    def restore(self, checkpoint):
+        """Carry on from a saved checkpoint.
+
+        The saved frequencies are always restored. The saved offset is only
+        used if the file is the same one, and hasn't become shorter since.
+
+        Arguments:
+        checkpoint -- dictionary returned by load_checkpoint()
+        """
+        for order, frequency in checkpoint["orders"].items():
+            self.frequency[order] = self.frequency.get(order, 0) + frequency
+            if self.demand != None:
+                self.demand.add_order(order, frequency)
+        invalidate_ranking()
+
+        if not self.open():
+            return
+
+        same_file = checkpoint["device"] == self.device and checkpoint["inode"] == self.inode
+        if same_file and os.fstat(self.file.fileno()).st_size >= checkpoint["offset"]:
+            self.offset = checkpoint["offset"]
+            self.line_number = checkpoint["line_number"]
+
+    def read_new_lines(self):
+        """Add every complete line written since the last read to frequency.
+
+        A last line without a newline may still be being written, so it is
+        left until the newline arrives. Lines which can't be converted are
+        reported with their line number and skipped, so one bad line doesn't
+        stop a program which is meant to keep running.
+
+        Returns:
+        int -- Number of lines read
+        """
+        if not self.open():
+            return 0
+
+        lines_read = 0
+        while True:
+            self.file.seek(self.offset)
+            data = self.file.read(READ_SIZE)
+            end = data.rfind(b"\n") + 1
+            if end == 0:
+                break
+
+            for line in data[:end].splitlines(keepends=True):
+                self.line_number += 1
+                lines_read += 1
+                order = convert_bytes_to_tuple(line)
+
+                if order == None:
+                    print(f"The error occurred in line {self.line_number} of {self.filename}")
+                else:
+                    self.frequency[order] = self.frequency.get(order, 0) + 1
+                    if self.demand != None:
+                        self.demand.add_order(order)
+
+            self.offset += end
+
+        if lines_read > 0:
+            invalidate_ranking()
+        return lines_read
+
+    def check_rotation(self):
+        """Switch to reading from the start of the file if it was rotated or truncated.
+
+        Should only be called after read_new_lines() has found nothing new,
+        so that every line in a rotated file is read before it is closed.
+
+        Returns:
+        bool -- True if the file was rotated or truncated
+        """
+        if self.file == None:
+            return False
+
+        try:
+            status = os.stat(self.filename)
+        except FileNotFoundError:
+            return False  # Rotated away but not replaced yet. Keep waiting.
+
+        if status.st_dev != self.device or status.st_ino != self.inode:
+            self.close()
+            self.offset = 0
+            self.line_number = 0
+            return True
+
+        if status.st_size < self.offset:
+            self.offset = 0
+            self.line_number = 0
+            return True
+
+        return False
+
+    def close(self):
+        """Close the file."""
+        if self.file != None:
+            self.file.close()
+            self.file = None
+
+
+def follow_file(filename, checkpoint_filename=None, poll_interval=1.0, on_update=None, once=False,
+        frequency=None, demand=None):
+    """Keep adding orders to order_frequency as they are written to a file.
+
+    Runs until interrupted with Ctrl+C, saving a checkpoint after every
+    update and when stopped.
+
+    Arguments:
+    filename -- The order file to follow
+    checkpoint_filename -- File to save the checkpoint to. Defaults to the
+    order filename followed by CHECKPOINT_SUFFIX.
+    poll_interval -- Seconds to wait before checking for new lines again
+    on_update -- Optional function called with the number of new lines after each update
+    once -- If True, read any new lines and return instead of waiting for more
+    frequency -- Dictionary to add the orders to. Defaults to order_frequency.
+    demand -- Optional DemandTracker to add each order to as well, so the ingredient totals are kept up to date
+    """
+    if checkpoint_filename == None:
+        checkpoint_filename = filename + CHECKPOINT_SUFFIX
+    if frequency == None:
+        frequency = order_frequency
+
+    follower = FileFollower(filename, frequency, demand)
+    checkpoint = load_checkpoint(checkpoint_filename)
+    if checkpoint != None:
+        follower.restore(checkpoint)
+
+    try:
+        while True:
+            new_lines = follower.read_new_lines()
+
+            if new_lines == 0 and follower.check_rotation():
+                new_lines = follower.read_new_lines()
+
+            if new_lines > 0:
+                save_checkpoint(checkpoint_filename, follower)
+                if on_update != None:
+                    on_update(new_lines)
+
+            if once:
+                break
+            time.sleep(poll_interval)
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        save_checkpoint(checkpoint_filename, follower)
+        follower.close()
@@ -0,0 +1,107 @@
+"""
+Writes synthetic order files of any size, for testing and benchmarks.
+
+The same options always write the same file. Orders are drawn from all 768
+possible burgers, with the burgers ranked in a shuffled order and each one
+chosen in proportion to 1 / rank ** skew. A skew of 0 makes every burger
+equally likely, and larger skews make a few burgers far more popular than
+the rest, as in a real store. A fraction of the lines can be made bad, to
+test error handling.
+
+Usage:
+python3 generate_orders.py big_orders.txt --lines 10000000 --skew 1.2 --bad-rate 0.001
+"""
+
+import argparse
+import itertools
+import random
+
+from orders import AVAILABLE_BUNS, AVAILABLE_SAUCES
+
+CHUNK_LINES = 100000  # Lines chosen and written at a time
+
+# One bad line for each kind of mistake validation.py looks for.
+BAD_LINES = [
+    "milk,tomato,2,1,yes,no\n",
+    "brioche,tomato,2,1,yes,no,no\n",
+    "milk,mustard,2,1,yes,no,no\n",
+    "milk,tomato,two,1,yes,no,no\n",
+    "milk,tomato,2,7,yes,no,no\n",
+    "milk,tomato,2,1,maybe,no,no\n",
+]
+
+def all_order_lines():
+    """Every possible burger order, as a line of an order file.
+
+    Returns:
+    list -- 768 lines, each ending in a newline
+    """
+    yes_no = ["yes", "no"]
+    lines = []
+    for bun, sauce, patties, cheese, tomato, lettuce, onion in itertools.product(
+            AVAILABLE_BUNS, AVAILABLE_SAUCES, range(4), range(4), yes_no, yes_no, yes_no):
+        lines.append(f"{bun},{sauce},{patties},{cheese},{tomato},{lettuce},{onion}\n")
+
+    return lines
+
+def order_weights(lines, skew, seed):
+    """Ranks the lines in a random order, and gives each a weight of 1 / rank ** skew.
+
+    Arguments:
+    lines -- list of order lines
+    skew -- How strongly the top ranked lines are preferred
+    seed -- Seed for the random ranking
+
+    Returns:
+    tuple -- (lines in rank order, matching list of weights)
+    """
+    ranked_lines = list(lines)
+    random.Random(seed).shuffle(ranked_lines)
+    weights = [1 / rank ** skew for rank in range(1, len(ranked_lines) + 1)]
+    return ranked_lines, weights
+
+def generate_orders(filename, number_of_lines, skew=1.0, bad_rate=0.0, seed=0):
+    """Writes an order file.
+
+    Arguments:
+    filename -- The file to create
+    number_of_lines -- How many lines to write
+    skew -- How strongly popular burgers are preferred. 0 means every burger is equally likely.
+    bad_rate -- Fraction of lines, from 0 to 1, which should be bad
+    seed -- Different seeds give different files with the same options
+    """
+    lines, weights = order_weights(all_order_lines(), skew, seed)
+
+    # Bad lines share bad_rate of the total weight, and the good lines the rest.
+    good_total = sum(weights)
+    weights = [weight * (1 - bad_rate) / good_total for weight in weights]
+    if bad_rate > 0:
+        lines = lines + BAD_LINES
+        weights = weights + [bad_rate / len(BAD_LINES)] * len(BAD_LINES)
+    cumulative_weights = list(itertools.accumulate(weights))
+
+    chooser = random.Random(seed)
+    with open(filename, "w") as file:
+        for start in range(0, number_of_lines, CHUNK_LINES):
+            chunk_size = min(CHUNK_LINES, number_of_lines - start)
+            file.writelines(chooser.choices(lines, cum_weights = cumulative_weights, k = chunk_size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Write a synthetic order file.")
+    parser.add_argument("filename", help = "the file to write")
+    parser.add_argument("--lines", type = int, default = 1000000, help = "number of lines to write (default: 1000000)")
+    parser.add_argument(
+        "--skew", type = float, default = 1.0,
+        help = "how strongly popular burgers are preferred, where 0 makes every burger equally likely (default: 1)")
+    parser.add_argument(
+        "--bad-rate", type = float, default = 0.0,
+        help = "fraction of lines which are bad, from 0 to 1 (default: 0)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed for the random choices (default: 0)")
+    options = parser.parse_args()
+
+    if not 0 <= options.bad_rate <= 1:
+        print("The bad line rate must be between 0 and 1")
+        exit()
+
+    generate_orders(options.filename, options.lines, options.skew, options.bad_rate, options.seed)
@@ -0,0 +1,252 @@
+"""
+Finds the top orders approximately, using a fixed amount of memory.
+
+order_frequency keeps a count for every different order, which is fine for
+the 768 possible burgers but would grow without limit if orders had free
+text in them. SpaceSavingCounter instead keeps at most a fixed number of
+counters (the Space-Saving algorithm). When a new order arrives and every
+counter is in use, the order with the smallest count is replaced by the new
+one, and the new order takes over that count. The count it took over is
+remembered as its error.
+
+This gives these guarantees, where N is the number of orders read:
+- An order's estimate is never lower than its true count, and is at most
+  its error higher.
+- Every error is at most N / capacity.
+- Any order making up more than 1 / capacity of all orders is always kept.
+
+Running this file compares the approximate top orders with the exact ones:
+python3 heavy_hitters.py orders.txt --capacity 64 --top 10
+"""
+
+import argparse
+import heapq
+import os
+from operator import itemgetter
+
+import metrics
+from compressed import open_order_file
+from orders import ORDERS_FILENAME, convert_to_tuple
+
+class SpaceSavingCounter:
+    """Approximate frequency counter with a fixed number of counters.
+
+    Attributes:
+    capacity -- Most orders counted at once
+    counts -- dictionary of each counted order's estimated count
+    errors -- dictionary of how much each counted order's estimate may be too high
+    min_heap -- (count, order) for each counted order. Counts here may be out
+                of date, as they are only updated when the smallest is needed.
+    total -- Number of orders added
+
+    Methods:
+    add() -- Count one order
+    top_orders() -- The orders with the highest estimates
+    error_bound() -- The most any estimate can be too high
+    guaranteed() -- Whether an order is certain to be among the top orders
+    """
+
+    def __init__(self, capacity):
+        """Create an empty counter.
+
+        Arguments:
+        capacity -- Most orders counted at once, at least 1
+
+        Raises:
+        ValueError -- If capacity is less than 1, as there would be no counter to replace
+        """
+        if capacity < 1:
+            raise ValueError(f"A SpaceSavingCounter needs at least 1 counter, not {capacity}")
+
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.min_heap = []
+        self.total = 0
+
+    def add(self, order, count=1):
+        """Count an order.
+
+        Arguments:
+        order -- Any hashable, comparable value, such as an order tuple
+        count -- Number of times the order was made
+        """
+        self.total += count
+        counts = self.counts
+
+        if order in counts:
+            counts[order] += count
+        elif len(counts) < self.capacity:
+            counts[order] = count
+            self.errors[order] = 0
+            heapq.heappush(self.min_heap, (count, order))
+        else:
+            smallest_count, smallest_order = self.pop_smallest()
+            del counts[smallest_order]
+            del self.errors[smallest_order]
+
+            counts[order] = smallest_count + count
+            self.errors[order] = smallest_count
+            heapq.heappush(self.min_heap, (smallest_count + count, order))
+
+    def pop_smallest(self):
+        """Removes the order with the smallest count from the heap.
+
+        Counts are only updated in the heap when they reach the top, so any
+        out of date entries are pushed back with their current count first.
+
+        Returns:
+        tuple -- (count, order)
+        """
+        while True:
+            heap_count, order = self.min_heap[0]
+            current_count = self.counts[order]
+            if heap_count == current_count:
+                return heapq.heappop(self.min_heap)
+            heapq.heapreplace(self.min_heap, (current_count, order))
+
+    def top_orders(self, requested_number):
+        """The orders with the highest estimates.
+
+        Ties are broken by the larger order first, like display_top_burgers().
+
+        Arguments:
+        requested_number -- How many orders to return
+
+        Returns:
+        list -- (order, estimated count) tuples from most to least frequent
+        """
+        return heapq.nlargest(requested_number, self.counts.items(), key=itemgetter(1,0))
+
+    def error_bound(self):
+        """The most any estimate can be too high.
+
+        Returns:
+        int -- The largest error of any counted order
+        """
+        return max(self.errors.values(), default = 0)
+
+    def guaranteed(self, order, requested_number):
+        """Whether an order is certain to be among the top orders.
+
+        It is certain when its lowest possible count is at least the
+        estimate of the first order outside the requested number.
+
+        Arguments:
+        order -- An order returned by top_orders()
+        requested_number -- How many top orders were requested
+
+        Returns:
+        bool -- True if the order is certain to be in the top requested_number
+        """
+        ranked = self.top_orders(requested_number + 1)
+        if len(ranked) <= requested_number:
+            return True
+        return self.counts[order] - self.errors[order] >= ranked[-1][1]
+
+def read_file_approximate(filename, counter):
+    """Reads each line of a file into a SpaceSavingCounter.
+
+    Lines are checked in the same way as read_file_and_process(), and the
+    program exits after printing the error for the first bad line.
+
+    Arguments:
+    filename -- The file to read orders from
+    counter -- The SpaceSavingCounter to add the orders to
+    """
+    line_number = 0
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_to_tuple)
+
+    try:
+        with open_order_file(filename) as file:
+            for order in timer.timed_lines(file):
+                line_number += 1
+                order = convert(order)
+
+                if order == None:
+                    print(f"The error occurred in line {line_number} of the text file")
+                    exit()
+
+                counter.add(order)
+
+        timer.finish(line_number, os.path.getsize(filename), len(counter.counts))
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
+
+def display_error_bounds(counter, requested_number):
+    """Prints how accurate the counts shown by display_top_burgers() are.
+
+    Arguments:
+    counter -- The SpaceSavingCounter the top orders came from
+    requested_number -- How many top orders were displayed
+    """
+    print(f"Counts are estimates from {counter.capacity} counters over {counter.total} orders, "
+          f"and may each be up to {counter.error_bound()} too high (at most {counter.total // counter.capacity}).")
+
+    uncertain = [order for order, count in counter.top_orders(requested_number)
+                 if not counter.guaranteed(order, requested_number)]
+    if uncertain:
+        print(f"{len(uncertain)} of the orders shown may not really be in the top {requested_number}.")
+
+def compare_with_exact(counter, frequency, requested_number):
+    """Checks the approximate top orders against exact counts.
+
+    Arguments:
+    counter -- SpaceSavingCounter holding the approximate counts
+    frequency -- dictionary of exact counts, like order_frequency
+    requested_number -- How many top orders to compare
+
+    Returns:
+    dict -- "recall": share of the exact top orders which were found,
+            "largest_error": largest difference between an estimate and the exact count,
+            "within_bounds": whether every estimate was within its error bound
+    """
+    exact_top = heapq.nlargest(requested_number, frequency.items(), key=itemgetter(1,0))
+    approximate_top = counter.top_orders(requested_number)
+
+    exact_orders = set(order for order, count in exact_top)
+    found = sum(1 for order, count in approximate_top if order in exact_orders)
+
+    largest_error = 0
+    within_bounds = True
+    for order, estimate in counter.counts.items():
+        difference = estimate - frequency.get(order, 0)
+        largest_error = max(largest_error, difference)
+        if difference < 0 or difference > counter.errors[order]:
+            within_bounds = False
+
+    return {
+        "recall" : found / len(exact_top) if exact_top else 1.0,
+        "largest_error" : largest_error,
+        "within_bounds" : within_bounds,
+    }
+
+
+if __name__ == "__main__":
+    import orders
+
+    parser = argparse.ArgumentParser(description = "Compare the approximate top orders with the exact ones.")
+    parser.add_argument("filename", nargs = "?", default = ORDERS_FILENAME, help = f"order file to read (default: {ORDERS_FILENAME})")
+    parser.add_argument("--capacity", type = int, default = 64, help = "number of counters (default: 64)")
+    parser.add_argument("--top", type = int, default = 10, help = "number of top orders to compare (default: 10)")
+    options = parser.parse_args()
+    if options.capacity < 1:
+        parser.error("--capacity must be at least 1")
+
+    counter = SpaceSavingCounter(options.capacity)
+    read_file_approximate(options.filename, counter)
+    orders.read_file_and_process(options.filename)
+
+    comparison = compare_with_exact(counter, orders.order_frequency, options.top)
+    print(f"Found {comparison['recall']:.0%} of the exact top {options.top} orders using {options.capacity} counters.")
+    print(f"Largest overestimate: {comparison['largest_error']} (bound: {counter.error_bound()})")
+    if comparison["within_bounds"]:
+        print("Every estimate was within its error bound.")
+    else:
+        print("Some estimates were outside their error bounds.")
@@ -0,0 +1,312 @@
+"""
+Records how long each stage of reading and ranking orders takes.
+
+Instrumentation is off unless enable() is called. While it is off, stage()
+returns a context manager which does nothing, so the instrumented code runs
+at almost the same speed as before.
+
+While it is on, each stage records its wall time, the lines and bytes it
+handled, the number of different orders and the peak memory of the program
+so far. The totals can be read with stage_report(), saved as JSON or in the
+Prometheus text format, or passed to hook functions as each stage finishes:
+
+    def show_stage(name, result):
+        print(name, result["seconds"])
+
+    metrics.add_hook(show_stage)
+    metrics.enable()
+
+Readers which read, convert and count each line in one loop use a
+StreamTimer from stream_timer() to split the loop's time between the read,
+parse and count stages, without changing how the file is read. Worker
+processes return their stage_totals, which are added to this program's
+totals with add_totals().
+"""
+
+import json
+import sys
+import time
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows, where peak memory isn't recorded.
+
+STAGES = ["read", "parse", "count", "sort", "pricing"]  # The stages in the order they happen
+PROMETHEUS_PREFIX = "orders_stage_"
+
+enabled = False
+stage_totals = {}
+hooks = []
+no_stage = nullcontext()
+
+class Stage:
+    """Times one run of a stage and adds it to the totals when it finishes.
+
+    Attributes:
+    name -- Name of the stage, such as "parse"
+    lines -- Number of lines handled
+    bytes -- Number of bytes handled
+    distinct_orders -- Number of different orders, or None if not known
+    start -- perf_counter() time when the stage started
+    """
+
+    def __init__(self, name, lines=0, bytes=0, distinct_orders=None):
+        self.name = name
+        self.lines = lines
+        self.bytes = bytes
+        self.distinct_orders = distinct_orders
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        record_stage(self, time.perf_counter() - self.start)
+        return False
+
+class StreamTimer:
+    """Splits the time taken by one loop over a file's lines between the read, parse and count stages.
+
+    The time spent getting each line from timed_lines() is added to the read
+    stage, and the time spent in a function wrapped by timed_function() to the
+    parse stage. The rest of the loop's time is recorded as the count stage.
+
+    Attributes:
+    start -- perf_counter() time when the loop started
+    seconds -- dictionary of the read and parse seconds so far
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.seconds = {"read" : 0.0, "parse" : 0.0}
+
+    def timed_lines(self, lines):
+        """Gives each line from an iterable, adding the time taken to get it to the read stage."""
+        lines = iter(lines)
+        seconds = self.seconds
+        perf_counter = time.perf_counter
+
+        while True:
+            start = perf_counter()
+            line = next(lines, None)
+            seconds["read"] += perf_counter() - start
+            if line == None:
+                return
+            yield line
+
+    def timed_function(self, function):
+        """Wraps a function, such as convert_to_tuple(), adding the time spent in it to the parse stage."""
+        seconds = self.seconds
+        perf_counter = time.perf_counter
+
+        def timed(*arguments):
+            start = perf_counter()
+            result = function(*arguments)
+            seconds["parse"] += perf_counter() - start
+            return result
+
+        return timed
+
+    def finish(self, lines, bytes, distinct_orders=None):
+        """Records the read, parse and count stages once the loop has finished.
+
+        Arguments:
+        lines, bytes -- Amounts handled by the loop
+        distinct_orders -- Number of different orders once counted, if known
+        """
+        loop_seconds = time.perf_counter() - self.start
+        record_stage(Stage("read", lines, bytes), self.seconds["read"])
+        record_stage(Stage("parse", lines, bytes), self.seconds["parse"])
+        record_stage(Stage("count", lines, bytes, distinct_orders),
+                     max(loop_seconds - self.seconds["read"] - self.seconds["parse"], 0.0))
+
+class NoStreamTimer:
+    """Used in place of a StreamTimer while instrumentation is off. Lines and functions are passed back unchanged."""
+
+    def timed_lines(self, lines):
+        return lines
+
+    def timed_function(self, function):
+        return function
+
+    def finish(self, lines, bytes, distinct_orders=None):
+        pass
+
+no_stream_timer = NoStreamTimer()
+
+def enable():
+    """Turns instrumentation on."""
+    global enabled
+    enabled = True
+
+def disable():
+    """Turns instrumentation off. The totals recorded so far are kept."""
+    global enabled
+    enabled = False
+
+def reset():
+    """Clears the totals recorded so far."""
+    stage_totals.clear()
+
+def stage(name, lines=0, bytes=0, distinct_orders=None):
+    """Starts timing a stage, for use in a with statement.
+
+    Arguments:
+    name -- Name of the stage
+    lines, bytes, distinct_orders -- Amounts handled, if already known. They can also be set on the Stage afterwards.
+
+    Returns:
+    Stage -- If instrumentation is on
+    nullcontext -- If it is off, which does nothing
+    """
+    if not enabled:
+        return no_stage
+
+    return Stage(name, lines, bytes, distinct_orders)
+
+def stream_timer():
+    """Starts timing a loop which reads, converts and counts lines.
+
+    Returns:
+    StreamTimer -- If instrumentation is on
+    NoStreamTimer -- If it is off, which adds nothing to the loop
+    """
+    if not enabled:
+        return no_stream_timer
+
+    return StreamTimer()
+
+def add_hook(function):
+    """Calls a function each time a stage finishes.
+
+    Arguments:
+    function -- Called with the stage's name and a dictionary of that run's results
+    """
+    hooks.append(function)
+
+def remove_hook(function):
+    """Stops calling a function added with add_hook()."""
+    hooks.remove(function)
+
+def peak_memory():
+    """The most memory the program has used so far.
+
+    Returns:
+    int -- Peak resident memory in bytes
+    None -- If it can't be measured on this system
+    """
+    if resource == None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak  # macOS reports bytes, other systems kilobytes.
+    return peak * 1024
+
+def rates(seconds, lines, bytes):
+    """Lines and bytes per second, avoiding division by zero."""
+    if seconds <= 0:
+        return 0.0, 0.0
+    return lines / seconds, bytes / seconds
+
+def record_stage(finished_stage, seconds):
+    """Adds one run of a stage to the totals, and calls the hooks.
+
+    Arguments:
+    finished_stage -- The Stage which finished
+    seconds -- How long it took
+    """
+    result = {
+        "seconds" : seconds,
+        "lines" : finished_stage.lines,
+        "bytes" : finished_stage.bytes,
+        "distinct_orders" : finished_stage.distinct_orders,
+        "peak_memory_bytes" : peak_memory(),
+    }
+    result["lines_per_second"], result["bytes_per_second"] = rates(seconds, finished_stage.lines, finished_stage.bytes)
+
+    totals = stage_totals.setdefault(finished_stage.name, {"calls" : 0, "seconds" : 0.0, "lines" : 0, "bytes" : 0})
+    totals["calls"] += 1
+    totals["seconds"] += seconds
+    totals["lines"] += finished_stage.lines
+    totals["bytes"] += finished_stage.bytes
+    totals["distinct_orders"] = finished_stage.distinct_orders
+    totals["peak_memory_bytes"] = result["peak_memory_bytes"]
+
+    for hook in hooks:
+        hook(finished_stage.name, result)
+
+def add_totals(totals):
+    """Adds the stage totals recorded by another process, such as a worker in a pool.
+
+    Hooks aren't called, as they were already called in the other process if it had any.
+
+    Arguments:
+    totals -- The other process's stage_totals dictionary
+    """
+    for name, other_totals in totals.items():
+        own_totals = stage_totals.setdefault(name, {"calls" : 0, "seconds" : 0.0, "lines" : 0, "bytes" : 0})
+        for measurement in ["calls", "seconds", "lines", "bytes"]:
+            own_totals[measurement] += other_totals[measurement]
+
+        # Each worker only sees part of the orders and its own memory, so keep the largest.
+        for measurement in ["distinct_orders", "peak_memory_bytes"]:
+            values = [value for value in (own_totals.get(measurement), other_totals[measurement]) if value != None]
+            own_totals[measurement] = max(values) if values else None
+
+def stage_report():
+    """The totals for each stage recorded so far.
+
+    Returns:
+    dict -- For each stage name, its calls, seconds, lines, bytes, lines_per_second,
+            bytes_per_second, distinct_orders and peak_memory_bytes
+    """
+    names = [name for name in STAGES if name in stage_totals]
+    names += sorted(name for name in stage_totals if name not in STAGES)
+
+    report = {}
+    for name in names:
+        totals = dict(stage_totals[name])
+        totals["lines_per_second"], totals["bytes_per_second"] = rates(totals["seconds"], totals["lines"], totals["bytes"])
+        report[name] = totals
+
+    return report
+
+def export_json(filename):
+    """Saves stage_report() as JSON.
+
+    Arguments:
+    filename -- The file to write
+    """
+    with open(filename, "w") as file:
+        json.dump({"stages" : stage_report()}, file, indent = 2)
+
+def export_prometheus(filename):
+    """Saves stage_report() in the Prometheus text format, with one gauge for each measurement.
+
+    Arguments:
+    filename -- The file to write
+    """
+    report = stage_report()
+    measurements = [
+        ("calls", "Number of times each stage ran."),
+        ("seconds", "Wall time spent in each stage."),
+        ("lines", "Lines handled by each stage."),
+        ("bytes", "Bytes handled by each stage."),
+        ("lines_per_second", "Lines handled per second by each stage."),
+        ("bytes_per_second", "Bytes handled per second by each stage."),
+        ("distinct_orders", "Number of different orders after each stage."),
+        ("peak_memory_bytes", "Peak memory of the program at the end of each stage."),
+    ]
+
+    with open(filename, "w") as file:
+        for measurement, description in measurements:
+            metric_name = PROMETHEUS_PREFIX + measurement
+            file.write(f"# HELP {metric_name} {description}\n")
+            file.write(f"# TYPE {metric_name} gauge\n")
+            for name, totals in report.items():
+                if totals[measurement] != None:
+                    file.write(f'{metric_name}{{stage="{name}"}} {totals[measurement]}\n')
@@ -0,0 +1,309 @@
+"""
+Compact integer codes for burger orders, and a frequency counter which uses them.
+
+There are only 768 valid orders, so each one can be packed into a 10 bit
+integer code. The layout is defined once in codetown/records.py, which the
+other programs also use for their BurgerRecords, and is imported from there:
+
+    bit 9       bun      (0 "gluten free", 1 "milk")
+    bits 7-8    sauce    (0 "barbecue", 1 "none", 2 "tomato")
+    bits 5-6    patties  (0 to 3)
+    bits 3-4    cheese   (0 to 3)
+    bit 2       tomato
+    bit 1       lettuce
+    bit 0       onion
+
+The buns and sauces are numbered in alphabetical order, so sorting codes gives
+exactly the same order as sorting the tuples from convert_to_tuple(). This
+means rankings built from codes break ties in the same way as
+display_top_burgers().
+
+OrderCounter stores the frequency of every code in a fixed size array, so
+counting is a single array update with no hashing, and its memory use is the
+same however large the order file is.
+"""
+
+import heapq
+import json
+import os
+import sys
+from array import array
+from operator import itemgetter
+
+import metrics
+from compressed import open_byte_lines
+from orders import convert_to_tuple
+# orders.py adds the folder above codetown to sys.path, so must be imported first.
+from codetown import pricing
+from codetown.records import (BUN_CODES, CODE_SPACE_SIZE, ORDERS_BY_CODE, PRICE_INDEX_BY_CODE, SAUCE_CODES,
+    VALID_CODES, decode_order, encode_order)
+
+# Byte values for each field mapped to their bits in the code.
+BUN_BITS = {bun.encode() : code << 9 for bun, code in BUN_CODES.items()}
+SAUCE_BITS = {sauce.encode() : code << 7 for sauce, code in SAUCE_CODES.items()}
+PATTY_BITS = {str(amount).encode() : amount << 5 for amount in range(4)}
+CHEESE_BITS = {str(amount).encode() : amount << 3 for amount in range(4)}
+TOMATO_BITS = {b"yes" : 1 << 2, b"no" : 0}
+LETTUCE_BITS = {b"yes" : 1 << 1, b"no" : 0}
+ONION_BITS = {b"yes" : 1, b"no" : 0}
+
+# Start of a file saved by save_counter().
+COUNTER_MAGIC = b"CTOC"
+
+# Limit on how many different raw lines are remembered by read_file_codes().
+# Valid orders only have a few spellings, so this is rarely reached.
+MAX_CONVERTED_LINES = 10000
+
+def get_cost_by_code(code):
+    """Looks up the price of an order from its code.
+
+    Arguments:
+    code -- int code for the order
+
+    Returns:
+    int -- The price of the burger, matching get_cost()
+    """
+    return pricing.price_table.table[PRICE_INDEX_BY_CODE[code]]
+
+def convert_bytes_to_code(line):
+    """Converts one line of bytes straight to an order code.
+
+    Each field's bytes are looked up to find its bits in the code. If any
+    field isn't found, the line is decoded and passed to convert_to_tuple(),
+    which prints the usual error messages or handles unusual but valid spacing.
+
+    Arguments:
+    line -- bytes representing a single burger order
+
+    Returns:
+    int -- The code for the order
+    None -- If the order isn't valid
+    """
+    fields = line.strip().split(b",")
+
+    if len(fields) == 7:
+        try:
+            return (BUN_BITS[fields[0]]
+                | SAUCE_BITS[fields[1]]
+                | PATTY_BITS[fields[2]]
+                | CHEESE_BITS[fields[3]]
+                | TOMATO_BITS[fields[4]]
+                | LETTUCE_BITS[fields[5]]
+                | ONION_BITS[fields[6]])
+        except KeyError:
+            pass
+
+    order = convert_to_tuple(line.decode(errors = "replace"))  # Bad bytes make the line an invalid order.
+    if order == None:
+        return None
+    return encode_order(order)
+
+
+class OrderCounter:
+    """Frequency of each order, stored in a fixed size array indexed by order code.
+
+    Attributes:
+    counts -- array of 64 bit integers, with one slot for every possible code
+    ranked_codes -- The most frequent (code, frequency) tuples found so far
+    ranking_complete -- True once ranked_codes holds every ordered code
+
+    Methods:
+    add() -- Add to the frequency of one code
+    invalidate_ranking() -- Discard the saved ranking after counts change
+    items() -- Codes which have been ordered, along with their frequencies
+    top_codes() -- The most frequent codes, using a heap and the saved ranking
+    sorted_codes() -- Codes sorted from most to least frequent
+    to_frequency() -- Convert to a dictionary in the same format as order_frequency
+    update() -- Add the frequencies from an order_frequency style dictionary
+    merge() -- Add the frequencies from another OrderCounter
+    """
+
+    def __init__(self):
+        """Initialise every frequency to 0."""
+        self.counts = array("q", bytes(8 * CODE_SPACE_SIZE))
+        self.invalidate_ranking()
+
+    def add(self, code, count=1):
+        """Add to the frequency of one code.
+
+        Arguments:
+        code -- int code for the order
+        count -- How many to add. Defaults to 1.
+        """
+        self.counts[code] += count
+        self.ranking_complete = False
+        self.ranked_codes = []
+
+    def invalidate_ranking(self):
+        """Discard the saved ranking.
+
+        Must be called after changing counts directly rather than through add().
+        """
+        self.ranked_codes = []
+        self.ranking_complete = False
+
+    def items(self):
+        """Codes which have been ordered at least once.
+
+        Returns:
+        list -- (code, frequency) tuples in code order
+        """
+        counts = self.counts
+        return [(code, counts[code]) for code in VALID_CODES if counts[code]]
+
+    def top_codes(self, requested_number):
+        """The most frequent codes, from most to least frequent.
+
+        Ties are broken by the larger code first, which is the same order
+        display_top_burgers() gives the matching tuples. Only the requested
+        number of codes are selected using a heap, and the result is saved
+        so repeat requests are answered without searching the counts again.
+
+        Arguments:
+        requested_number -- How many of the top codes to find
+
+        Returns:
+        list -- (code, frequency) tuples
+        """
+        if requested_number > len(self.ranked_codes) and not self.ranking_complete:
+            items = self.items()
+            if requested_number >= len(items):
+                self.ranked_codes = sorted(items, key=itemgetter(1,0), reverse=True)
+                self.ranking_complete = True
+            else:
+                self.ranked_codes = heapq.nlargest(requested_number, items, key=itemgetter(1,0))
+
+        return self.ranked_codes[:requested_number]
+
+    def sorted_codes(self):
+        """Codes sorted from most to least frequent.
+
+        Returns:
+        list -- (code, frequency) tuples, ranked in the same way as top_codes()
+        """
+        return self.top_codes(CODE_SPACE_SIZE)
+
+    def to_frequency(self):
+        """Convert to a dictionary in the same format as order_frequency.
+
+        Returns:
+        dict -- order tuples mapped to their frequencies
+        """
+        return {ORDERS_BY_CODE[code] : count for code, count in self.items()}
+
+    def update(self, frequency):
+        """Add the frequencies from an order_frequency style dictionary.
+
+        Arguments:
+        frequency -- dictionary of order tuples mapped to their frequencies
+        """
+        for order, count in frequency.items():
+            self.counts[encode_order(order)] += count
+
+        self.invalidate_ranking()
+
+    def merge(self, other):
+        """Add the frequencies from another OrderCounter.
+
+        Arguments:
+        other -- OrderCounter to add to this one
+        """
+        counts = self.counts
+        other_counts = other.counts
+        for code in VALID_CODES:
+            counts[code] += other_counts[code]
+
+        self.invalidate_ranking()
+
+
+def save_counter(counter, filename, details=None):
+    """Save an OrderCounter to a file, so it can be merged later without reading the orders again.
+
+    The file holds COUNTER_MAGIC, a line of JSON with any extra details,
+    then the counts as little endian 64 bit integers.
+
+    Arguments:
+    counter -- OrderCounter to save
+    filename -- The file to write
+    details -- Optional dictionary saved alongside the counts, such as where they came from
+    """
+    counts = array("q", counter.counts)
+    if sys.byteorder == "big":
+        counts.byteswap()
+
+    # Each process writes its own temporary file, so processes saving the same table don't mix their writes.
+    temporary_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temporary_filename, "wb") as file:
+        file.write(COUNTER_MAGIC + json.dumps(details or {}).encode() + b"\n")
+        counts.tofile(file)
+    os.replace(temporary_filename, filename)
+
+def load_counter(filename):
+    """Load an OrderCounter saved by save_counter().
+
+    Arguments:
+    filename -- The file to read
+
+    Returns:
+    tuple -- (OrderCounter, details dictionary)
+    None -- If the file can't be read or isn't a saved counter
+    """
+    try:
+        with open(filename, "rb") as file:
+            if file.read(len(COUNTER_MAGIC)) != COUNTER_MAGIC:
+                return None
+            details = json.loads(file.readline())
+            counts = array("q")
+            counts.fromfile(file, CODE_SPACE_SIZE)
+    except (OSError, ValueError, EOFError):
+        return None
+
+    if sys.byteorder == "big":
+        counts.byteswap()
+
+    counter = OrderCounter()
+    counter.counts = counts
+    return counter, details
+
+def read_file_codes(filename, counter):
+    """Reads each line of a memory-mapped or compressed file and counts it by order code.
+
+    Gives the same error messages and line numbers as read_file_and_process().
+
+    Arguments:
+    filename -- The file to read orders from
+    counter -- OrderCounter to add the orders to
+    """
+    converted_lines = {}
+    counts = counter.counts
+    line_number = 0
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_bytes_to_code)
+
+    try:
+        with open_byte_lines(filename) as lines:
+            for line in timer.timed_lines(lines):
+                line_number += 1
+                code = converted_lines.get(line)
+
+                if code == None:
+                    code = convert(line)
+
+                    if code == None:
+                        print(f"The error occurred in line {line_number} of the text file")
+                        exit()
+
+                    if len(converted_lines) < MAX_CONVERTED_LINES:
+                        converted_lines[line] = code
+
+                counts[code] += 1
+
+        timer.finish(line_number, os.path.getsize(filename), len(counter.items()))
+        counter.invalidate_ranking()
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
@@ -0,0 +1,162 @@
+"""
+Generates load for order_server.py and measures how well it keeps up.
+
+Many tills are simulated at once, each sending orders in batches and waiting
+for the replies. While they run, a separate connection repeatedly asks for
+the top orders, and the time each query takes is recorded.
+
+At the end, prints the sustained number of orders per second and the
+median (p50) and 99th percentile (p99) query times.
+
+Usage:
+python3 order_load.py --port 8765 --tills 50 --orders 20000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from order_codes import ORDERS_BY_CODE, VALID_CODES
+
+def order_line(order):
+    """Format an order tuple as a line in the orders.txt format.
+
+    Arguments:
+    order -- tuple returned by convert_to_tuple()
+
+    Returns:
+    bytes -- The order line, including a newline
+    """
+    fields = [str(field) for field in order[:4]] + ["yes" if field else "no" for field in order[4:]]
+    return (",".join(fields) + "\n").encode()
+
+async def connect(host, port, unix_path):
+    """Open a connection to the server.
+
+    Returns:
+    tuple -- (asyncio.StreamReader, asyncio.StreamWriter)
+    """
+    if unix_path != None:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+async def run_till(connection, number_of_orders, batch_size, seed):
+    """Send orders from one simulated till in batches, reading every reply.
+
+    Arguments:
+    connection -- Function which opens a connection to the server
+    number_of_orders -- How many orders to send
+    batch_size -- Orders sent before waiting for their replies
+    seed -- Seed for choosing orders, so each run sends the same orders
+
+    Returns:
+    int -- Number of orders the server accepted
+    """
+    chooser = random.Random(seed)
+    lines = [order_line(ORDERS_BY_CODE[code]) for code in chooser.sample(VALID_CODES, 50)]
+    reader, writer = await connection()
+    accepted = 0
+
+    for start in range(0, number_of_orders, batch_size):
+        batch = chooser.choices(lines, k = min(batch_size, number_of_orders - start))
+        writer.writelines(batch)
+        await writer.drain()
+
+        for i in range(len(batch)):
+            if await reader.readline() == b"OK\n":
+                accepted += 1
+
+    writer.write(b"QUIT\n")
+    writer.close()
+    return accepted
+
+async def run_queries(connection, requested_number, interval, stop):
+    """Repeatedly ask for the top orders, recording how long each query takes.
+
+    Arguments:
+    connection -- Function which opens a connection to the server
+    requested_number -- Number of top orders to ask for
+    interval -- Seconds to wait between queries
+    stop -- asyncio.Event which is set when the tills have finished
+
+    Returns:
+    list -- Time taken by each query in seconds
+    """
+    reader, writer = await connection()
+    latencies = []
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        writer.write(f"TOP {requested_number}\n".encode())
+        await writer.drain()
+
+        count = int((await reader.readline()).split()[1])
+        for i in range(count):
+            await reader.readline()
+        latencies.append(time.perf_counter() - start)
+
+        await asyncio.sleep(interval)
+
+    writer.write(b"QUIT\n")
+    writer.close()
+    return latencies
+
+def percentile(values, fraction):
+    """Find a percentile of a list of numbers.
+
+    Arguments:
+    values -- list of numbers
+    fraction -- Percentile as a fraction, such as 0.99
+
+    Returns:
+    float -- The value at that percentile, or 0 if there are no values
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+async def run_load(host, port, unix_path, tills, orders_per_till, batch_size, query_interval):
+    """Run the simulated tills and queries, then print the results.
+
+    Arguments:
+    host -- Server address
+    port -- Server port
+    unix_path -- Unix socket to connect to instead, if given
+    tills -- Number of tills sending orders at once
+    orders_per_till -- Orders sent by each till
+    batch_size -- Orders each till sends before waiting for replies
+    query_interval -- Seconds between top order queries
+    """
+    connection = lambda: connect(host, port, unix_path)
+    stop = asyncio.Event()
+    queries = asyncio.create_task(run_queries(connection, 5, query_interval, stop))
+
+    start = time.perf_counter()
+    accepted = await asyncio.gather(*[
+        run_till(connection, orders_per_till, batch_size, seed) for seed in range(tills)])
+    seconds = time.perf_counter() - start
+
+    stop.set()
+    latencies = await queries
+
+    print(f"{sum(accepted)} orders accepted from {tills} tills in {seconds:.2f}s")
+    print(f"Sustained rate: {sum(accepted) / seconds:,.0f} orders/s")
+    print(f"TOP 5 query time over {len(latencies)} queries: "
+        f"p50 {percentile(latencies, 0.5) * 1000:.2f}ms, p99 {percentile(latencies, 0.99) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Generate load for order_server.py.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "server address (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 8765, help = "server port (default: 8765)")
+    parser.add_argument("--unix", help = "connect to this Unix socket instead of TCP")
+    parser.add_argument("--tills", type = int, default = 50, help = "number of tills sending orders at once")
+    parser.add_argument("--orders", type = int, default = 20000, help = "orders sent by each till")
+    parser.add_argument("--batch", type = int, default = 100, help = "orders sent before waiting for replies")
+    parser.add_argument("--interval", type = float, default = 0.01, help = "seconds between top order queries")
+    options = parser.parse_args()
+
+    asyncio.run(run_load(options.host, options.port, options.unix, options.tills, options.orders,
+        options.batch, options.interval))
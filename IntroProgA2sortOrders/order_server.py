@@ -0,0 +1,230 @@
+"""
+A long-running server which collects burger orders from many tills at once.
+
+Tills connect over a local TCP or Unix socket and send one order per line,
+in the same format as orders.txt. Each order is checked with the same rules
+as convert_to_tuple() and added to order_frequency in memory. The top orders
+and prices can be requested at any time while orders are arriving.
+
+Commands, one per line:
+
+    milk,tomato,2,1,yes,no,no   Add an order. Replies "OK", or "ERROR" and the problem.
+    TOP 5                       Replies "TOP n", then one line for each of the top n
+                                orders: the order, its frequency and its price,
+                                separated by tabs.
+    PRICE milk,tomato,2,1,yes,no,no
+                                Replies "PRICE $8", or "ERROR" and the problem.
+    STATS                       Replies "STATS", the orders received and the
+                                number of different orders.
+    DEMAND                      Replies "DEMAND n", then one line for each of the
+                                n ingredients: its name and the total amount the
+                                orders counted so far need, separated by a tab.
+                                Needs NumPy (see demand.py).
+    QUIT                        Closes the connection.
+
+Back-pressure: accepted orders wait in a queue of limited size before being
+added to order_frequency. When the queue is full, the server stops reading
+from the tills sending orders until there is room, so the operating system's
+socket buffers fill and the tills slow down instead of the server's memory
+growing. Replies are also only written as fast as each till reads them.
+
+Usage:
+python3 order_server.py --port 8765
+python3 order_server.py --unix /tmp/orders.sock
+"""
+
+import argparse
+import asyncio
+import io
+from contextlib import redirect_stdout
+
+import fast_parser
+from orders import get_cost, invalidate_ranking, order_frequency, top_orders
+
+try:
+    from demand import DemandTracker
+except ImportError:
+    DemandTracker = None  # NumPy isn't installed, so DEMAND isn't available.
+
+MAX_QUEUED_ORDERS = 10000  # Orders waiting to be counted before tills are slowed down
+MAX_LINE_LENGTH = 1024  # Longest line accepted from a till
+BATCH_SIZE = 1000  # Most orders counted before the ranking is discarded
+MAX_TOP = 768  # There are only 768 different valid orders
+
+def convert_order(line):
+    """Converts one line from a till, capturing any error messages instead of printing them.
+
+    Arguments:
+    line -- bytes representing a single burger order
+
+    Returns:
+    tuple -- The order converted to a tuple
+    String -- The error messages, if the order isn't valid
+    """
+    order = fast_parser.converted_lines.get(line)
+    if order != None:
+        return order
+
+    with redirect_stdout(io.StringIO()) as messages:
+        order = fast_parser.convert_bytes_to_tuple(line)
+
+    if order == None:
+        return messages.getvalue().strip().replace("\n", "; ")
+
+    if len(fast_parser.converted_lines) < fast_parser.MAX_CONVERTED_LINES:
+        fast_parser.converted_lines[line] = order
+    return order
+
+
+class OrderServer:
+    """Accepts orders and queries from many tills at once.
+
+    Attributes:
+    queue -- asyncio.Queue of orders waiting to be added to order_frequency
+    orders_received -- Number of valid orders received since the server started
+    demand -- DemandTracker of the ingredients needed by the counted orders, or None without NumPy
+
+    Methods:
+    count_orders() -- Add queued orders to order_frequency, running until cancelled
+    handle_client() -- Read and answer commands from one till
+    handle_line() -- Answer a single command
+    """
+
+    def __init__(self, queue_size=MAX_QUEUED_ORDERS):
+        """Create the queue of orders.
+
+        Arguments:
+        queue_size -- Most orders which can wait in the queue
+        """
+        self.queue = asyncio.Queue(queue_size)
+        self.orders_received = 0
+        self.demand = DemandTracker() if DemandTracker != None else None
+
+    async def count_orders(self):
+        """Add queued orders to order_frequency, running until cancelled.
+
+        Orders are counted in batches, so the saved ranking is only
+        discarded once for each batch rather than for each order.
+        """
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            for order in batch:
+                order_frequency[order] = order_frequency.get(order, 0) + 1
+                if self.demand != None:
+                    self.demand.add_order(order)
+                self.queue.task_done()
+            invalidate_ranking()
+
+    async def handle_client(self, reader, writer):
+        """Read and answer commands from one till until it disconnects.
+
+        Arguments:
+        reader -- asyncio.StreamReader for the connection
+        writer -- asyncio.StreamWriter for the connection
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b"ERROR Line is too long\n")
+                    break
+
+                if not line or line.strip() == b"QUIT":
+                    break
+
+                writer.write(await self.handle_line(line))
+                # Waits only if the till isn't reading its replies.
+                await writer.drain()
+
+        except ConnectionError:
+            pass  # The till disconnected without sending QUIT.
+        finally:
+            writer.close()
+
+    async def handle_line(self, line):
+        """Answer a single command.
+
+        Arguments:
+        line -- bytes of one line sent by a till
+
+        Returns:
+        bytes -- The reply to send
+        """
+        if line.startswith(b"TOP"):
+            try:
+                requested_number = min(int(line[3:]), MAX_TOP)
+            except ValueError:
+                return b"ERROR TOP must be followed by a number\n"
+            if requested_number < 1:
+                return b"ERROR TOP must be followed by a number of at least 1\n"
+
+            reply = []
+            for order, frequency in top_orders(requested_number):
+                reply.append(f"{order}\t{frequency}\t${get_cost(order)}\n")
+            return f"TOP {len(reply)}\n{''.join(reply)}".encode()
+
+        if line.startswith(b"PRICE"):
+            order = convert_order(line[5:])
+            if isinstance(order, str):
+                return f"ERROR {order}\n".encode()
+            return f"PRICE ${get_cost(order)}\n".encode()
+
+        if line.strip() == b"DEMAND":
+            if self.demand == None:
+                return b"ERROR DEMAND needs NumPy to be installed\n"
+            reply = [f"{ingredient}\t{total}\n" for ingredient, total in self.demand.demand().items()]
+            return f"DEMAND {len(reply)}\n{''.join(reply)}".encode()
+
+        if line.strip() == b"STATS":
+            return f"STATS {self.orders_received} {len(order_frequency)}\n".encode()
+
+        order = convert_order(line)
+        if isinstance(order, str):
+            return f"ERROR {order}\n".encode()
+
+        # Waits while the queue is full, which stops this till's orders being read.
+        await self.queue.put(order)
+        self.orders_received += 1
+        return b"OK\n"
+
+
+async def run_server(host="127.0.0.1", port=8765, unix_path=None):
+    """Start the server and run until interrupted.
+
+    Arguments:
+    host -- Address to listen on for TCP connections
+    port -- Port to listen on for TCP connections
+    unix_path -- If given, listen on this Unix socket instead of TCP
+    """
+    server = OrderServer()
+    counter_task = asyncio.create_task(server.count_orders())
+
+    if unix_path != None:
+        listener = await asyncio.start_unix_server(server.handle_client, unix_path, limit = MAX_LINE_LENGTH)
+        print(f"Listening for orders on {unix_path}")
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port, limit = MAX_LINE_LENGTH)
+        print(f"Listening for orders on {host}:{port}")
+
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        counter_task.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Collect burger orders from many tills.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 8765, help = "port to listen on (default: 8765)")
+    parser.add_argument("--unix", help = "listen on this Unix socket instead of TCP")
+    options = parser.parse_args()
+
+    try:
+        asyncio.run(run_server(options.host, options.port, options.unix))
+    except KeyboardInterrupt:
+        pass
@@ -8,28 +8,55 @@ Each order must be on a new line in the file, and contain 7 elements. An example
 the correct format is:
 milk,tomato,2,1,yes,no,no
 
+An optional 8th element can give the time of the order, either as seconds since 1970 or
+in ISO 8601 format, for example:
+milk,tomato,2,1,yes,no,no,2024-03-01T12:30:00
+
 Author: Tanya
 Trimester 1, 2024
 """
 
+import heapq
+import io
+import math
+import os
+import sys
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import datetime
 from operator import itemgetter
 
+# Burger prices are shared with the other Codetown programs, and are kept in
+# the codetown package in the folder above this one.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codetown import pricing
+from codetown.records import ORDERS_BY_CODE, encode_order
+
+import metrics
+from compressed import compression_type, open_order_file
+
+# When run as a script this module is called "__main__". Registering it as
+# "orders" as well means the other modules in this folder, which import from
+# orders, share this module's order_frequency rather than loading a second copy.
+sys.modules.setdefault("orders", sys.modules[__name__])
+
 ORDERS_FILENAME = "orders.txt"
 
 AVAILABLE_BUNS = ["milk", "gluten free"]
 AVAILABLE_SAUCES = ["tomato", "barbecue", "none"]
 
-PRICES = {
-    "base" : 5,  # Includes milk bun, sauce, up to 1 patty, 1 cheese slice, and 1 salad item.
-    "gluten_free" : 1,  # Additional cost.
-    "patty" : 3,  # 1 included. Price per additional patty.
-    "cheese" : 1,  # 1 included, Price per additional cheese slice.
-    "salad" : 1  # tomato, lettuce or onion included in base price. Price per additional salad item. 
-}
+CHUNK_SIZE = 64 << 20  # Most bytes in each range read by a worker in read_file_parallel()
 
 # Initialise an empty dictionary for storing frequency of each order.
 order_frequency = {}
 
+# The most frequent orders found so far by top_orders(), from most to least
+# frequent. Kept until order_frequency changes, so repeat requests don't need
+# to search the dictionary again. Any code which changes order_frequency
+# must call invalidate_ranking() afterwards.
+ranked_orders = []
+ranking_complete = False  # True once ranked_orders holds every order
+
 def check_valid_choice(choice, available_choices, choice_type):
     """Checks if the choice is in the list of availahle choices.
 
@@ -97,13 +124,41 @@ def convert_to_bool(choice, choice_type):
         print(f"This {choice_type} choice not valid. Must be 'yes' or 'no'.")
         return None
 
+def convert_timestamp(choice):
+    """Converts the optional timestamp field to seconds since 1970.
+
+    Accepts either a number of seconds, or a date and time in ISO 8601
+    format such as "2024-03-01T12:30:00". Called by the convert_to_tuple()
+    function.
+
+    Arguments:
+    choice -- String to convert
+
+    Returns:
+    float -- The time in seconds since 1970
+    None -- If choice isn't a valid time
+    """
+    try:
+        timestamp = float(choice)
+        if math.isfinite(timestamp):
+            return timestamp
+    except ValueError:
+        try:
+            return datetime.fromisoformat(choice).timestamp()
+        except ValueError:
+            pass
+
+    print("The timestamp isn't a valid time")
+    return None
+
 def convert_to_tuple(order):
     """Takes order String and converts to a tuple containing the correct types.
 
     First converts to a list and checks if the list is the correct length. Calls 
     check_valid_choice(), convert_to_int() and convert_to_bool() functions 
     to process the list elements, before converting the final list to 
-    a tuple.
+    a tuple. If the order has the optional timestamp, it is checked with
+    convert_timestamp() but isn't included in the tuple.
     
     Arguments:
     order -- String representing a single burger order
@@ -113,6 +168,11 @@ def convert_to_tuple(order):
     None -- If list length is incorrect, or any converted items returned None
     """
     order = order.strip().split(",")
+    if len(order) == 8:
+        # The timestamp is when the order was made, not part of the order itself.
+        if convert_timestamp(order.pop()) == None:
+            return None
+
     if len(order) != 7:
         print("Order must include bun choice, sauce choice, 2 numbers, and 3 instances of \"yes\" or \"no\"")
         return None 
@@ -132,7 +192,7 @@ def convert_to_tuple(order):
          
     return(tuple(order))
 
-def read_file_and_process(filename):
+def read_file_and_process(filename, frequency=None):
     """Reads each line of file and adds converted tuple to order_frequency dictionary.
 
     Adds the orders if not already present or increments the value for 
@@ -140,23 +200,263 @@ def read_file_and_process(filename):
     If convert_to_tuple() returns None for any lines, or the file can't
     be read, prints an error message and exits the program.
 
+    When instrumentation in metrics.py is on, the time spent reading,
+    converting and counting the lines is recorded as separate stages.
+
     Arguments:
     filename -- The file to read orders from
+    frequency -- Dictionary to add the orders to. Defaults to order_frequency.
     """
+    if frequency == None:
+        frequency = order_frequency
+
     line_number = 0
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_to_tuple)
 
     try:
-        with open(filename) as file:
-            for order in file:
+        with open_order_file(filename) as file:
+            for order in timer.timed_lines(file):
                 line_number += 1
-                order = convert_to_tuple(order)
+                order = convert(order)
 
                 if order == None:
                     print(f"The error occurred in line {line_number} of the text file")
                     exit()
 
                 else: # Add order to dictionary, or increment by one if already present
-                    order_frequency[order] = order_frequency.get(order, 0) + 1
+                    frequency[order] = frequency.get(order, 0) + 1
+
+        timer.finish(line_number, os.path.getsize(filename), len(frequency))
+        invalidate_ranking()
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
+
+def intern_order(order):
+    """Returns the shared tuple for an order, so equal orders don't each keep a copy.
+
+    Arguments:
+    order -- tuple returned by convert_to_tuple()
+
+    Returns:
+    tuple -- The tuple for the order's code in the table shared with codetown/records.py
+    """
+    return ORDERS_BY_CODE[encode_order(order)]
+
+def find_line_number(filename, line):
+    """Finds the first line number where a line appears in a file.
+
+    Only used to report errors, so the file is read again from the start.
+
+    Arguments:
+    filename -- The file to search
+    line -- The line to look for, including its newline
+
+    Returns:
+    int -- The line number, starting from 1
+    """
+    with open_order_file(filename) as file:
+        for line_number, file_line in enumerate(file, 1):
+            if file_line == line:
+                return line_number
+
+def read_file_distinct(filename, frequency=None):
+    """Counts each different line first, then converts each different line only once.
+
+    Order files repeat the same few orders many times, so counting the raw
+    lines and converting each different line once does much less work than
+    converting every line. Each order's frequency is added to order_frequency
+    using its shared tuple from intern_order().
+
+    Lines are converted in the order they first appear in the file, so the
+    first bad line found is also the first bad line in the file. Its error
+    messages and line number are the same as read_file_and_process().
+
+    Arguments:
+    filename -- The file to read orders from
+    frequency -- Dictionary to add the orders to. Defaults to order_frequency.
+    """
+    if frequency == None:
+        frequency = order_frequency
+
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_to_tuple)
+
+    try:
+        with open_order_file(filename) as file:
+            line_counts = Counter(timer.timed_lines(file))
+
+        for line, count in line_counts.items():
+            order = convert(line)
+
+            if order == None:
+                print(f"The error occurred in line {find_line_number(filename, line)} of the text file")
+                exit()
+
+            order = intern_order(order)
+            frequency[order] = frequency.get(order, 0) + count
+
+        timer.finish(sum(line_counts.values()), os.path.getsize(filename), len(frequency))
+        invalidate_ranking()
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
+
+def find_chunk_boundaries(filename, number_of_chunks):
+    """Splits a file into byte ranges which start and end on line boundaries.
+
+    Each range starts at the beginning of a line and ends just after a
+    newline (or at the end of the file), so no line is split between two
+    ranges. Called by read_file_parallel().
+
+    Arguments:
+    filename -- The file to split
+    number_of_chunks -- How many ranges to aim for
+
+    Returns:
+    list -- (start, end) byte offsets for each non-empty range, in file order
+    """
+    file_size = os.path.getsize(filename)
+    boundaries = [0]
+
+    with open(filename, "rb") as file:
+        for i in range(1, number_of_chunks):
+            target = file_size * i // number_of_chunks
+            if target <= boundaries[-1]:
+                continue
+            # Reading from one byte early means a target that already sits at
+            # the start of a line is kept, rather than skipping that whole line.
+            file.seek(target - 1)
+            file.readline()
+            boundary = file.tell()
+            if boundary > boundaries[-1] and boundary < file_size:
+                boundaries.append(boundary)
+
+    boundaries.append(file_size)
+    return [(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1)]
+
+def process_chunk(chunk):
+    """Converts every line in one byte range of the file and counts the orders.
+
+    Runs inside a worker process for read_file_parallel(). Stops at the first
+    line convert_to_tuple() can't convert. The messages printed by the helper
+    functions are captured instead of printed, so that only the error from the
+    earliest chunk is shown, exactly as read_file_and_process() would show it.
+
+    The range is read one line at a time rather than all at once, so a worker
+    only holds the line it is converting.
+
+    Arguments:
+    chunk -- tuple of (filename, start, end) describing the byte range
+
+    Returns:
+    tuple -- (partial_frequency, line_count, error_line, error_message) where
+    error_line is the line number within the chunk of the first bad line,
+    or None if every line was valid
+    """
+    filename, start, end = chunk
+    partial_frequency = {}
+    line_count = 0
+    remaining = end - start
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_to_tuple)
+
+    with open(filename, "rb") as file, redirect_stdout(io.StringIO()) as messages:
+        file.seek(start)
+        for line in timer.timed_lines(file):
+            if remaining <= 0:
+                break
+            remaining -= len(line)
+
+            line = line.decode()
+            if "\r" in line:
+                # Split the same way as reading the file in text mode, where a lone \r also ends a line.
+                lines = io.StringIO(line, newline=None)
+            else:
+                lines = [line]
+
+            for order in lines:
+                line_count += 1
+                order = convert(order)
+
+                if order == None:
+                    return partial_frequency, line_count, line_count, messages.getvalue()
+
+                partial_frequency[order] = partial_frequency.get(order, 0) + 1
+
+    timer.finish(line_count, end - start, len(partial_frequency))
+    return partial_frequency, line_count, None, ""
+
+def process_numbered_chunk(numbered_chunk):
+    """Calls process_chunk() in a worker process, keeping the chunk's position in the file with its result.
+
+    Arguments:
+    numbered_chunk -- tuple of (chunk number, chunk) where chunk is passed to process_chunk()
+
+    Returns:
+    tuple -- (chunk number, result of process_chunk(), the stage totals recorded
+    by metrics.py while converting the chunk)
+    """
+    chunk_number, chunk = numbered_chunk
+    metrics.reset()
+    return chunk_number, process_chunk(chunk), metrics.stage_totals
+
+def read_file_parallel(filename, workers=None, frequency=None):
+    """Reads the file using a pool of worker processes and merges their counts.
+
+    The file is split into line aligned byte ranges of at most CHUNK_SIZE
+    bytes by find_chunk_boundaries(), with at least one range for each worker.
+    Each range is converted and counted by process_chunk() in one of the
+    workers, and each range's counts are added to the order_frequency
+    dictionary as soon as it is finished. Errors are reported with the same
+    messages and line numbers as read_file_and_process().
+
+    A compressed file can't be split, so is read by read_file_and_process() instead.
+
+    Arguments:
+    filename -- The file to read orders from
+    workers -- Number of worker processes. Defaults to the number of CPUs.
+    frequency -- Dictionary to add the orders to. Defaults to order_frequency.
+    """
+    from multiprocessing import Pool  # Only loaded when needed, as it is slow to import.
+
+    if frequency == None:
+        frequency = order_frequency
+    if workers == None:
+        workers = os.cpu_count() or 1
+
+    # The line count of each range, and the error found in any range, by range number.
+    line_counts = {}
+    errors = {}
+
+    try:
+        if compression_type(filename) != None:
+            read_file_and_process(filename, frequency)
+            return
+
+        number_of_chunks = max(workers, math.ceil(os.path.getsize(filename) / CHUNK_SIZE))
+        chunks = [(filename, start, end) for start, end in find_chunk_boundaries(filename, number_of_chunks)]
+        # Workers only time their chunks if instrumentation is on in this process.
+        with Pool(workers, metrics.enable if metrics.enabled else None) as pool:
+            for chunk_number, result, stage_totals in pool.imap_unordered(process_numbered_chunk, enumerate(chunks)):
+                metrics.add_totals(stage_totals)
+                partial_frequency, line_count, error_line, error_message = result
+                line_counts[chunk_number] = line_count
+                if error_line != None:
+                    errors[chunk_number] = (error_line, error_message)
+                    continue
+
+                for order, count in partial_frequency.items():
+                    frequency[order] = frequency.get(order, 0) + count
 
     except PermissionError:
         print("You don't have permission to open this text file")
@@ -165,7 +465,18 @@ def read_file_and_process(filename):
         print("Text file can't be found")
         exit()
 
-def process_user_input():
+    if errors:
+        # Line numbers in each chunk start at 1, so add the lines from all earlier chunks.
+        first_error_chunk = min(errors)
+        error_line, error_message = errors[first_error_chunk]
+        lines_before_chunk = sum(line_counts[chunk_number] for chunk_number in range(first_error_chunk))
+        print(error_message, end = "")
+        print(f"The error occurred in line {lines_before_chunk + error_line} of the text file")
+        exit()
+
+    invalidate_ranking()
+
+def process_user_input(available=None):
     """Asks users how many top orders to display.
 
     Checks that the user input can be converted to an integer. If the 
@@ -173,6 +484,10 @@ def process_user_input():
     them, and returns the maximum number of burgers instead. Called by 
     display_top_burgers().
 
+    Arguments:
+    available -- Number of different orders which can be displayed.
+    Defaults to the number of orders in order_frequency.
+
     Returns:
     int -- Either the requested number, or the maximum number
     """
@@ -182,12 +497,15 @@ def process_user_input():
         requested_number = int(input("How many of the top burger orders would you like to see?: "))
         if requested_number <= 0:
             print("That number is too low. Please enter a positive number: ")
-            process_user_input()
+            process_user_input(available)
     except ValueError:
         print("Input not valid. Please enter a positive number: ")
-        process_user_input()
+        process_user_input(available)
     
-    max = len(order_frequency)
+    max = available
+    if max == None:
+        max = len(order_frequency)
+
     if requested_number > max:
         print(f"There are only {max} different burgers recorded.")
         return max
@@ -198,7 +516,8 @@ def get_cost(burger_order):
     """Calculate the cost of individual burgers.
 
     Called by the display_top_burgers() function to calculate the
-    cost of the requested number of top orders only.
+    cost of the requested number of top orders only. Looks the price
+    up in the shared price table in codetown/pricing.py.
     
     Arguments:
     burger_order -- tuple containing details of the current burger
@@ -206,59 +525,334 @@ def get_cost(burger_order):
     Returns:
     int -- The price of the burger as an integer 
     """
-    burger_price = PRICES["base"]
-    
-    if burger_order[0] == "gluten free":
-        burger_price += PRICES["gluten_free"]
-    if burger_order[2] > 1:
-        burger_price += PRICES["patty"] * (burger_order[2] - 1)
-    if burger_order[3] > 1:
-        burger_price += PRICES["cheese"] * (burger_order[3] - 1)
+    return pricing.get_price(
+        burger_order[0], burger_order[2], burger_order[3],
+        burger_order[4], burger_order[5], burger_order[6])
 
-    salad_number = 0
+def invalidate_ranking():
+    """Discards the saved ranking after order_frequency has changed.
 
-    for salad_type in burger_order[4], burger_order[5], burger_order[6]:
-        if salad_type:
-            salad_number += 1
+    Called by every function which adds orders to order_frequency.
+    """
+    global ranked_orders
+    global ranking_complete
+
+    ranked_orders = []
+    ranking_complete = False
+
+def top_orders(requested_number):
+    """Finds the most frequent orders in order_frequency.
 
-    if salad_number > 1:
-        burger_price += PRICES["salad"] * (salad_number - 1)
+    Orders with the same frequency are ranked in the same way as sorting
+    by itemgetter(1,0) and reversing, so the order with the larger tuple
+    comes first. Only the requested number of orders are selected, using a
+    heap, which takes O(n log k) time rather than sorting every order. The
+    result is saved, so later requests for the same number of orders or fewer
+    are answered straight from the saved ranking until order_frequency changes.
+
+    Arguments:
+    requested_number -- How many of the top orders to find
 
-    return burger_price
+    Returns:
+    list -- (order, frequency) tuples from most to least frequent
+    """
+    global ranked_orders
+    global ranking_complete
+
+    if requested_number > len(ranked_orders) and not ranking_complete:
+        if requested_number >= len(order_frequency):
+            ranked_orders = sorted(order_frequency.items(), key=itemgetter(1,0), reverse=True)
+            ranking_complete = True
+        else:
+            ranked_orders = heapq.nlargest(requested_number, order_frequency.items(), key=itemgetter(1,0))
 
-def display_top_burgers():
+    return ranked_orders[:requested_number]
+
+def display_top_burgers(sorted_orders=None, requested_number=None):
     """Print fillings, order frequency and price for requested top orders.
 
-    Sorts the order_frequency dictionary by its values, and reverses the 
-    order to find those ordered most often. Calls process_user_input() to
-    determine how many to display, and get_cost() to calculate the prices
-    of those burgers.
+    Calls process_user_input() to determine how many to display, top_orders()
+    to find the orders made most often, and get_cost() to calculate the
+    prices of those burgers.
+
+    Arguments:
+    sorted_orders -- Optional list of (order, frequency) tuples which have
+    already been sorted from most to least frequent, used instead of
+    order_frequency.
+    requested_number -- Optional number of orders to display. If given, the
+    user isn't asked, and fewer are displayed if fewer orders are available.
+
+    Returns:
+    int -- The number of orders displayed
     """
-    sorted_orders = sorted(order_frequency.items(), key=itemgetter(1,0))
-    sorted_orders.reverse()
+    if sorted_orders == None:
+        available = len(order_frequency)
+    else:
+        available = len(sorted_orders)
+
+    if requested_number == None:
+        requested_number = process_user_input(available)
+    else:
+        requested_number = min(requested_number, available)
 
-    requested_number = process_user_input()
+    if sorted_orders == None:
+        with metrics.stage("sort", distinct_orders = len(order_frequency)):
+            top_number = dict(top_orders(requested_number))
+    else:
+        top_number = dict(sorted_orders[:requested_number])
 
-    top_number = {}
-    for i in range(requested_number):
-        burger = sorted_orders[i]
-        top_number[burger[0]] = burger[1]
+    with metrics.stage("pricing", distinct_orders = len(top_number)):
+        prices = [get_cost(key) for key in top_number]
 
     if requested_number == 1:
         print("The top burger was:\n")
     else:
         print(f"The top {requested_number} burgers were:\n")
 
-    for key, value in top_number.items():
-        price = get_cost(key)
+    for (key, value), price in zip(top_number.items(), prices):
         print(f"{key}\t{value}\t${price}\n")
 
+    return requested_number
+
+
+def parse_arguments():
+    """Reads the command line options.
+
+    Returns:
+    argparse.Namespace -- The options given on the command line
+    """
+    import argparse  # Only needed when run as a program, so not loaded by importing orders.py.
+
+    parser = argparse.ArgumentParser(description = "Display the most frequent burger orders.")
+    parser.add_argument(
+        "paths", nargs = "*",
+        help = f"order files, or folders of order files, to read (default: {ORDERS_FILENAME}). "
+               "More than one file, or a folder, is counted per store and merged (see shards.py)")
+    parser.add_argument(
+        "--tables",
+        help = "when reading several stores' files, save each store's table to this folder and reuse unchanged ones")
+    parser.add_argument(
+        "--from-tables",
+        help = "merge the tables already saved in this folder, without reading any order files")
+    parser.add_argument(
+        "--workers", type = int, default = 0,
+        help = "read the file in parallel using this many processes (default: read in a single process)")
+    parser.add_argument(
+        "--distinct", action = "store_true",
+        help = "count each different line first, then convert each different line only once")
+    parser.add_argument(
+        "--fast", action = "store_true",
+        help = "read the file with the memory-mapped parser in fast_parser.py")
+    parser.add_argument(
+        "--validate", action = "store_true",
+        help = "count every valid line and report bad lines instead of stopping at the first one")
+    parser.add_argument(
+        "--error-report",
+        help = "file to write the --validate report to (default: the orders filename followed by .errors.json)")
+    parser.add_argument(
+        "--max-error-rate", type = float, default = 0.0,
+        help = "with --validate, exit with status 1 if more than this fraction of lines are bad (default: 0)")
+    parser.add_argument(
+        "--incremental", action = "store_true",
+        help = "only re-read the blocks of the file which changed since the last run (see block_index.py)")
+    parser.add_argument(
+        "--codes", action = "store_true",
+        help = "count the orders as integer codes in a fixed size array (see order_codes.py)")
+    parser.add_argument(
+        "--binary",
+        help = "count orders from this binary order file instead, made with columnar.py")
+    parser.add_argument(
+        "--approximate", type = int, metavar = "COUNTERS",
+        help = "find the top orders approximately using this many counters, so memory use is fixed (see heavy_hitters.py)")
+    parser.add_argument(
+        "--revenue", action = "store_true",
+        help = "also print total revenue and revenue by bun, sauce, patties, cheese and salad (requires numpy)")
+    parser.add_argument(
+        "--demand", action = "store_true",
+        help = "also print how many buns, patties, cheese slices and serves of each sauce and salad the orders need (requires numpy)")
+    parser.add_argument(
+        "--top", type = int,
+        help = "number of top orders to display, instead of asking")
+    parser.add_argument(
+        "--window",
+        help = "only rank orders from this long before the latest timestamp, such as 15m, 1h or 1d (needs timestamps)")
+    parser.add_argument(
+        "--follow", action = "store_true",
+        help = "keep reading new orders as they are added to the file, displaying the top orders after each update")
+    parser.add_argument(
+        "--checkpoint",
+        help = "checkpoint file used by --follow (default: the orders filename followed by .checkpoint.json)")
+    parser.add_argument(
+        "--interval", type = float, default = 1.0,
+        help = "seconds between checks for new orders when using --follow (default: 1)")
+    parser.add_argument(
+        "--metrics",
+        help = "time each stage of the run and save the results to this JSON file (see metrics.py)")
+    parser.add_argument(
+        "--prometheus",
+        help = "time each stage of the run and save the results to this file in the Prometheus text format")
+
+    options = parser.parse_args()
+    if options.top != None and options.top < 1:
+        parser.error("--top must be at least 1")
+    if options.approximate != None and options.approximate < 1:
+        parser.error("--approximate must be at least 1")
+
+    return options
+
 
 if __name__ == "__main__":
-    # First create the order_frequency dictionary by reading in
-    #  all orders from the file.
-    read_file_and_process(ORDERS_FILENAME)
+    options = parse_arguments()
+    if options.metrics or options.prometheus:
+        metrics.enable()
+    report = None  # Set by --validate
+
+    filename = ORDERS_FILENAME
+    several_stores = len(options.paths) > 1 or any(os.path.isdir(path) for path in options.paths)
+    if len(options.paths) == 1 and not several_stores:
+        filename = options.paths[0]
+
+    if (options.incremental or options.follow) and os.path.isfile(filename) and compression_type(filename) != None:
+        print("--incremental and --follow can only be used with files which aren't compressed")
+        exit()
+
+    if options.follow:
+        from follow import follow_file
+
+        if options.top == None:
+            options.top = 5
 
-    # Next sort the orders, ask for user input, and display the 
-    #  requested number.
-    display_top_burgers()
+        # Each new order is added to the tracker as it is read, so updates don't go over earlier orders.
+        demand_tracker = None
+        if options.demand:
+            from demand import DemandTracker, display_demand
+            demand_tracker = DemandTracker()
+
+        def display_update(new_lines):
+            print(f"\n{new_lines} new lines read.")
+            display_top_burgers(requested_number = options.top)
+            if demand_tracker != None:
+                display_demand(demand_tracker.demand())
+
+        follow_file(filename, options.checkpoint, options.interval, display_update, demand = demand_tracker)
+
+    elif options.window:
+        from windows import WindowedCounter, parse_window, read_file_windowed
+
+        window = parse_window(options.window)
+        if window == None:
+            print("The window must be a whole number followed by s, m, h or d, such as 15m")
+            exit()
+
+        counter = WindowedCounter([window], math.gcd(window, 60))
+        read_file_windowed(filename, counter)
+        print(f"Orders in the {options.window} before the latest order:")
+        display_top_burgers(counter.top_orders(len(counter.window_totals[window]), window), options.top)
+
+        if options.demand:
+            from demand import demand_from_frequency, display_demand
+            display_demand(demand_from_frequency(counter.window_totals[window]))
+
+    elif options.approximate != None:
+        from heavy_hitters import SpaceSavingCounter, display_error_bounds, read_file_approximate
+
+        counter = SpaceSavingCounter(options.approximate)
+        read_file_approximate(filename, counter)
+        displayed = display_top_burgers(counter.top_orders(len(counter.counts)), options.top)
+        display_error_bounds(counter, displayed)
+
+        if options.demand:
+            from demand import demand_from_frequency, display_demand
+            print("Ingredient totals are estimated from the approximate counts.")
+            display_demand(demand_from_frequency(counter.counts))
+
+    elif several_stores or options.from_tables:
+        # Count each store separately, then merge the stores' tables.
+        from order_codes import decode_order
+        from shards import aggregate_files, merge_saved_tables
+
+        if options.from_tables:
+            counter = merge_saved_tables(options.from_tables)
+        else:
+            counter, store_counters = aggregate_files(options.paths, options.tables, options.workers or None)
+            print(f"{len(store_counters)} order files read.")
+        display_top_burgers([(decode_order(code), count) for code, count in counter.sorted_codes()], options.top)
+
+        if options.revenue:
+            from revenue import display_revenue, revenue_from_counter
+            with metrics.stage("pricing", distinct_orders = len(counter.items())):
+                revenue = revenue_from_counter(counter)
+            display_revenue(revenue)
+
+        if options.demand:
+            from demand import demand_from_counter, display_demand
+            display_demand(demand_from_counter(counter))
+
+    elif options.codes or options.binary:
+        # Count by order code, then sort the codes and only convert the
+        #  different orders back to tuples for display.
+        from order_codes import OrderCounter, decode_order, read_file_codes
+        counter = OrderCounter()
+
+        if options.binary:
+            from columnar import count_binary
+            header = count_binary(options.binary, counter)
+            if header["price_version"] != pricing.price_table.version:
+                print("Note: prices have changed since the binary file was written. Showing current prices.")
+        else:
+            read_file_codes(filename, counter)
+        display_top_burgers([(decode_order(code), count) for code, count in counter.sorted_codes()], options.top)
+
+        if options.revenue:
+            from revenue import display_revenue, revenue_from_counter
+            with metrics.stage("pricing", distinct_orders = len(counter.items())):
+                revenue = revenue_from_counter(counter)
+            display_revenue(revenue)
+
+        if options.demand:
+            from demand import demand_from_counter, display_demand
+            display_demand(demand_from_counter(counter))
+
+    else:
+        # First create the order_frequency dictionary by reading in
+        #  all orders from the file.
+        if options.validate:
+            from validation import display_report_summary, validate_file, write_report
+            report = validate_file(filename)
+            write_report(report, options.error_report or filename + ".errors.json")
+            display_report_summary(report)
+        elif options.incremental:
+            from block_index import read_file_incremental
+            read_file_incremental(filename)
+        elif options.workers > 0:
+            read_file_parallel(filename, options.workers)
+        elif options.distinct:
+            read_file_distinct(filename)
+        elif options.fast:
+            from fast_parser import read_file_mmap
+            read_file_mmap(filename, order_frequency)
+        else:
+            read_file_and_process(filename)
+
+        # Next sort the orders, ask for user input, and display the 
+        #  requested number.
+        display_top_burgers(requested_number = options.top)
+
+        if options.revenue:
+            from revenue import display_revenue, revenue_from_frequency
+            with metrics.stage("pricing", distinct_orders = len(order_frequency)):
+                revenue = revenue_from_frequency(order_frequency)
+            display_revenue(revenue)
+
+        if options.demand:
+            from demand import demand_from_frequency, display_demand
+            display_demand(demand_from_frequency(order_frequency))
+
+    if options.metrics:
+        metrics.export_json(options.metrics)
+    if options.prometheus:
+        metrics.export_prometheus(options.prometheus)
+
+    if report != None:
+        from validation import exit_status
+        sys.exit(exit_status(report, options.max_error_rate))
@@ -0,0 +1,319 @@
+"""
+Answers questions about subsets of orders, such as "the top 10 gluten free
+orders with barbecue sauce and at least 2 patties" or "the share of orders
+with no salad".
+
+Every possible value of each of the seven order attributes has a bitmap: a
+1024 bit integer with a bit set for each order code (see order_codes.py)
+that has that value. These are built once, when this module is imported.
+A query combines the bitmaps of the values it allows with "or" within an
+attribute and "and" between attributes, then with a bitmap of the codes that
+were actually ordered. Only the matching codes are visited, so a query never
+takes longer than looking at each different order once, however long the
+order file was.
+
+Usage:
+python3 query.py orders.txt --where "bun=gluten free" --where "sauce=barbecue" --where "patties>=2" --top 10
+python3 query.py orders.txt --where "tomato=no" --where "lettuce=no" --where "onion=no"
+"""
+
+import argparse
+import heapq
+import os
+from operator import itemgetter
+
+from orders import AVAILABLE_BUNS, AVAILABLE_SAUCES, ORDERS_FILENAME, convert_to_bool
+from order_codes import OrderCounter, VALID_CODES, decode_order, get_cost_by_code, read_file_codes
+
+ATTRIBUTES = ["bun", "sauce", "patties", "cheese", "tomato", "lettuce", "onion"]
+ATTRIBUTE_VALUES = {
+    "bun" : AVAILABLE_BUNS,
+    "sauce" : AVAILABLE_SAUCES,
+    "patties" : list(range(4)),
+    "cheese" : list(range(4)),
+    "tomato" : [True, False],
+    "lettuce" : [True, False],
+    "onion" : [True, False],
+}
+OPERATORS = ["<=", ">=", "!=", "=", "<", ">"]  # Two character operators are checked first
+
+def build_bitmaps():
+    """Creates the bitmap of order codes for every value of every attribute.
+
+    Returns:
+    dict -- For each attribute, a dictionary of each value's bitmap
+    """
+    bitmaps = {attribute : {value : 0 for value in ATTRIBUTE_VALUES[attribute]} for attribute in ATTRIBUTES}
+
+    for code in VALID_CODES:
+        for attribute, value in zip(ATTRIBUTES, decode_order(code)):
+            bitmaps[attribute][value] |= 1 << code
+
+    return bitmaps
+
+BITMAPS = build_bitmaps()
+ALL_ORDERS_BITMAP = sum(1 << code for code in VALID_CODES)
+
+def codes_in_bitmap(bitmap):
+    """The codes whose bits are set in a bitmap.
+
+    Arguments:
+    bitmap -- int with a bit set for each code
+
+    Returns:
+    list -- The codes, from smallest to largest
+    """
+    codes = []
+    while bitmap:
+        lowest_bit = bitmap & -bitmap
+        codes.append(lowest_bit.bit_length() - 1)
+        bitmap ^= lowest_bit
+
+    return codes
+
+def filter_bitmap(conditions):
+    """Combines the bitmaps for a set of conditions.
+
+    Arguments:
+    conditions -- dictionary of attribute names to a list of allowed values.
+                  Attributes which aren't included can have any value.
+
+    Returns:
+    int -- Bitmap of the codes matching every condition
+    None -- If an attribute or value isn't valid, after printing an error message
+    """
+    bitmap = ALL_ORDERS_BITMAP
+
+    for attribute, values in conditions.items():
+        if attribute not in BITMAPS:
+            print(f"{attribute} isn't an order attribute. Choose from {', '.join(ATTRIBUTES)}")
+            return None
+
+        allowed = 0
+        for value in values:
+            if value not in BITMAPS[attribute]:
+                print(f"{value} isn't a possible {attribute} choice")
+                return None
+            allowed |= BITMAPS[attribute][value]
+        bitmap &= allowed
+
+    return bitmap
+
+def convert_condition_value(attribute, value):
+    """Converts the text value of a condition to the type used in order tuples.
+
+    Arguments:
+    attribute -- Name of the attribute
+    value -- The value as text
+
+    Returns:
+    String, int or bool -- The converted value
+    None -- If the value isn't valid, after printing an error message
+    """
+    value = value.strip().lower()
+    if attribute in ("bun", "sauce"):
+        if value not in ATTRIBUTE_VALUES[attribute]:
+            print(f"{value} isn't a possible {attribute} choice")
+            return None
+        return value
+    elif attribute in ("patties", "cheese"):
+        try:
+            number = int(value)
+        except ValueError:
+            print(f"The number of {attribute} must be a whole number")
+            return None
+        if number not in ATTRIBUTE_VALUES[attribute]:
+            print(f"{number} isn't a possible {attribute} choice")
+            return None
+        return number
+    else:
+        return convert_to_bool(value, attribute)
+
+def parse_condition(condition):
+    """Converts a condition such as "patties>=2" to the values it allows.
+
+    Bun and sauce can only use = or !=, as they have no order.
+
+    Arguments:
+    condition -- String of an attribute, an operator (=, !=, <, <=, > or >=) and a value
+
+    Returns:
+    tuple -- (attribute name, list of allowed values)
+    None -- If the condition isn't valid, after printing an error message
+    """
+    for operator in OPERATORS:
+        if operator in condition:
+            attribute, text_value = condition.split(operator, 1)
+            break
+    else:
+        print(f"The condition '{condition}' needs an operator: {', '.join(OPERATORS)}")
+        return None
+
+    attribute = attribute.strip().lower()
+    if attribute not in ATTRIBUTE_VALUES:
+        print(f"{attribute} isn't an order attribute. Choose from {', '.join(ATTRIBUTES)}")
+        return None
+
+    value = convert_condition_value(attribute, text_value)
+    if value == None:
+        return None
+
+    possible_values = ATTRIBUTE_VALUES[attribute]
+    if operator == "=":
+        allowed = [value]
+    elif operator == "!=":
+        allowed = [possible for possible in possible_values if possible != value]
+    elif attribute in ("bun", "sauce"):
+        print(f"{attribute} can only be compared with = or !=")
+        return None
+    elif operator == "<":
+        allowed = [possible for possible in possible_values if possible < value]
+    elif operator == "<=":
+        allowed = [possible for possible in possible_values if possible <= value]
+    elif operator == ">":
+        allowed = [possible for possible in possible_values if possible > value]
+    else:
+        allowed = [possible for possible in possible_values if possible >= value]
+
+    return attribute, allowed
+
+def parse_conditions(condition_list):
+    """Converts a list of conditions to the dictionary used by filter_bitmap().
+
+    Conditions on the same attribute must all be true, so "patties>=1" and
+    "patties<3" allow 1 or 2 patties.
+
+    Arguments:
+    condition_list -- list of condition strings, see parse_condition()
+
+    Returns:
+    dict -- Attribute names mapped to their allowed values
+    None -- If any condition isn't valid
+    """
+    conditions = {}
+    for condition in condition_list:
+        parsed = parse_condition(condition)
+        if parsed == None:
+            return None
+
+        attribute, allowed = parsed
+        if attribute in conditions:
+            allowed = [value for value in conditions[attribute] if value in allowed]
+        conditions[attribute] = allowed
+
+    return conditions
+
+class OrderIndex:
+    """Answers queries about the orders counted in an OrderCounter.
+
+    Attributes:
+    counter -- The OrderCounter being queried
+    ordered_bitmap -- Bitmap of the codes ordered at least once
+    total_orders -- Number of orders in the counter
+
+    Methods:
+    refresh() -- Update the index after more orders are added to the counter
+    query() -- Find the orders matching some conditions
+    """
+
+    def __init__(self, counter):
+        self.counter = counter
+        self.refresh()
+
+    def refresh(self):
+        """Update the index after more orders are added to the counter."""
+        self.ordered_bitmap = 0
+        self.total_orders = 0
+        for code, count in self.counter.items():
+            self.ordered_bitmap |= 1 << code
+            self.total_orders += count
+
+    def query(self, conditions, requested_number=None):
+        """Find the orders matching some conditions.
+
+        Arguments:
+        conditions -- dictionary of attribute names to a list of allowed values
+        requested_number -- How many of the top matching orders to rank. Defaults to all of them.
+
+        Returns:
+        dict -- with these keys:
+            "orders": list of (order tuple, frequency, price), from most to least frequent
+            "matching_orders": number of orders matching the conditions
+            "total_orders": number of orders altogether
+            "share": fraction of all orders matching the conditions
+            "revenue": total price of the matching orders
+        None -- If the conditions aren't valid
+        """
+        bitmap = filter_bitmap(conditions)
+        if bitmap == None:
+            return None
+
+        counts = self.counter.counts
+        matches = [(code, counts[code]) for code in codes_in_bitmap(bitmap & self.ordered_bitmap)]
+
+        matching_orders = 0
+        revenue = 0
+        for code, count in matches:
+            matching_orders += count
+            revenue += count * get_cost_by_code(code)
+
+        # Ties are broken by the larger code first, the same as display_top_burgers().
+        if requested_number == None or requested_number >= len(matches):
+            ranked = sorted(matches, key=itemgetter(1,0), reverse=True)
+        else:
+            ranked = heapq.nlargest(requested_number, matches, key=itemgetter(1,0))
+
+        if self.total_orders == 0:
+            share = 0.0
+        else:
+            share = matching_orders / self.total_orders
+
+        return {
+            "orders" : [(decode_order(code), count, get_cost_by_code(code)) for code, count in ranked],
+            "matching_orders" : matching_orders,
+            "total_orders" : self.total_orders,
+            "share" : share,
+            "revenue" : revenue,
+        }
+
+def display_query_result(result):
+    """Prints the result of OrderIndex.query().
+
+    Arguments:
+    result -- dictionary returned by OrderIndex.query()
+    """
+    print(f"{result['matching_orders']} of {result['total_orders']} orders match ({result['share']:.2%}), "
+          f"totalling ${result['revenue']}\n")
+
+    for order, count, price in result["orders"]:
+        print(f"{order}\t{count}\t${price}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Find the top orders matching some conditions.")
+    parser.add_argument("paths", nargs = "*", help = f"order files, or folders of order files (default: {ORDERS_FILENAME})")
+    parser.add_argument(
+        "--where", action = "append", default = [],
+        help = 'a condition such as "bun=milk", "sauce!=none" or "patties>=2". Can be given more than once')
+    parser.add_argument("--top", type = int, default = 10, help = "number of matching orders to display (default: 10)")
+    parser.add_argument("--from-tables", help = "query the tables saved in this folder by orders.py --tables")
+    options = parser.parse_args()
+
+    conditions = parse_conditions(options.where)
+    if conditions == None:
+        exit()
+
+    if options.from_tables:
+        from shards import merge_saved_tables
+        counter = merge_saved_tables(options.from_tables)
+    elif len(options.paths) > 1 or any(os.path.isdir(path) for path in options.paths):
+        from shards import aggregate_files
+        counter = aggregate_files(options.paths)[0]
+    else:
+        counter = OrderCounter()
+        read_file_codes((options.paths or [ORDERS_FILENAME])[0], counter)
+
+    result = OrderIndex(counter).query(conditions, options.top)
+    if result == None:
+        exit()
+    display_query_result(result)
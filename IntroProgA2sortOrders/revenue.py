@@ -0,0 +1,168 @@
+"""
+Batched pricing and revenue totals for burger orders, calculated with NumPy.
+
+Orders are handled as arrays of order codes (see order_codes.py) along with
+how many times each was ordered, so the whole order history can be priced
+and grouped without a Python loop for each order. Prices are read from the
+same shared price table as get_cost() in orders.py.
+
+Requires NumPy:
+pip install numpy
+"""
+
+import numpy
+
+from order_codes import BUN_CODES, CODE_SPACE_SIZE, SAUCE_CODES, VALID_CODES, encode_order
+from codetown import pricing  # orders.py adds the codetown folder to sys.path, so must be imported first
+
+# Labels for each group in the revenue breakdown, in code order.
+BUN_LABELS = sorted(BUN_CODES, key=BUN_CODES.get)
+SAUCE_LABELS = sorted(SAUCE_CODES, key=SAUCE_CODES.get)
+AMOUNT_LABELS = [0, 1, 2, 3]
+
+def price_columns(gluten_free, patties, cheese, salad_number):
+    """Calculate the price of many burgers at once from arrays of their fillings.
+
+    Arguments:
+    gluten_free -- array of booleans, True for a gluten free bun
+    patties -- array of the number of patties on each burger
+    cheese -- array of the number of cheese slices on each burger
+    salad_number -- array of how many of tomato, lettuce and onion each burger has
+
+    Returns:
+    numpy.ndarray -- The price of each burger
+    """
+    table = numpy.asarray(pricing.price_table.table)
+    index = (numpy.asarray(gluten_free, dtype=numpy.int64) << 6
+        | numpy.asarray(patties, dtype=numpy.int64) << 4
+        | numpy.asarray(cheese, dtype=numpy.int64) << 2
+        | numpy.asarray(salad_number, dtype=numpy.int64))
+    return table[index]
+
+def unpack_codes(codes):
+    """Split an array of order codes into an array for each field.
+
+    Arguments:
+    codes -- array of order codes
+
+    Returns:
+    dict -- arrays for "bun", "sauce", "patties", "cheese" and "salad_number",
+    with buns and sauces given as their index in BUN_LABELS and SAUCE_LABELS
+    """
+    codes = numpy.asarray(codes, dtype=numpy.int64)
+    return {
+        "bun" : (codes >> 9) & 1,
+        "sauce" : (codes >> 7) & 3,
+        "patties" : (codes >> 5) & 3,
+        "cheese" : (codes >> 3) & 3,
+        "salad_number" : ((codes >> 2) & 1) + ((codes >> 1) & 1) + (codes & 1)
+    }
+
+def price_codes(codes):
+    """Calculate the price of each order code in an array.
+
+    Arguments:
+    codes -- array of order codes
+
+    Returns:
+    numpy.ndarray -- The price of each order, matching get_cost()
+    """
+    fields = unpack_codes(codes)
+    return price_columns(
+        fields["bun"] == BUN_CODES["gluten free"],
+        fields["patties"],
+        fields["cheese"],
+        fields["salad_number"])
+
+def price_orders(orders):
+    """Calculate the price of a list of order tuples.
+
+    Arguments:
+    orders -- list of tuples in the format returned by convert_to_tuple()
+
+    Returns:
+    numpy.ndarray -- The price of each order, matching get_cost()
+    """
+    # Each different order is only encoded once, then the codes are looked up
+    # for every order by map(), without a line of Python running for each one.
+    code_by_order = {order : encode_order(order) for order in set(orders)}
+    codes = numpy.fromiter(map(code_by_order.__getitem__, orders), dtype=numpy.int64, count=len(orders))
+    return price_codes(codes)
+
+def revenue_by_group(codes, counts=None):
+    """Calculate total revenue, and revenue for each bun, sauce, patty and salad amount.
+
+    Arguments:
+    codes -- array of order codes. May contain repeats, such as one code for
+    every line of an order file.
+    counts -- Optional array of how many times each code was ordered. If not
+    given, each code in codes is counted once.
+
+    Returns:
+    dict -- "orders" and "revenue" totals, and a dictionary for each of
+    "bun", "sauce", "patties", "cheese" and "salad_number" mapping each value
+    to the revenue from burgers with that value
+    """
+    if counts is None:
+        # Collapse the repeats first, so each code is only priced once.
+        counts = numpy.bincount(numpy.asarray(codes, dtype=numpy.int64), minlength=CODE_SPACE_SIZE)
+        codes = numpy.arange(CODE_SPACE_SIZE)
+
+    codes = numpy.asarray(codes, dtype=numpy.int64)
+    counts = numpy.asarray(counts, dtype=numpy.int64)
+    valid = numpy.isin(codes, VALID_CODES) & (counts > 0)
+    codes = codes[valid]
+    counts = counts[valid]
+
+    revenue = price_codes(codes) * counts
+    fields = unpack_codes(codes)
+
+    report = {
+        "orders" : int(counts.sum()),
+        "revenue" : int(revenue.sum())
+    }
+    for field, labels in ("bun", BUN_LABELS), ("sauce", SAUCE_LABELS), ("patties", AMOUNT_LABELS), \
+            ("cheese", AMOUNT_LABELS), ("salad_number", AMOUNT_LABELS):
+        totals = numpy.bincount(fields[field], weights=revenue, minlength=len(labels))
+        report[field] = {labels[i] : int(totals[i]) for i in range(len(labels))}
+
+    return report
+
+def revenue_from_counter(counter):
+    """Calculate the revenue report for an OrderCounter.
+
+    Arguments:
+    counter -- OrderCounter holding the frequency of each code
+
+    Returns:
+    dict -- The report from revenue_by_group()
+    """
+    counts = numpy.frombuffer(counter.counts, dtype=numpy.int64)
+    return revenue_by_group(numpy.arange(CODE_SPACE_SIZE), counts)
+
+def revenue_from_frequency(frequency):
+    """Calculate the revenue report for an order_frequency style dictionary.
+
+    Arguments:
+    frequency -- dictionary of order tuples mapped to their frequencies
+
+    Returns:
+    dict -- The report from revenue_by_group()
+    """
+    codes = [encode_order(order) for order in frequency]
+    return revenue_by_group(codes, list(frequency.values()))
+
+def display_revenue(report):
+    """Print the total revenue and the revenue for each group.
+
+    Arguments:
+    report -- dictionary returned by revenue_by_group()
+    """
+    print(f"Total revenue from {report['orders']} burgers: ${report['revenue']}\n")
+
+    for field, title in ("bun", "Bun"), ("sauce", "Sauce"), ("patties", "Patties"), \
+            ("cheese", "Cheese slices"), ("salad_number", "Salad items"):
+        print(f"Revenue by {title.lower()}:")
+        for value, total in report[field].items():
+            print(f"\t{value}\t${total}")
+        print()
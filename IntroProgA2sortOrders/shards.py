@@ -0,0 +1,198 @@
+"""
+Aggregates the order files from many stores at once.
+
+Each store's file is counted independently in a pool of worker processes,
+giving an OrderCounter for each store. The counters are then merged in a
+tree: pairs are merged, then pairs of those results, and so on, until one
+counter holds the orders for the whole chain.
+
+Each store's counter can be saved to a folder of tables. A saved table is
+reused while its order file hasn't changed, and a chain-wide report can be
+made from the saved tables alone, without reading any order files.
+"""
+
+import glob
+import hashlib
+import io
+import os
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+
+import metrics
+from order_codes import OrderCounter, load_counter, read_file_codes, save_counter
+
+ORDER_FILE_PATTERNS = ["*.txt", "*.txt.gz", "*.txt.bz2", "*.txt.xz"]  # Files read when a folder is given
+TABLE_SUFFIX = ".counts"
+
+def find_order_files(paths):
+    """Expand a list of files and folders into a list of order files.
+
+    Arguments:
+    paths -- list of order files, or folders containing order files
+
+    Returns:
+    list -- The order files, in the order given, with each folder's files sorted by name
+    """
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            folder_files = []
+            for pattern in ORDER_FILE_PATTERNS:
+                folder_files.extend(glob.glob(os.path.join(path, pattern)))
+            filenames.extend(sorted(folder_files))
+        else:
+            filenames.append(path)
+
+    return filenames
+
+def table_filename(tables_folder, filename):
+    """The file a store's table is saved to.
+
+    Stores often use the same name for their order files in different
+    folders, so the name is followed by part of a hash of the file's full
+    path, giving each file its own table.
+
+    Arguments:
+    tables_folder -- Folder of saved tables
+    filename -- The store's order file
+
+    Returns:
+    String -- Path of the table file
+    """
+    path_hash = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()[:12]
+    return os.path.join(tables_folder, f"{os.path.basename(filename)}-{path_hash}{TABLE_SUFFIX}")
+
+def source_details(filename):
+    """Details used to tell whether a saved table is still up to date.
+
+    Arguments:
+    filename -- The store's order file
+
+    Returns:
+    dict -- The file's name, size and modification time
+    """
+    status = os.stat(filename)
+    return {"source" : os.path.abspath(filename), "size" : status.st_size, "modified_time" : status.st_mtime_ns}
+
+def count_store_file(task):
+    """Count one store's order file. Runs inside a worker process.
+
+    Error messages are captured rather than printed, so they can be
+    reported by the main process along with the file they came from. The
+    stages timed by metrics.py are returned too, so the main process can add
+    them to its own totals.
+
+    Arguments:
+    task -- tuple of (filename, tables_folder), where tables_folder may be None
+
+    Returns:
+    tuple -- (filename, OrderCounter or None, error messages, stage totals)
+    """
+    filename, tables_folder = task
+    metrics.reset()
+
+    if tables_folder != None:
+        saved = load_counter(table_filename(tables_folder, filename))
+        try:
+            if saved != None and saved[1] == source_details(filename):
+                return filename, saved[0], "", metrics.stage_totals
+        except OSError:
+            pass  # Reported when the file is read below.
+
+    counter = OrderCounter()
+    with redirect_stdout(io.StringIO()) as messages:
+        try:
+            read_file_codes(filename, counter)
+        except SystemExit:
+            return filename, None, messages.getvalue(), metrics.stage_totals
+
+    if tables_folder != None:
+        save_counter(counter, table_filename(tables_folder, filename), source_details(filename))
+
+    return filename, counter, "", metrics.stage_totals
+
+def tree_merge(counters):
+    """Merge a list of OrderCounters into one by merging pairs in rounds.
+
+    Arguments:
+    counters -- list of OrderCounters. They may be changed.
+
+    Returns:
+    OrderCounter -- Holding the total frequencies
+    """
+    if not counters:
+        return OrderCounter()
+
+    while len(counters) > 1:
+        merged = []
+        for i in range(0, len(counters) - 1, 2):
+            counters[i].merge(counters[i + 1])
+            merged.append(counters[i])
+        if len(counters) % 2 == 1:
+            merged.append(counters[-1])
+        counters = merged
+
+    return counters[0]
+
+def copy_counter(counter):
+    """Copy an OrderCounter, so merging doesn't change the original.
+
+    Arguments:
+    counter -- OrderCounter to copy
+
+    Returns:
+    OrderCounter -- The copy
+    """
+    copy = OrderCounter()
+    copy.merge(counter)
+    return copy
+
+def aggregate_files(paths, tables_folder=None, workers=None):
+    """Count many stores' order files in parallel and merge them.
+
+    If any file has a bad line, prints which file and the error, then exits.
+
+    Arguments:
+    paths -- list of order files, or folders containing order files
+    tables_folder -- Optional folder to save each store's table to, and reuse saved tables from
+    workers -- Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+    tuple -- (OrderCounter for the whole chain, dictionary of each file's OrderCounter)
+    """
+    filenames = find_order_files(paths)
+    if tables_folder != None:
+        os.makedirs(tables_folder, exist_ok = True)
+
+    # Workers only time their files if instrumentation is on in this process.
+    with Pool(workers, metrics.enable if metrics.enabled else None) as pool:
+        results = pool.map(count_store_file, [(filename, tables_folder) for filename in filenames])
+
+    for filename, counter, messages, stage_totals in results:
+        metrics.add_totals(stage_totals)
+        if counter == None:
+            print(f"{filename}:")
+            print(messages, end = "")
+            exit()
+
+    store_counters = {filename : counter for filename, counter, messages, stage_totals in results}
+    return tree_merge([copy_counter(counter) for counter in store_counters.values()]), store_counters
+
+def merge_saved_tables(tables_folder):
+    """Merge every saved table in a folder, without reading any order files.
+
+    Arguments:
+    tables_folder -- Folder of tables saved by aggregate_files()
+
+    Returns:
+    OrderCounter -- Holding the total frequencies
+    """
+    counters = []
+    for filename in sorted(glob.glob(os.path.join(tables_folder, "*" + TABLE_SUFFIX))):
+        saved = load_counter(filename)
+        if saved == None:
+            print(f"The table {filename} can't be read")
+            exit()
+        counters.append(saved[0])
+
+    return tree_merge(counters)
@@ -0,0 +1,63 @@
+"""
+Tests for order_server.py, run with:
+python3 -m unittest test_order_server
+"""
+
+import asyncio
+import unittest
+
+import order_server
+from orders import order_frequency
+
+async def send_lines(lines):
+    """Start a server on a free port, send some lines from one till, and read the replies.
+
+    Arguments:
+    lines -- list of bytes, each ending in a newline
+
+    Returns:
+    list -- The reply line to each line sent
+    """
+    server = order_server.OrderServer()
+    counter_task = asyncio.create_task(server.count_orders())
+    listener = await asyncio.start_server(server.handle_client, "127.0.0.1", 0, limit = order_server.MAX_LINE_LENGTH)
+    port = listener.sockets[0].getsockname()[1]
+
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for line in lines:
+            writer.write(line)
+            replies.append(await reader.readline())
+        writer.write(b"QUIT\n")
+        writer.close()
+        return replies
+    finally:
+        counter_task.cancel()
+        listener.close()
+        await listener.wait_closed()
+
+class OrderServerTest(unittest.TestCase):
+
+    def setUp(self):
+        order_frequency.clear()
+
+    def test_invalid_bytes_get_an_error_reply(self):
+        replies = asyncio.run(send_lines([
+            b"milk,tomato,2,1,yes,no,\xff\xfe\n",
+            b"PRICE milk,\xc3\x28,2,1,yes,no,no\n",
+            b"milk,tomato,2,1,yes,no,no\n",
+        ]))
+
+        self.assertTrue(replies[0].startswith(b"ERROR"))
+        self.assertTrue(replies[1].startswith(b"ERROR"))
+        self.assertEqual(replies[2], b"OK\n")  # The connection is still open after the bad lines.
+
+    def test_top_below_one_is_an_error(self):
+        replies = asyncio.run(send_lines([b"TOP 0\n", b"TOP -1\n"]))
+
+        self.assertEqual(replies, [b"ERROR TOP must be followed by a number of at least 1\n"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
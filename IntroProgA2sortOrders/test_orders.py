@@ -0,0 +1,47 @@
+"""
+Tests for the command line options of orders.py, run with:
+python3 -m unittest test_orders
+"""
+
+import io
+import sys
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+from orders import parse_arguments
+
+def parse(arguments):
+    """Reads a list of command line arguments with parse_arguments().
+
+    Arguments:
+    arguments -- list of Strings, not including the program name
+
+    Returns:
+    argparse.Namespace -- The options given
+    """
+    with mock.patch.object(sys, "argv", ["orders.py"] + arguments):
+        return parse_arguments()
+
+class ParseArgumentsTest(unittest.TestCase):
+
+    def test_top_below_one_is_rejected(self):
+        for top in "0", "-3":
+            with self.subTest(top = top), redirect_stderr(io.StringIO()) as errors:
+                with self.assertRaises(SystemExit):
+                    parse(["--top", top])
+                self.assertIn("--top must be at least 1", errors.getvalue())
+
+    def test_top_of_one_or_more_is_accepted(self):
+        self.assertEqual(parse(["--top", "1"]).top, 1)
+        self.assertEqual(parse([]).top, None)
+
+    def test_approximate_below_one_is_rejected(self):
+        with redirect_stderr(io.StringIO()) as errors:
+            with self.assertRaises(SystemExit):
+                parse(["--approximate", "0"])
+        self.assertIn("--approximate must be at least 1", errors.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
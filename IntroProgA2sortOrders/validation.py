@@ -0,0 +1,211 @@
+"""
+Reads an order file without stopping at bad lines, and reports every problem found.
+
+read_file_and_process() exits at the first bad line, and the helper
+functions print a message for every bad field. In validation mode every
+valid line is still counted in order_frequency, nothing is printed while
+reading, and bad lines are only counted by the type of error, along with
+a limited sample of their line numbers. At the end a report is written as
+JSON, and the number of bad lines can be compared against a threshold to
+decide the program's exit status.
+"""
+
+import io
+import json
+import os
+from contextlib import redirect_stdout
+
+import metrics
+from compressed import open_byte_lines
+from fast_parser import AMOUNT_VALUES, BUN_VALUES, SAUCE_VALUES, YES_NO_VALUES
+from orders import AVAILABLE_BUNS, AVAILABLE_SAUCES, convert_timestamp, invalidate_ranking, order_frequency
+
+# Each type of error, in the order they are checked.
+ERROR_TYPES = {
+    "wrong_field_count" : "Order doesn't have exactly 7 fields",
+    "bad_bun" : "The bun choice isn't an available option",
+    "bad_sauce" : "The sauce choice isn't an available option",
+    "bad_amount" : "Patties or cheese slices can't be converted to int",
+    "amount_out_of_range" : "Patties or cheese slices not between 0 and 3",
+    "bad_yes_no" : "Tomato, lettuce or onion isn't 'yes' or 'no'",
+    "bad_timestamp" : "The optional timestamp isn't a valid time"
+}
+
+MAX_SAMPLES = 10  # Line numbers kept for each type of error
+MAX_REMEMBERED_LINES = 10000  # Different raw lines remembered while reading
+
+def find_order_errors(order):
+    """Finds every problem with an order String, without printing anything.
+
+    Uses the same rules as convert_to_tuple().
+
+    Arguments:
+    order -- String representing a single burger order
+
+    Returns:
+    tuple -- The order converted to a tuple, or None if it isn't valid
+    list -- Names of the error types found, from ERROR_TYPES
+    """
+    fields = order.strip().split(",")
+    errors = []
+
+    if len(fields) == 8:
+        # convert_timestamp() prints its own message, which isn't wanted here.
+        with redirect_stdout(io.StringIO()):
+            if convert_timestamp(fields.pop()) == None:
+                errors.append("bad_timestamp")
+
+    if len(fields) != 7:
+        return None, ["wrong_field_count"]
+
+    if fields[0] not in AVAILABLE_BUNS:
+        errors.append("bad_bun")
+    if fields[1] not in AVAILABLE_SAUCES:
+        errors.append("bad_sauce")
+
+    for i in 2, 3:
+        try:
+            fields[i] = int(fields[i])
+            if fields[i] < 0 or fields[i] > 3:
+                errors.append("amount_out_of_range")
+        except ValueError:
+            errors.append("bad_amount")
+
+    for i in 4, 5, 6:
+        if fields[i] == "yes":
+            fields[i] = True
+        elif fields[i] == "no":
+            fields[i] = False
+        else:
+            errors.append("bad_yes_no")
+
+    if errors:
+        return None, errors
+    return tuple(fields), errors
+
+def convert_line(line):
+    """Converts one line of bytes, using the fast byte lookups where possible.
+
+    Arguments:
+    line -- bytes representing a single burger order
+
+    Returns:
+    tuple -- The order converted to a tuple, or None if it isn't valid
+    list -- Names of the error types found
+    """
+    fields = line.strip().split(b",")
+
+    if len(fields) == 7:
+        try:
+            return (
+                BUN_VALUES[fields[0]],
+                SAUCE_VALUES[fields[1]],
+                AMOUNT_VALUES[fields[2]],
+                AMOUNT_VALUES[fields[3]],
+                YES_NO_VALUES[fields[4]],
+                YES_NO_VALUES[fields[5]],
+                YES_NO_VALUES[fields[6]]), []
+        except KeyError:
+            pass
+
+    return find_order_errors(line.decode(errors = "replace"))
+
+def validate_file(filename, frequency=None, max_samples=MAX_SAMPLES):
+    """Adds every valid order in a file to order_frequency, and counts the bad lines.
+
+    Arguments:
+    filename -- The file to read orders from
+    frequency -- Dictionary to add the orders to. Defaults to order_frequency.
+    max_samples -- Number of line numbers to keep for each type of error
+
+    Returns:
+    dict -- The validation report. See write_report().
+    """
+    if frequency == None:
+        frequency = order_frequency
+
+    error_counts = {error_type : 0 for error_type in ERROR_TYPES}
+    samples = {error_type : [] for error_type in ERROR_TYPES}
+    remembered_lines = {}
+    line_number = 0
+    invalid_lines = 0
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_line)
+
+    try:
+        with open_byte_lines(filename) as lines:
+            for line in timer.timed_lines(lines):
+                line_number += 1
+                result = remembered_lines.get(line)
+
+                if result == None:
+                    result = convert(line)
+                    if len(remembered_lines) < MAX_REMEMBERED_LINES:
+                        remembered_lines[line] = result
+
+                order, errors = result
+                if order != None:
+                    frequency[order] = frequency.get(order, 0) + 1
+                else:
+                    invalid_lines += 1
+                    for error_type in errors:
+                        error_counts[error_type] += 1
+                        if len(samples[error_type]) < max_samples:
+                            samples[error_type].append(line_number)
+
+        timer.finish(line_number, os.path.getsize(filename), len(frequency))
+        invalidate_ranking()
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
+
+    return {
+        "filename" : filename,
+        "lines" : line_number,
+        "valid_lines" : line_number - invalid_lines,
+        "invalid_lines" : invalid_lines,
+        "error_rate" : invalid_lines / line_number if line_number else 0.0,
+        "errors" : error_counts,
+        "sample_line_numbers" : samples
+    }
+
+def write_report(report, report_filename):
+    """Writes a validation report to a JSON file.
+
+    Arguments:
+    report -- dictionary returned by validate_file()
+    report_filename -- The file to write the report to
+    """
+    with open(report_filename, "w") as file:
+        json.dump(report, file, indent = 4)
+
+def display_report_summary(report):
+    """Prints a short summary of a validation report.
+
+    Arguments:
+    report -- dictionary returned by validate_file()
+    """
+    print(f"{report['invalid_lines']} of {report['lines']} lines were not valid ({report['error_rate']:.2%})")
+
+    for error_type, count in report["errors"].items():
+        if count > 0:
+            lines = ", ".join(str(line) for line in report["sample_line_numbers"][error_type])
+            print(f"\t{ERROR_TYPES[error_type]}: {count} (lines {lines})")
+
+def exit_status(report, max_error_rate):
+    """Chooses the exit status for a validation run.
+
+    Arguments:
+    report -- dictionary returned by validate_file()
+    max_error_rate -- Largest fraction of bad lines which is still a success
+
+    Returns:
+    int -- 0 if the error rate is within the threshold, otherwise 1
+    """
+    if report["error_rate"] > max_error_rate:
+        return 1
+    return 0
@@ -0,0 +1,252 @@
+"""
+Popularity of orders over recent time windows, such as the last 15 minutes.
+
+Orders with the optional timestamp field are added to a WindowedCounter,
+which keeps a ring buffer of buckets covering a fixed length of time (one
+minute each by default). Each bucket holds the frequency of each order made
+during that minute. A running total is also kept for each supported window,
+such as the last 15 minutes, hour or day. When time moves on, the buckets
+which fall out of a window are subtracted from its total, so top orders for
+any supported window can be found without going back over old orders, and
+the memory used depends only on the number of buckets.
+"""
+
+import heapq
+import os
+from operator import itemgetter
+
+import metrics
+from compressed import open_order_file
+from orders import convert_timestamp, convert_to_tuple
+
+WINDOW_UNITS = {"s" : 1, "m" : 60, "h" : 3600, "d" : 86400}
+
+def parse_window(window):
+    """Converts a window length such as "15m", "1h", "1d" or "90" to seconds.
+
+    Arguments:
+    window -- String giving a number followed by an optional unit
+
+    Returns:
+    int -- Length of the window in seconds
+    None -- If the window isn't valid
+    """
+    unit = window[-1:]
+    if unit in WINDOW_UNITS:
+        window = window[:-1]
+    else:
+        unit = "s"
+
+    try:
+        seconds = int(window) * WINDOW_UNITS[unit]
+    except ValueError:
+        return None
+
+    if seconds <= 0:
+        return None
+    return seconds
+
+def convert_to_timed_tuple(order):
+    """Converts an order String which includes a timestamp.
+
+    Arguments:
+    order -- String representing a single burger order, with a timestamp as the 8th field
+
+    Returns:
+    tuple -- (order tuple, timestamp in seconds since 1970)
+    None -- If the order or its timestamp isn't valid, or there is no timestamp
+    """
+    order = order.strip()
+    if order.count(",") != 7:
+        print("Order must include bun choice, sauce choice, 2 numbers, 3 instances of \"yes\" or \"no\", and a timestamp")
+        return None
+
+    order, separator, timestamp = order.rpartition(",")
+    timestamp = convert_timestamp(timestamp)
+    order = convert_to_tuple(order)
+
+    if order == None or timestamp == None:
+        return None
+    return order, timestamp
+
+
+class WindowedCounter:
+    """Frequency of each order within recent time windows.
+
+    Attributes:
+    bucket_seconds -- Length of time covered by each bucket
+    bucket_count -- Number of buckets in the ring buffer
+    buckets -- list of dictionaries of order frequencies, one for each bucket
+    bucket_numbers -- Which bucket of time each position in buckets holds
+    newest -- Number of the most recent bucket, or None before any orders
+    window_buckets -- Number of buckets in each supported window, by window length in seconds
+    window_totals -- Dictionary of order frequencies for each supported window
+
+    Methods:
+    add() -- Add an order made at a given time
+    advance() -- Move the current time forward, dropping old orders from the windows
+    top_orders() -- The most frequent orders within a window
+    """
+
+    def __init__(self, windows=(900, 3600, 86400), bucket_seconds=60):
+        """Set up empty buckets covering the longest window.
+
+        Arguments:
+        windows -- Lengths of the supported windows in seconds. Each must be a
+        whole number of buckets.
+        bucket_seconds -- Length of time covered by each bucket
+        """
+        for window in windows:
+            if window % bucket_seconds != 0:
+                raise ValueError(f"Window of {window} seconds isn't a whole number of {bucket_seconds} second buckets")
+
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(windows) // bucket_seconds
+        self.buckets = [{} for i in range(self.bucket_count)]
+        self.bucket_numbers = [None] * self.bucket_count
+        self.newest = None
+        self.window_buckets = {window : window // bucket_seconds for window in windows}
+        self.window_totals = {window : {} for window in windows}
+
+    def add(self, order, timestamp, count=1):
+        """Add an order made at a given time.
+
+        Orders can arrive a little out of time order. An order older than the
+        longest window is ignored.
+
+        Arguments:
+        order -- tuple returned by convert_to_tuple()
+        timestamp -- Time of the order in seconds since 1970
+        count -- How many of the order to add. Defaults to 1.
+
+        Returns:
+        bool -- False if the order was too old to be kept
+        """
+        bucket_number = int(timestamp // self.bucket_seconds)
+        self.advance_to(bucket_number)
+
+        age = self.newest - bucket_number
+        if age >= self.bucket_count:
+            return False
+
+        position = bucket_number % self.bucket_count
+        if self.bucket_numbers[position] != bucket_number:
+            self.buckets[position] = {}
+            self.bucket_numbers[position] = bucket_number
+        bucket = self.buckets[position]
+        bucket[order] = bucket.get(order, 0) + count
+
+        for window, number_of_buckets in self.window_buckets.items():
+            if age < number_of_buckets:
+                totals = self.window_totals[window]
+                totals[order] = totals.get(order, 0) + count
+
+        return True
+
+    def advance(self, now):
+        """Move the current time forward, dropping old orders from the windows.
+
+        Call before a query if no orders have arrived recently, so that the
+        windows end at the current time rather than the last order.
+
+        Arguments:
+        now -- Current time in seconds since 1970
+        """
+        self.advance_to(int(now // self.bucket_seconds))
+
+    def advance_to(self, bucket_number):
+        """Make bucket_number the newest bucket, if it is newer than the current one.
+
+        For each step forward, the bucket which falls out of each window is
+        subtracted from that window's total.
+
+        Arguments:
+        bucket_number -- Number of the bucket of time to move to
+        """
+        if self.newest == None:
+            self.newest = bucket_number
+            return
+
+        if bucket_number <= self.newest:
+            return
+
+        if bucket_number - self.newest >= self.bucket_count:
+            # Every bucket is out of date, so start again.
+            self.buckets = [{} for i in range(self.bucket_count)]
+            self.bucket_numbers = [None] * self.bucket_count
+            self.window_totals = {window : {} for window in self.window_totals}
+            self.newest = bucket_number
+            return
+
+        while self.newest < bucket_number:
+            self.newest += 1
+            for window, number_of_buckets in self.window_buckets.items():
+                self.subtract_bucket(self.newest - number_of_buckets, self.window_totals[window])
+
+    def subtract_bucket(self, bucket_number, totals):
+        """Subtract one bucket's frequencies from a window's totals.
+
+        Arguments:
+        bucket_number -- Number of the bucket leaving the window
+        totals -- The window's dictionary of order frequencies
+        """
+        position = bucket_number % self.bucket_count
+        if self.bucket_numbers[position] != bucket_number:
+            return  # No orders were made during that bucket.
+
+        for order, count in self.buckets[position].items():
+            remaining = totals[order] - count
+            if remaining == 0:
+                del totals[order]
+            else:
+                totals[order] = remaining
+
+    def top_orders(self, requested_number, window):
+        """The most frequent orders within a window.
+
+        Ties are broken in the same way as display_top_burgers().
+
+        Arguments:
+        requested_number -- How many of the top orders to find
+        window -- Length of the window in seconds. Must be one of the supported windows.
+
+        Returns:
+        list -- (order, frequency) tuples from most to least frequent
+        """
+        return heapq.nlargest(requested_number, self.window_totals[window].items(), key=itemgetter(1,0))
+
+
+def read_file_windowed(filename, counter):
+    """Adds each timestamped order in a file to a WindowedCounter.
+
+    If any line can't be converted, or has no timestamp, prints the error
+    and its line number and exits the program, like read_file_and_process().
+
+    Arguments:
+    filename -- The file to read orders from
+    counter -- WindowedCounter to add the orders to
+    """
+    line_number = 0
+    timer = metrics.stream_timer()
+    convert = timer.timed_function(convert_to_timed_tuple)
+
+    try:
+        with open_order_file(filename) as file:
+            for order in timer.timed_lines(file):
+                line_number += 1
+                timed_order = convert(order)
+
+                if timed_order == None:
+                    print(f"The error occurred in line {line_number} of the text file")
+                    exit()
+
+                counter.add(timed_order[0], timed_order[1])
+
+        timer.finish(line_number, os.path.getsize(filename))
+
+    except PermissionError:
+        print("You don't have permission to open this text file")
+        exit()
+    except FileNotFoundError:
+        print("Text file can't be found")
+        exit()
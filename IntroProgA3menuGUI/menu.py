@@ -11,6 +11,10 @@ The image files related to the program must be stored within the same
 directory as menu.py, or the file paths must be updated to reflect the
 correct locations.
 
+Importing this module doesn't open a window or load any images, so the
+burgers and their prices can be used by other programs without a display.
+tkinter is only imported, and the window built, when main() is called.
+
 Additional Note:
 This program was designed by a vision impaired developer using a system wide display 
 setting of 175%. When resizing, no elements will be squashed, and elements will stay 
@@ -22,10 +26,16 @@ Author: Tanya
 Trimester 1, 2024
 """
 
-from tkinter import *
-from tkinter import ttk
+import os
+import sys
+
+# Burger prices are shared with the other Codetown programs, and are kept in
+# the codetown package in the folder above this one.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codetown import pricing
+from codetown.records import BurgerRecord
 
-root = Tk()
+IMAGE_FOLDER = os.path.dirname(os.path.abspath(__file__))
 
 WINDOW_WIDTH = 1000
 WINDOW_HEIGHT = 750
@@ -60,18 +70,17 @@ CC_BUTTON_IMAGE = "codeCruncherButton.png"
 
 HEADER_IMAGE = "burgerHeader.png"
 
-PRICES = {
-    "base" : 5,  # Includes milk bun, sauce, up to 1 patty, 1 cheese slice, and 1 salad item.
-    "gluten_free" : 1,  # Additional cost.
-    "patty" : 3,  # 1 included. Price per additional patty.
-    "cheese" : 1,  # 1 included, Price per additional cheese slice.
-    "salad" : 1  # tomato, lettuce or onion included in base price. Price per additional salad item. 
-}
-
 next_burger_number = 0 # index number used by cycle_burgers()
 current_after_task = None # ID used to ideantify tcl.after task currently running
 burger_list = [] # initiated here and extended after Burger instances are created.
 
+# Widgets used after the window is built. Set by build_window().
+root = None
+ingredients_text = None
+burger_pic = None
+bottom_frame = None
+burger_header_image = None # Kept here so tkinter doesn't delete the image
+
 
 def create_photoimage(filename):
     """Creates tkinter PhotoImage widget.
@@ -81,13 +90,16 @@ def create_photoimage(filename):
     a message informing the user about the error, then exits the program.
 
     Arguments:
-    filename -- String representing the image filename includeing file extension eg "byte.png"
+    filename -- String representing the image filename includeing file extension eg "byte.png".
+    The file is looked for in the same folder as menu.py.
 
     Returns:
     PhotoImage widget -- for use within other widgets
     """
+    from tkinter import PhotoImage, TclError
+
     try:
-        photoimage = PhotoImage(file= filename)
+        photoimage = PhotoImage(file= os.path.join(IMAGE_FOLDER, filename))
         return photoimage
     except TclError:
         print(f"{filename} can't be found")
@@ -106,11 +118,16 @@ class Burger:
     tomato -- Boolean representing whether the burger has tomato
     lettuce -- Boolean representing whether the burger has lettuce
     onion -- Boolean representing whether the burger has onion
-    main_image -- String representing the image filename for display on the right of the window
-    button_image -- String representing the image filename for display on the button
+    main_image_filename -- String representing the image filename for display on the right of the window
+    button_image_filename -- String representing the image filename for display on the button
+    main_image -- PhotoImage widget of main_image_filename, or None until load_images() is called
+    button_image -- PhotoImage widget of button_image_filename, or None until load_images() is called
+    record -- BurgerRecord of the burger's choices, shared with the other Codetown programs
     
     Methods:
     get_cost() -- Calculate the cost of individual burgers
+    load_images() -- Create the PhotoImage widgets once the window exists
+    ingredients_list() -- Text and colour tags describing the burger
     display_ingredients_list() -- Format ingredients_list Text widget display
     create_button -- onfigure the frames and buttons along the bottom of the window
     """
@@ -118,8 +135,8 @@ class Burger:
     def __init__(self, name, bun, sauce, patty, cheese, tomato, lettuce, onion, main_image, button_image):
         """Initialise attributes of a burger
 
-        Calls create_phoimage() to ensure filenames passed for main_image and button_image are valid, and
-        then create their widget.
+        The images aren't loaded until load_images() is called, as they can
+        only be created once the window exists.
         """
         self.name = name
         self.bun = bun
@@ -129,40 +146,37 @@ class Burger:
         self.tomato = tomato
         self.lettuce = lettuce
         self.onion = onion
-        self.main_image = create_photoimage(main_image)
-        self.button_image = create_photoimage(button_image)
+        self.record = BurgerRecord(bun, sauce, patty, cheese, tomato, lettuce, onion)
+        self.main_image_filename = main_image
+        self.button_image_filename = button_image
+        self.main_image = None
+        self.button_image = None
 
     def get_cost(self):
         """Calculate the cost of individual burgers.
         
-        Called by display_ingredients_list()
+        Called by display_ingredients_list(). Looks the price up in the
+        shared price table in codetown/pricing.py, using the burger's record.
 
         Returns:
         int -- The price of the burger as an integer 
         """
-        burger_price = PRICES["base"]
-        
-        if self.bun == "gluten free":
-            burger_price += PRICES["gluten_free"]
-        if self.patty > 1:
-            burger_price += PRICES["patty"] * (self.patty - 1)
-        if self.cheese > 1:
-            burger_price += PRICES["cheese"] * (self.cheese - 1)
-
-        salad_number = 0
-        for salad_type in self.tomato, self.lettuce, self.onion:
-            if salad_type:
-                salad_number += 1
-
-        if salad_number > 1:
-            burger_price += PRICES["salad"] * (salad_number - 1)
-
-        return burger_price
+        return self.record.price
     
-    def display_ingredients_list(self):
-        """Format ingredients_list Text widget display
-        
-        Called by cycle_burgers()
+    def load_images(self):
+        """Create the PhotoImage widgets once the window exists.
+
+        Calls create_phoimage() to ensure filenames passed for main_image and button_image are valid, and
+        then create their widget. Called by build_window().
+        """
+        self.main_image = create_photoimage(self.main_image_filename)
+        self.button_image = create_photoimage(self.button_image_filename)
+
+    def ingredients_list(self):
+        """Text and colour tags describing the burger, as displayed by display_ingredients_list().
+
+        Returns:
+        list -- (text, colour tag) tuples
         """
         ingredients_list = [
             # from codetown import the_best_burgers
@@ -217,6 +231,17 @@ class Burger:
         ingredients_list.append((" = ", "teal")) 
         ingredients_list.append((f"'${self.get_cost()}'\n", "orange_peach"))
 
+        return ingredients_list
+
+    def display_ingredients_list(self):
+        """Format ingredients_list Text widget display
+        
+        Called by cycle_burgers()
+        """
+        from tkinter import END
+
+        ingredients_list = self.ingredients_list()
+
         # Allow the prgram to edit the ingredients_text widget
         ingredients_text.config(state= "normal")
         
@@ -235,6 +260,8 @@ class Burger:
         Arguments:
         button_number -- Int representing the index of the Burger in burger_list
         """
+        from tkinter import CENTER, E, N, S, W, ttk
+
         this_frame = ttk.Frame(
             bottom_frame, 
             width= WINDOW_WIDTH/4,
@@ -278,9 +305,15 @@ def cycle_burgers():
     to call this function again after 5 seconds. If user selects a burger, the
     task is cancelled by skip_to_burger(), before this function is called again.
     """
+    from tkinter import END
+
     global next_burger_number
     global current_after_task
 
+    # Pick up any changes to codetown/prices.json, so the menu board shows
+    #  new prices without being restarted.
+    pricing.reload_if_changed()
+
     next_burger = burger_list[next_burger_number]
 
     burger_pic.config(image= next_burger.main_image)
@@ -302,85 +335,114 @@ data_crunch = Burger("Data Crunch", "gluten free", "tomato", 0, 0, True, True, T
 code_cruncher = Burger("Code Cruncher", "milk", "tomato", 3, 3, True, True, True, CODE_CRUNCHER_IMAGE, CC_BUTTON_IMAGE)
 burger_list.extend([byte_burger, ctrl_alt_delicious, data_crunch, code_cruncher])
 
-# Set up style information used in ttk.Frame widgets
-my_style = ttk.Style()
-my_style.configure('base.TFrame', background = COLOURS["base"])
-my_style.configure('mantle.TFrame', background = COLOURS["mantle"])
-my_style.configure('crust.TFrame', background = COLOURS["crust"])
-my_style.configure('TButton',  font = (CODE_STYLE_FONT, 15), background = COLOURS["crust"], foreground = COLOURS["crust"])
-
-# Set up the root window
-root.title("Codetown Burger Menu")
-root.config(background= COLOURS["base"])
-root.geometry(f'{WINDOW_WIDTH}x{WINDOW_HEIGHT}') # +30+30
-root.minsize(WINDOW_WIDTH - 100, WINDOW_HEIGHT - 50)
-
-# grid_propogate(False) prevents child widgets from autromatically resizing the grid 
-#  to fit themselves.
-root.grid_propagate(False) 
-root.columnconfigure(0, weight = 1)
-root.rowconfigure(0, weight= 0)
-root.rowconfigure(1, weight= 2)
-root.rowconfigure(2, weight= 1, minsize= WINDOW_HEIGHT * 0.25)
-
-# top_frame frame holds the header image
-top_frame = ttk.Frame(root, width= WINDOW_WIDTH, height= WINDOW_HEIGHT * 0.15, style= 'crust.TFrame')
-top_frame.grid(column= 0, row= 0, sticky = (N, W, E, S))
-top_frame.grid_propagate(False)
-
-burger_header_image = create_photoimage(HEADER_IMAGE)
-title_label = ttk.Label(top_frame, image= burger_header_image)
-title_label.config(font= (CODE_STYLE_FONT, 30), background= COLOURS["crust"])
-title_label.grid(column= 0, row= 0, sticky = (N, W, S))
-
-# centre_frame holds the ingredients list display, and the large burger image
-centre_frame = ttk.Frame(root, width= WINDOW_WIDTH, height= WINDOW_HEIGHT * 0.6, style= 'base.TFrame')
-centre_frame.grid(column= 0, row= 1, sticky = (N, W, E, S))
-centre_frame.grid_propagate(False)
-centre_frame.columnconfigure(0, weight = 3)
-centre_frame.columnconfigure(1, weight = 2)
-centre_frame.rowconfigure(0, weight= 1)
-
-ingredients = ttk.Frame(centre_frame, style= 'mantle.TFrame')
-ingredients.grid_propagate(False)
-ingredients.grid(column= 0, row= 0, sticky = (N, W, E, S))
-ingredients.columnconfigure(0, weight = 1)
-ingredients.rowconfigure(0, weight= 1)
-
-ingredients_text = Text(ingredients, bg= COLOURS["mantle"], bd= 0, wrap= 'none', selectbackground= COLOURS["mantle"])
-ingredients_text.grid(column= 0, row= 0, sticky = (N, W, E, S))
-ingredients_text.place(relx= 0.65, rely= 0.6, anchor= CENTER)
-
-# Create the tags for the colours used to display the ingredients
-for colour in COLOURS.items():
-    ingredients_text.tag_config(tagName= colour[0], foreground= colour[1], font=(CODE_STYLE_FONT, 15))
-ingredients_text.tag_config("cat_green_bold", foreground= COLOURS["cat_green"], font=(CODE_STYLE_FONT, 15, "bold"))
-
-burger_frame = ttk.Frame(centre_frame, padding= 0, relief= FLAT, style= 'base.TFrame')
-burger_frame.grid_propagate(False)
-burger_frame.grid(column= 1, row= 0, sticky = (N, W, E, S))
-burger_frame.columnconfigure(0, weight = 1)
-burger_frame.rowconfigure(0, weight= 1)
-
-burger_pic = Label(burger_frame, image= byte_burger.main_image, border= 0, relief= FLAT)
-burger_pic.configure(background= COLOURS["base"])
-burger_pic.grid(column= 0, row= 0, sticky = (N, W, E, S))
-
-# bottom_frame holds the 4 buttons along the bottom
-bottom_frame = ttk.Frame(root, width= WINDOW_WIDTH, height= WINDOW_HEIGHT * 0.25, style= 'mantle.TFrame')
-bottom_frame.grid(column= 0, row= 2, sticky = (N, W, E, S))
-bottom_frame.grid_propagate(False)
-bottom_frame.columnconfigure(0, weight = 1)
-bottom_frame.columnconfigure(1, weight = 1)
-bottom_frame.columnconfigure(2, weight = 1)
-bottom_frame.columnconfigure(3, weight = 1)
-bottom_frame.rowconfigure(0, weight= 1)
-
-# set up the buttons:
-for burger in burger_list:
-    burger.create_button(burger_list.index(burger))
-
-# Display the first burger of the program
-# First 5 second countdown is initiated inside cycle_burgers() 
-cycle_burgers()
-root.mainloop()
+
+def build_window():
+    """Create the window and every widget in it, and load the images.
+
+    tkinter is only imported here, so programs which import menu.py without
+    displaying it don't need a display or pay for loading tkinter.
+    """
+    from tkinter import CENTER, E, FLAT, Label, N, S, Text, Tk, W, ttk
+
+    global root
+    global ingredients_text
+    global burger_pic
+    global bottom_frame
+    global burger_header_image
+
+    root = Tk()
+
+    for burger in burger_list:
+        burger.load_images()
+
+    # Set up style information used in ttk.Frame widgets
+    my_style = ttk.Style()
+    my_style.configure('base.TFrame', background = COLOURS["base"])
+    my_style.configure('mantle.TFrame', background = COLOURS["mantle"])
+    my_style.configure('crust.TFrame', background = COLOURS["crust"])
+    my_style.configure('TButton',  font = (CODE_STYLE_FONT, 15), background = COLOURS["crust"], foreground = COLOURS["crust"])
+
+    # Set up the root window
+    root.title("Codetown Burger Menu")
+    root.config(background= COLOURS["base"])
+    root.geometry(f'{WINDOW_WIDTH}x{WINDOW_HEIGHT}') # +30+30
+    root.minsize(WINDOW_WIDTH - 100, WINDOW_HEIGHT - 50)
+
+    # grid_propogate(False) prevents child widgets from autromatically resizing the grid 
+    #  to fit themselves.
+    root.grid_propagate(False) 
+    root.columnconfigure(0, weight = 1)
+    root.rowconfigure(0, weight= 0)
+    root.rowconfigure(1, weight= 2)
+    root.rowconfigure(2, weight= 1, minsize= WINDOW_HEIGHT * 0.25)
+
+    # top_frame frame holds the header image
+    top_frame = ttk.Frame(root, width= WINDOW_WIDTH, height= WINDOW_HEIGHT * 0.15, style= 'crust.TFrame')
+    top_frame.grid(column= 0, row= 0, sticky = (N, W, E, S))
+    top_frame.grid_propagate(False)
+
+    burger_header_image = create_photoimage(HEADER_IMAGE)
+    title_label = ttk.Label(top_frame, image= burger_header_image)
+    title_label.config(font= (CODE_STYLE_FONT, 30), background= COLOURS["crust"])
+    title_label.grid(column= 0, row= 0, sticky = (N, W, S))
+
+    # centre_frame holds the ingredients list display, and the large burger image
+    centre_frame = ttk.Frame(root, width= WINDOW_WIDTH, height= WINDOW_HEIGHT * 0.6, style= 'base.TFrame')
+    centre_frame.grid(column= 0, row= 1, sticky = (N, W, E, S))
+    centre_frame.grid_propagate(False)
+    centre_frame.columnconfigure(0, weight = 3)
+    centre_frame.columnconfigure(1, weight = 2)
+    centre_frame.rowconfigure(0, weight= 1)
+
+    ingredients = ttk.Frame(centre_frame, style= 'mantle.TFrame')
+    ingredients.grid_propagate(False)
+    ingredients.grid(column= 0, row= 0, sticky = (N, W, E, S))
+    ingredients.columnconfigure(0, weight = 1)
+    ingredients.rowconfigure(0, weight= 1)
+
+    ingredients_text = Text(ingredients, bg= COLOURS["mantle"], bd= 0, wrap= 'none', selectbackground= COLOURS["mantle"])
+    ingredients_text.grid(column= 0, row= 0, sticky = (N, W, E, S))
+    ingredients_text.place(relx= 0.65, rely= 0.6, anchor= CENTER)
+
+    # Create the tags for the colours used to display the ingredients
+    for colour in COLOURS.items():
+        ingredients_text.tag_config(tagName= colour[0], foreground= colour[1], font=(CODE_STYLE_FONT, 15))
+    ingredients_text.tag_config("cat_green_bold", foreground= COLOURS["cat_green"], font=(CODE_STYLE_FONT, 15, "bold"))
+
+    burger_frame = ttk.Frame(centre_frame, padding= 0, relief= FLAT, style= 'base.TFrame')
+    burger_frame.grid_propagate(False)
+    burger_frame.grid(column= 1, row= 0, sticky = (N, W, E, S))
+    burger_frame.columnconfigure(0, weight = 1)
+    burger_frame.rowconfigure(0, weight= 1)
+
+    burger_pic = Label(burger_frame, image= byte_burger.main_image, border= 0, relief= FLAT)
+    burger_pic.configure(background= COLOURS["base"])
+    burger_pic.grid(column= 0, row= 0, sticky = (N, W, E, S))
+
+    # bottom_frame holds the 4 buttons along the bottom
+    bottom_frame = ttk.Frame(root, width= WINDOW_WIDTH, height= WINDOW_HEIGHT * 0.25, style= 'mantle.TFrame')
+    bottom_frame.grid(column= 0, row= 2, sticky = (N, W, E, S))
+    bottom_frame.grid_propagate(False)
+    bottom_frame.columnconfigure(0, weight = 1)
+    bottom_frame.columnconfigure(1, weight = 1)
+    bottom_frame.columnconfigure(2, weight = 1)
+    bottom_frame.columnconfigure(3, weight = 1)
+    bottom_frame.rowconfigure(0, weight= 1)
+
+    # set up the buttons:
+    for burger in burger_list:
+        burger.create_button(burger_list.index(burger))
+
+
+def main():
+    """Build the window and start cycling through the burgers."""
+    build_window()
+
+    # Display the first burger of the program
+    # First 5 second countdown is initiated inside cycle_burgers() 
+    cycle_burgers()
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures how much memory each way of holding burger orders takes.
+
+The same random orders are held in a list in each of the shapes used by the
+Codetown programs, and in the shared compact shapes from codetown/records.py:
+
+    burger.py dict     The 9 key dictionary made by create_burger()
+    orders.py tuple    The 7 field tuple made by convert_to_tuple()
+    menu.py Burger     A Burger object with its own __dict__
+    BurgerRecord       One slot holding the packed order code
+    BurgerBatch        An array of 2 byte codes, with no object for each order
+
+Memory is measured with tracemalloc, and includes the list holding the
+orders. The strings and small numbers inside the orders are shared by every
+order, as they are in the programs, so they aren't counted.
+
+Usage:
+python3 memory.py --orders 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+REPOSITORY_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([REPOSITORY_FOLDER, os.path.join(REPOSITORY_FOLDER, "IntroProgA3menuGUI")])
+
+import menu
+from codetown.records import BURGER_FIELDS, ORDERS_BY_CODE, VALID_CODES, BurgerBatch, BurgerRecord
+
+def random_orders(number_of_orders, seed):
+    """Chooses random orders.
+
+    Arguments:
+    number_of_orders -- How many orders to choose
+    seed -- Seed for choosing, so each run uses the same orders
+
+    Returns:
+    list -- Each order's choices as a list, in the order of BURGER_FIELDS
+    """
+    orders = [list(ORDERS_BY_CODE[code]) for code in VALID_CODES]
+    return random.Random(seed).choices(orders, k = number_of_orders)
+
+def as_dictionary(choices):
+    """The 9 key dictionary made by create_burger() in burger.py."""
+    burger_order = {"burger" : 1}
+    burger_order.update(zip(BURGER_FIELDS, choices))
+    burger_order["price"] = 0
+    return burger_order
+
+def as_menu_burger(choices):
+    """A Burger from menu.py, without its images loaded."""
+    return menu.Burger("Byte", *choices, menu.BYTE_IMAGE, menu.BYTE_BUTTON_IMAGE)
+
+def as_batch(order_list):
+    """A BurgerBatch holding every order."""
+    batch = BurgerBatch()
+    for choices in order_list:
+        batch.append_tuple(choices)
+    return batch
+
+def measure(build, order_list):
+    """Measures the memory taken by the orders in one shape.
+
+    Arguments:
+    build -- Function taking the list of orders and returning them in the new shape
+    order_list -- list of each order's choices
+
+    Returns:
+    int -- Bytes allocated while building, and still in use afterwards
+    """
+    gc.collect()
+    tracemalloc.start()
+    held = build(order_list)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return size
+
+def run_memory_benchmark(number_of_orders, seed):
+    """Measures each shape and prints the bytes used per order.
+
+    Arguments:
+    number_of_orders -- How many orders to hold
+    seed -- Seed for choosing the orders
+
+    Returns:
+    dict -- The bytes per order of each shape
+    """
+    order_list = random_orders(number_of_orders, seed)
+    shapes = [
+        ("burger.py dict", lambda orders: [as_dictionary(choices) for choices in orders]),
+        ("orders.py tuple", lambda orders: [tuple(choices) for choices in orders]),
+        ("menu.py Burger", lambda orders: [as_menu_burger(choices) for choices in orders]),
+        ("BurgerRecord", lambda orders: [BurgerRecord(*choices) for choices in orders]),
+        ("BurgerBatch", as_batch),
+    ]
+
+    results = {}
+    for name, build in shapes:
+        results[name] = measure(build, order_list) / number_of_orders
+        print(f"{name:<20}{results[name]:10.1f} bytes/order")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure the memory used by each way of holding burger orders.")
+    parser.add_argument("--orders", type = int, default = 1000000, help = "number of orders to hold (default: 1000000)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed for choosing the orders (default: 0)")
+    options = parser.parse_args()
+
+    run_memory_benchmark(options.orders, options.seed)
@@ -0,0 +1,257 @@
+"""
+Times the main functions of all three Codetown burger programs.
+
+A synthetic order file is written with generate_orders.py, and each function
+is timed on it or on the orders it contains. The results are printed and
+saved as JSON, so the speed of two versions of the code can be compared
+with --compare.
+
+Displaying the ingredients in menu.py's window needs a display, so that
+benchmark is skipped when there isn't one. The time taken to start each
+program without a display is measured too, by importing it in a new
+Python process.
+
+Usage:
+python3 suite.py --lines 1000000 --output new.json --compare old.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+REPOSITORY_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BURGER_FOLDER = os.path.join(REPOSITORY_FOLDER, "IntroProgA1")
+ORDERS_FOLDER = os.path.join(REPOSITORY_FOLDER, "IntroProgA2sortOrders")
+MENU_FOLDER = os.path.join(REPOSITORY_FOLDER, "IntroProgA3menuGUI")
+sys.path.extend([BURGER_FOLDER, ORDERS_FOLDER, MENU_FOLDER])
+
+import burger
+import menu
+import orders
+from generate_orders import generate_orders
+
+MINIMUM_SECONDS = 0.2  # Each function is called repeatedly for at least this long
+REPEATS = 3  # The fastest of this many timings is kept
+COLD_START_REPEATS = 5  # New processes started to time each import
+
+def time_calls(function, arguments):
+    """Times calls to a function, cycling through a list of arguments.
+
+    Arguments:
+    function -- Function taking one argument
+    arguments -- list of arguments to call it with
+
+    Returns:
+    float -- The fastest time per call in seconds
+    """
+    while True:
+        start = time.perf_counter()
+        for argument in arguments:
+            function(argument)
+        seconds = time.perf_counter() - start
+        if seconds >= MINIMUM_SECONDS:
+            break
+        arguments = arguments * 2
+
+    best = seconds
+    for i in range(REPEATS - 1):
+        start = time.perf_counter()
+        for argument in arguments:
+            function(argument)
+        best = min(best, time.perf_counter() - start)
+
+    return best / len(arguments)
+
+def time_once(function):
+    """Times a function which does a large amount of work in one call.
+
+    Arguments:
+    function -- Function taking no arguments
+
+    Returns:
+    float -- The fastest time in seconds
+    """
+    best = None
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        if best == None or seconds < best:
+            best = seconds
+
+    return best
+
+def sample_lines(filename, number_of_lines=10000):
+    """Reads the first lines of an order file.
+
+    Arguments:
+    filename -- The order file
+    number_of_lines -- How many lines to read
+
+    Returns:
+    list -- The lines, without their newlines
+    """
+    lines = []
+    with open(filename) as file:
+        for line in file:
+            lines.append(line.rstrip("\n"))
+            if len(lines) == number_of_lines:
+                break
+
+    return lines
+
+def read_orders_file(filename):
+    """Reads a file into orders.order_frequency, starting from empty."""
+    orders.order_frequency.clear()
+    orders.read_file_and_process(filename)
+
+def sort_all_orders():
+    """Sorts every order in orders.order_frequency, as display_top_burgers() does."""
+    orders.invalidate_ranking()
+    orders.top_orders(len(orders.order_frequency))
+
+def display_top_ten():
+    """Runs display_top_burgers() for the top 10 orders, hiding the output."""
+    orders.invalidate_ranking()
+    with redirect_stdout(io.StringIO()):
+        orders.display_top_burgers(requested_number = 10)
+
+def burger_dictionary(order):
+    """Converts an orders.py tuple to the dictionary burger.py uses."""
+    bun, sauce, patties, cheese, tomato, lettuce, onion = order
+    return {"burger" : 1, "bun" : bun, "sauce" : sauce, "patties" : patties, "cheese" : cheese,
+            "tomato" : tomato, "lettuce" : lettuce, "onion" : onion, "price" : 0}
+
+def build_menu_window():
+    """Builds menu.py's window without showing it, so its widgets can be timed.
+
+    Returns:
+    bool -- True if the window was built, False if there is no display
+    """
+    try:
+        with redirect_stdout(io.StringIO()):
+            menu.build_window()
+        menu.root.withdraw()
+        return True
+    except (Exception, SystemExit) as error:
+        print(f"Skipping menu.Burger.display_ingredients_list: {error or 'the images could not be loaded'}")
+        return False
+
+def time_cold_start(module_name):
+    """Times starting a new Python process which imports one module.
+
+    The time to start Python without importing anything is taken away.
+
+    Arguments:
+    module_name -- The module to import
+
+    Returns:
+    float -- The fastest extra time in seconds
+    """
+    def fastest_start(code):
+        best = None
+        for i in range(COLD_START_REPEATS):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check = True)
+            seconds = time.perf_counter() - start
+            if best == None or seconds < best:
+                best = seconds
+        return best
+
+    folders = [BURGER_FOLDER, ORDERS_FOLDER, MENU_FOLDER]
+    return fastest_start(f"import sys; sys.path.extend({folders!r}); import {module_name}") - fastest_start("pass")
+
+def run_suite(number_of_lines, skew, seed):
+    """Times each function and prints the results.
+
+    Arguments:
+    number_of_lines -- How many orders to write to the test file
+    skew -- Skew of the test file, see generate_orders.py
+    seed -- Seed of the test file
+
+    Returns:
+    dict -- The results, ready to be saved as JSON
+    """
+    results = {}
+
+    def record(name, seconds, items=1, unit="calls"):
+        results[name] = {"seconds" : seconds, "per_second" : items / seconds, "unit" : unit}
+        print(f"{name:<32}{seconds * 1e9 / items:12,.0f} ns{items / seconds:16,.0f} {unit}/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "orders.txt")
+        generate_orders(filename, number_of_lines, skew, 0.0, seed)
+        lines = sample_lines(filename)
+
+        record("orders.convert_to_tuple", time_calls(orders.convert_to_tuple, lines))
+        record("orders.read_file_and_process", time_once(lambda: read_orders_file(filename)),
+               number_of_lines, "lines")
+
+    record("orders.top_orders sort", time_once(sort_all_orders), len(orders.order_frequency), "orders")
+    record("orders.display_top_burgers", time_once(display_top_ten))
+
+    order_list = list(orders.order_frequency)
+    record("orders.get_cost", time_calls(orders.get_cost, order_list))
+    record("burger.each_burger_cost", time_calls(burger.each_burger_cost, [burger_dictionary(order) for order in order_list]))
+
+    record("menu.Burger.get_cost", time_calls(menu.Burger.get_cost, menu.burger_list))
+    record("menu.Burger.ingredients_list", time_calls(menu.Burger.ingredients_list, menu.burger_list))
+
+    for module_name in "burger", "orders", "menu":
+        record(f"import {module_name} (cold start)", time_cold_start(module_name))
+
+    if build_menu_window():
+        def display_ingredients(menu_burger):
+            menu.ingredients_text.config(state = "normal")
+            menu.ingredients_text.delete("1.0", "end")
+            menu_burger.display_ingredients_list()
+
+        record("menu.Burger.display_ingredients_list", time_calls(display_ingredients, menu.burger_list))
+
+    return results
+
+def compare_results(results, old_results):
+    """Prints how much faster or slower each result is than a saved one.
+
+    Arguments:
+    results -- Results from run_suite()
+    old_results -- Results loaded from an earlier run's JSON file
+    """
+    print("\nCompared with the earlier results:")
+    for name, result in results.items():
+        if name in old_results:
+            speed_up = old_results[name]["seconds"] / result["seconds"]
+            print(f"{name:<32}{speed_up:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Time the main functions of the Codetown burger programs.")
+    parser.add_argument("--lines", type = int, default = 1000000, help = "number of orders in the test file (default: 1000000)")
+    parser.add_argument("--skew", type = float, default = 1.0, help = "skew of the test file (default: 1)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the test file (default: 0)")
+    parser.add_argument("--output", default = "benchmark_results.json", help = "file to save the results to (default: benchmark_results.json)")
+    parser.add_argument("--compare", help = "results file from an earlier run to compare with")
+    options = parser.parse_args()
+
+    results = run_suite(options.lines, options.skew, options.seed)
+
+    with open(options.output, "w") as file:
+        json.dump({
+            "lines" : options.lines,
+            "skew" : options.skew,
+            "seed" : options.seed,
+            "python" : platform.python_version(),
+            "machine" : platform.machine(),
+            "results" : results,
+        }, file, indent = 2)
+
+    if options.compare:
+        with open(options.compare) as file:
+            compare_results(results, json.load(file)["results"])
@@ -0,0 +1,6 @@
+"""
+Code shared by the Codetown Burger Co programs: burger.py, orders.py and menu.py.
+
+Each program adds the folder containing this package to sys.path, so it can
+be imported with "from codetown import pricing" from any of the program folders.
+"""
@@ -0,0 +1,224 @@
+"""
+Burger prices shared by burger.py, orders.py and menu.py.
+
+The price of every possible burger is calculated once and stored in a table,
+so finding any price is a single list lookup. The price of a burger only
+depends on its bun, the number of patties, the number of cheese slices and
+the number of salad items, so the table has 2 x 4 x 4 x 4 = 128 entries.
+
+Prices are read from "prices.json" in this folder when the module is first
+imported. If the file is changed while a program is running, calling
+reload_if_changed() reads it again and replaces the table. The new table is
+built completely before it replaces the old one, so a price lookup running at
+the same time will always see either all of the old prices or all of the new
+ones, and programs like the menu board don't need to be restarted.
+"""
+
+import json
+import os
+import threading
+
+PRICES_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prices.json")
+
+# Used when prices.json can't be found.
+DEFAULT_PRICES = {
+    "base" : 5,  # Includes milk bun, sauce, up to 1 patty, 1 cheese slice, and 1 salad item.
+    "gluten_free" : 1,  # Additional cost.
+    "patty" : 3,  # 1 included. Price per additional patty.
+    "cheese" : 1,  # 1 included, Price per additional cheese slice.
+    "salad" : 1  # tomato, lettuce or onion included in base price. Price per additional salad item. 
+}
+
+MAX_AMOUNT = 3  # Most patties, cheese slices or salad items on a single burger.
+
+
+class PriceTable:
+    """A complete set of prices, and the price of every possible burger.
+
+    A PriceTable is never changed after it has been created. Reloading the
+    prices creates a new PriceTable and replaces the module level
+    price_table with it in a single assignment.
+
+    Attributes:
+    prices -- dictionary with the same keys as DEFAULT_PRICES
+    modified_time -- Modification time of the file the prices were read from,
+    or None for DEFAULT_PRICES
+    table -- list of the price of each burger, indexed by price_index()
+    """
+
+    def __init__(self, prices, modified_time=None):
+        """Calculate the price of every possible burger.
+
+        Arguments:
+        prices -- dictionary with the same keys as DEFAULT_PRICES
+        modified_time -- Modification time of the prices file
+        """
+        self.prices = dict(prices)
+        self.modified_time = modified_time
+        self.table = [0] * (2 << 6)
+
+        for gluten_free in 0, 1:
+            for patties in range(MAX_AMOUNT + 1):
+                for cheese in range(MAX_AMOUNT + 1):
+                    for salad_number in range(MAX_AMOUNT + 1):
+                        self.table[price_index(gluten_free, patties, cheese, salad_number)] = calculate_price(
+                            self.prices, gluten_free, patties, cheese, salad_number)
+
+    @property
+    def version(self):
+        """String identifying these prices, which changes whenever a price changes.
+
+        Only worked out when needed, so hashlib isn't imported by programs which don't use it.
+        """
+        import hashlib
+        return hashlib.sha1(json.dumps(self.prices, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def price_index(gluten_free, patties, cheese, salad_number):
+    """Find the position of a burger's price in PriceTable.table.
+
+    Arguments:
+    gluten_free -- True or 1 if the burger has a gluten free bun
+    patties -- Number of patties between 0 and 3
+    cheese -- Number of cheese slices between 0 and 3
+    salad_number -- Number of salad items between 0 and 3
+
+    Returns:
+    int -- Index into the table
+    """
+    return gluten_free << 6 | patties << 4 | cheese << 2 | salad_number
+
+def calculate_price(prices, gluten_free, patties, cheese, salad_number):
+    """Calculate the cost of one burger from a set of prices.
+
+    Only used to fill in the price table. Everything else should use get_price().
+
+    Arguments:
+    prices -- dictionary with the same keys as DEFAULT_PRICES
+    gluten_free -- True or 1 if the burger has a gluten free bun
+    patties -- Number of patties
+    cheese -- Number of cheese slices
+    salad_number -- Number of salad items
+
+    Returns:
+    int -- The price of the burger
+    """
+    burger_price = prices["base"]
+
+    if gluten_free:
+        burger_price += prices["gluten_free"]
+    if patties > 1:
+        burger_price += prices["patty"] * (patties - 1)
+    if cheese > 1:
+        burger_price += prices["cheese"] * (cheese - 1)
+    if salad_number > 1:
+        burger_price += prices["salad"] * (salad_number - 1)
+
+    return burger_price
+
+def get_price(bun, patties, cheese, tomato, lettuce, onion):
+    """Look up the price of a burger in the current price table.
+
+    Arguments:
+    bun -- "milk" or "gluten free"
+    patties -- Number of patties between 0 and 3
+    cheese -- Number of cheese slices between 0 and 3
+    tomato -- Boolean, whether the burger has tomato
+    lettuce -- Boolean, whether the burger has lettuce
+    onion -- Boolean, whether the burger has onion
+
+    Returns:
+    int -- The price of the burger
+    """
+    return price_table.table[(bun == "gluten free") << 6 | patties << 4 | cheese << 2 | (tomato + lettuce + onion)]
+
+def check_prices(prices):
+    """Checks that a prices dictionary has every price, and that each is a whole number.
+
+    Arguments:
+    prices -- dictionary read from the prices file
+
+    Returns:
+    String -- Describing the problem, if the prices aren't valid
+    None -- If the prices are valid
+    """
+    if not isinstance(prices, dict) or set(prices) != set(DEFAULT_PRICES):
+        return f"The prices file must contain exactly these prices: {', '.join(DEFAULT_PRICES)}"
+
+    for name, price in prices.items():
+        if not isinstance(price, int) or isinstance(price, bool) or price < 0:
+            return f"The {name} price must be a whole number of at least 0"
+
+    return None
+
+def load_prices(filename=PRICES_FILENAME):
+    """Read prices from a JSON file and replace the current price table.
+
+    If the file can't be read or the prices aren't valid, prints a message
+    and keeps the current prices, so that a mistake in the file doesn't stop
+    a running program.
+
+    Arguments:
+    filename -- The JSON file to read prices from
+
+    Returns:
+    bool -- True if the prices were replaced
+    """
+    global price_table
+    global rejected_modified_time
+
+    with reload_lock:
+        try:
+            modified_time = os.stat(filename).st_mtime_ns
+            with open(filename) as file:
+                prices = json.load(file)
+        except (OSError, ValueError):
+            print(f"The prices file {filename} can't be read. Keeping the current prices.")
+            return False
+
+        problem = check_prices(prices)
+        if problem != None:
+            print(f"{problem}. Keeping the current prices.")
+            rejected_modified_time = modified_time
+            return False
+
+        # Build the new table completely before replacing the old one.
+        price_table = PriceTable(prices, modified_time)
+        return True
+
+def reload_if_changed(filename=PRICES_FILENAME):
+    """Reload the prices if the prices file has changed since it was last read.
+
+    Cheap enough to call every time a program displays or calculates a price.
+
+    Arguments:
+    filename -- The JSON file to read prices from
+
+    Returns:
+    bool -- True if the prices were replaced
+    """
+    try:
+        modified_time = os.stat(filename).st_mtime_ns
+    except OSError:
+        return False
+
+    if modified_time == price_table.modified_time or modified_time == rejected_modified_time:
+        return False  # Unchanged, or already found to be invalid.
+
+    return load_prices(filename)
+
+def get_prices():
+    """Return a copy of the current prices.
+
+    Returns:
+    dict -- The prices, with the same keys as DEFAULT_PRICES
+    """
+    return dict(price_table.prices)
+
+
+reload_lock = threading.Lock()
+price_table = PriceTable(DEFAULT_PRICES)
+rejected_modified_time = None  # Modification time of the last prices file which wasn't valid
+
+if os.path.exists(PRICES_FILENAME):
+    load_prices(PRICES_FILENAME)
@@ -0,0 +1,369 @@
+"""
+A compact record of one burger's choices, shared by burger.py, orders.py and menu.py.
+
+Each program describes a burger in its own way: burger.py uses a dictionary
+with 9 keys, orders.py a tuple of 7 fields, and menu.py a Burger object.
+Holding millions of orders in any of these takes hundreds of bytes for each
+one, mostly for the dictionary or object around the choices.
+
+Every burger has a 10 bit code, which is the one layout for packed burgers
+used by all of the programs. order_codes.py in the orders program imports
+its codes from here, so the two can't drift apart:
+
+    bit 9       bun      (0 "gluten free", 1 "milk")
+    bits 7-8    sauce    (0 "barbecue", 1 "none", 2 "tomato")
+    bits 5-6    patties  (0 to 3)
+    bits 3-4    cheese   (0 to 3)
+    bit 2       tomato
+    bit 1       lettuce
+    bit 0       onion
+
+BurgerRecord only has a slot for the code and no __dict__, so it takes about
+40 bytes instead of around 100 for a tuple and 280 for a dictionary. Its
+choices are looked up from the code when they are read, and its price is
+looked up in the shared price table, so it is never out of date. burger.py
+uses records to write its journal lines, and each Burger on the menu board
+keeps one for its price.
+
+BurgerBatch stores many burgers as an array of 2 byte codes, for keeping
+large numbers of orders in memory. Records are only created when burgers are
+read back from it.
+"""
+
+from array import array
+from collections import Counter
+
+from codetown import pricing
+
+BURGER_FIELDS = ["bun", "sauce", "patties", "cheese", "tomato", "lettuce", "onion"]
+
+# Numbered in alphabetical order, so sorting codes sorts burgers the same way as their tuples.
+BUNS = ["gluten free", "milk"]
+SAUCES = ["barbecue", "none", "tomato"]
+BUN_CODES = {bun : index for index, bun in enumerate(BUNS)}
+SAUCE_CODES = {sauce : index for index, sauce in enumerate(SAUCES)}
+MAX_AMOUNT = 3  # Most patties or cheese slices on a burger
+YES_NO = {"yes" : True, "no" : False}
+
+# Every 10 bit number has a slot, including the unused fourth sauce value.
+CODE_SPACE_SIZE = 1 << 10
+
+# Python only shares int objects up to 256, so without this every record with
+# a larger code would hold its own 28 byte int.
+SHARED_CODES = list(range(CODE_SPACE_SIZE))
+
+def encode_order(order):
+    """Packs a burger's choices into its code, without checking them.
+
+    Arguments:
+    order -- tuple of the choices in the order of BURGER_FIELDS, in the format returned by convert_to_tuple() in orders.py
+
+    Returns:
+    int -- The code for the burger
+    """
+    return (BUN_CODES[order[0]] << 9
+        | SAUCE_CODES[order[1]] << 7
+        | order[2] << 5
+        | order[3] << 3
+        | order[4] << 2
+        | order[5] << 1
+        | order[6])
+
+def build_order_table():
+    """Creates the list used by decode_order() to look up each code.
+
+    Returns:
+    list -- The choices tuple for each code, or None for unused codes
+    """
+    orders_by_code = [None] * CODE_SPACE_SIZE
+
+    for bun in BUN_CODES:
+        for sauce in SAUCE_CODES:
+            for patties in range(MAX_AMOUNT + 1):
+                for cheese in range(MAX_AMOUNT + 1):
+                    for tomato in False, True:
+                        for lettuce in False, True:
+                            for onion in False, True:
+                                order = (bun, sauce, patties, cheese, tomato, lettuce, onion)
+                                orders_by_code[encode_order(order)] = order
+
+    return orders_by_code
+
+ORDERS_BY_CODE = build_order_table()
+VALID_CODES = [code for code in range(CODE_SPACE_SIZE) if ORDERS_BY_CODE[code] != None]
+
+# Position of each valid code's price in the shared price table, so pricing a
+# burger is two list lookups. The table itself can be reloaded while running.
+PRICE_INDEX_BY_CODE = [None if order == None else pricing.price_index(
+    order[0] == "gluten free", order[2], order[3], order[4] + order[5] + order[6])
+    for order in ORDERS_BY_CODE]
+
+def decode_order(code):
+    """Unpacks a code into the tuple of the burger's choices.
+
+    Arguments:
+    code -- int code for the burger
+
+    Returns:
+    tuple -- The choices, in the format returned by convert_to_tuple() in orders.py
+    None -- If the code isn't a valid burger
+    """
+    return ORDERS_BY_CODE[code]
+
+def check_choice(choice, options, choice_type):
+    """Checks a bun or sauce choice, with the same rules as check_choice() in burger.py.
+
+    Arguments:
+    choice -- String of the choice, in any case
+    options -- list of the available options
+    choice_type -- Name of the choice, for the error message
+
+    Returns:
+    String -- The choice in lower case
+
+    Raises:
+    ValueError -- If the choice isn't one of the options
+    """
+    if isinstance(choice, str) and choice.lower() in options:
+        return choice.lower()
+
+    raise ValueError(f"The {choice_type} choice must be one of: {', '.join(options)}")
+
+def check_amount(amount, amount_type):
+    """Checks a number of patties or cheese slices, with the same rules as check_amount() in burger.py.
+
+    Arguments:
+    amount -- int, or a String of digits
+    amount_type -- Name of the amount, for the error message
+
+    Returns:
+    int -- The amount
+
+    Raises:
+    ValueError -- If the amount isn't a whole number between 0 and MAX_AMOUNT
+    """
+    if isinstance(amount, str):
+        try:
+            amount = int(amount)
+        except ValueError:
+            raise ValueError(f"The number of {amount_type} was not a number")
+    elif isinstance(amount, bool) or not isinstance(amount, int):
+        raise ValueError(f"The number of {amount_type} was not a number")
+
+    if amount < 0 or amount > MAX_AMOUNT:
+        raise ValueError(f"The number of {amount_type} must be between 0 and {MAX_AMOUNT}")
+    return amount
+
+def check_yes_no(choice, salad_type):
+    """Checks a salad choice, with the same rules as check_salad() in burger.py.
+
+    Arguments:
+    choice -- True, False, "yes" or "no"
+    salad_type -- Name of the salad item, for the error message
+
+    Returns:
+    bool -- Whether the burger has the salad item
+
+    Raises:
+    ValueError -- If the choice isn't one of those
+    """
+    if isinstance(choice, bool):
+        return choice
+    if isinstance(choice, str) and choice.lower() in YES_NO:
+        return YES_NO[choice.lower()]
+
+    raise ValueError(f"The {salad_type} choice must be one of: yes, no")
+
+def encode_choices(bun, sauce, patties, cheese, tomato, lettuce, onion):
+    """Checks a burger's choices and packs them into its code.
+
+    Arguments:
+    bun -- "milk" or "gluten free", in any case
+    sauce -- "tomato", "barbecue" or "none", in any case
+    patties -- Number of patties between 0 and 3
+    cheese -- Number of cheese slices between 0 and 3
+    tomato, lettuce, onion -- Whether the burger has each salad item, as booleans or "yes" or "no"
+
+    Returns:
+    int -- The code for the burger
+
+    Raises:
+    ValueError -- If any choice isn't valid
+    """
+    return SHARED_CODES[encode_order((check_choice(bun, BUNS, "bun"), check_choice(sauce, SAUCES, "sauce"), check_amount(patties, "patties"), check_amount(cheese, "cheese slices"),
+        check_yes_no(tomato, "tomato"), check_yes_no(lettuce, "lettuce"), check_yes_no(onion, "onion")))]
+
+class BurgerRecord:
+    """One burger's choices, packed into a single integer.
+
+    Attributes:
+    code -- int holding every choice, in the layout described at the top of this file
+    bun, sauce, patties, cheese, tomato, lettuce, onion -- The choices, unpacked from code when read
+    price -- The burger's price from the current shared price table
+
+    Methods:
+    from_tuple(), to_tuple() -- Convert from and to the tuples used by orders.py
+    from_dict(), to_dict() -- Convert from and to the dictionaries used by burger.py
+    from_menu_burger() -- Convert from a Burger in menu.py
+    to_line() -- Convert to a line of an orders.txt file
+    """
+
+    __slots__ = ("code",)
+
+    def __init__(self, bun, sauce, patties, cheese, tomato, lettuce, onion):
+        """Pack a burger's choices. Raises ValueError if any choice isn't valid."""
+        self.code = encode_choices(bun, sauce, patties, cheese, tomato, lettuce, onion)
+
+    @classmethod
+    def from_code(cls, code):
+        """Creates a record from a code, such as one read from a BurgerBatch."""
+        record = cls.__new__(cls)
+        record.code = SHARED_CODES[code]
+        return record
+
+    @classmethod
+    def from_tuple(cls, order):
+        """Creates a record from a tuple in the format returned by convert_to_tuple() in orders.py."""
+        return cls(*order)
+
+    @classmethod
+    def from_dict(cls, burger_order):
+        """Creates a record from a dictionary in the format returned by create_burger() in burger.py."""
+        return cls(*[burger_order[field] for field in BURGER_FIELDS])
+
+    @classmethod
+    def from_menu_burger(cls, menu_burger):
+        """Creates a record from a Burger in menu.py, which calls its patties "patty"."""
+        return cls(menu_burger.bun, menu_burger.sauce, menu_burger.patty, menu_burger.cheese,
+            menu_burger.tomato, menu_burger.lettuce, menu_burger.onion)
+
+    @property
+    def bun(self):
+        return ORDERS_BY_CODE[self.code][0]
+
+    @property
+    def sauce(self):
+        return ORDERS_BY_CODE[self.code][1]
+
+    @property
+    def patties(self):
+        return ORDERS_BY_CODE[self.code][2]
+
+    @property
+    def cheese(self):
+        return ORDERS_BY_CODE[self.code][3]
+
+    @property
+    def tomato(self):
+        return ORDERS_BY_CODE[self.code][4]
+
+    @property
+    def lettuce(self):
+        return ORDERS_BY_CODE[self.code][5]
+
+    @property
+    def onion(self):
+        return ORDERS_BY_CODE[self.code][6]
+
+    @property
+    def price(self):
+        return pricing.price_table.table[PRICE_INDEX_BY_CODE[self.code]]
+
+    def to_tuple(self):
+        """The burger as a tuple, in the format returned by convert_to_tuple() in orders.py."""
+        return ORDERS_BY_CODE[self.code]
+
+    def to_line(self):
+        """The burger as a line of an orders.txt file, such as "milk,tomato,2,1,yes,no,no", including the newline."""
+        bun, sauce, patties, cheese, tomato, lettuce, onion = ORDERS_BY_CODE[self.code]
+        salads = ["yes" if salad else "no" for salad in (tomato, lettuce, onion)]
+        return f"{bun},{sauce},{patties},{cheese},{','.join(salads)}\n"
+
+    def to_dict(self, burger_number=1):
+        """The burger as a dictionary, in the format returned by create_burger() in burger.py.
+
+        Arguments:
+        burger_number -- Which burger in the order this is
+        """
+        return {"burger" : burger_number, "bun" : self.bun, "sauce" : self.sauce, "patties" : self.patties,
+                "cheese" : self.cheese, "tomato" : self.tomato, "lettuce" : self.lettuce, "onion" : self.onion,
+                "price" : self.price}
+
+    def __eq__(self, other):
+        if not isinstance(other, BurgerRecord):
+            return NotImplemented
+        return self.code == other.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return f"BurgerRecord{self.to_tuple()}"
+
+class BurgerBatch:
+    """Many burgers stored as an array of 2 byte codes.
+
+    Attributes:
+    codes -- array of each burger's code, in the order they were added
+
+    Methods:
+    append() -- Add a BurgerRecord
+    append_tuple() -- Add a burger from an orders.py tuple
+    tuples() -- Every burger as an orders.py tuple
+    frequencies() -- How often each burger was added, like order_frequency in orders.py
+    total_price() -- The total price of every burger
+    nbytes() -- Memory used by the codes
+    """
+
+    def __init__(self, records=()):
+        """Create a batch, optionally holding some BurgerRecords to start with."""
+        self.codes = array("H", [record.code for record in records])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return BurgerRecord.from_code(self.codes[index])
+
+    def __iter__(self):
+        return map(BurgerRecord.from_code, self.codes)
+
+    def append(self, record):
+        """Add a BurgerRecord."""
+        self.codes.append(record.code)
+
+    def append_tuple(self, order):
+        """Add a burger from a tuple in the format returned by convert_to_tuple()."""
+        self.codes.append(encode_choices(*order))
+
+    def frequencies(self):
+        """How often each burger was added.
+
+        Returns:
+        dict -- Each burger's tuple mapped to the number of times it was added, like order_frequency
+        """
+        return {BurgerRecord.from_code(code).to_tuple() : count for code, count in Counter(self.codes).items()}
+
+    def tuples(self):
+        """Every burger as a tuple, in the order they were added.
+
+        Each different burger's tuple is only created once and then shared.
+        """
+        made = {}
+        for code in self.codes:
+            order = made.get(code)
+            if order == None:
+                order = made[code] = BurgerRecord.from_code(code).to_tuple()
+            yield order
+
+    def total_price(self):
+        """The total price of every burger, using the current shared price table.
+
+        Returns:
+        int -- The total price
+        """
+        return sum(count * BurgerRecord.from_code(code).price for code, count in Counter(self.codes).items())
+
+    def nbytes(self):
+        """Memory used by the codes, in bytes."""
+        return self.codes.itemsize * len(self.codes)